@@ -0,0 +1,468 @@
+"""
+*******************************************************************************************************
+"Hexagonal Microbes" - Benchmark Suite
+
+Times the building blocks of the simulation across the board configurations named in Hex_Board's main
+protocol, so a change to Hex_Board.py can be checked for speed before it is merged. Each benchmark is
+repeated and its fastest and median times are kept. Results are written as .json, and can be compared
+against an earlier results file to flag regressions.
+
+Example:
+    python Hex_Benchmark.py --out baseline.json
+    python Hex_Benchmark.py --out candidate.json --baseline baseline.json --tolerance 0.2
+*******************************************************************************************************
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import numpy as np
+import Hex_Board
+
+# Board configurations as (hex_count, pixel_width_of_hex, amoeba_radius), matching the comments in Hex_Board's
+# main protocol.
+BOARD_CONFIGS = {
+    'small': (40, 19, 2),
+    'default': (60, 19, 5),
+    'large': (120, 36, 10),
+}
+# Amoeba radii swept by the amoeba benchmarks on every board
+AMOEBA_RADII = (2, 5, 10)
+# Seed of every benchmark, so repeated runs time the same work
+SEED = 0
+# Time steps of the end to end benchmark
+RUN_STEPS = 10
+
+
+def make_organisms(hex_cnt, width, radius):
+    """
+    Lays the default 4 ciliates and 1 amoeba onto a blank board, as the main protocol does.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+
+        **Returns**
+            list: Ciliate, Amoeba
+                    The 4 ciliates followed by the amoeba.
+    """
+    blank_board = Hex_Board.Board(hex_cnt, width, '', organisms=None)
+    streams = Hex_Board.spawn_random_streams(SEED, 5)
+    return [*Hex_Board.initialize_4_ciliates(blank_board, streams[:4]),
+            Hex_Board.initialize_amoeba(radius, blank_board, streams[4])]
+
+
+def bench_board_init(hex_cnt, width, radius, repeats):
+    """
+    Times building a board with its organisms on it and rendering its first frame. Boards render lazily, so
+    the first read of Board.pixels is timed along with Board.__init__.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per board of every repeat.
+    """
+    organisms = make_organisms(hex_cnt, width, radius)
+    return time_calls(lambda: Hex_Board.Board(hex_cnt, width, '', organisms).pixels, repeats)
+
+
+def bench_board_geometry(hex_cnt, width, radius, repeats):
+    """
+    Times building the shared geometry of a board size from scratch, paid once per board size.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per build of every repeat.
+    """
+    def build_geometry():
+        Hex_Board.get_board_geometry.cache_clear()
+        Hex_Board.get_board_geometry(hex_cnt, width)
+    return time_calls(build_geometry, repeats)
+
+
+def bench_board_raster(hex_cnt, width, radius, repeats):
+    """
+    Times building the pixel-to-hexagon label map from scratch, paid once per board size.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per build of every repeat.
+    """
+    board = Hex_Board.Board(hex_cnt, width, '', organisms=None)
+
+    def build_raster():
+        board.geometry.rasters.clear()
+        board.get_raster()
+    return time_calls(build_raster, repeats)
+
+
+def bench_board_save(hex_cnt, width, radius, repeats):
+    """
+    Times rendering a board and saving it out as .png.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per save of every repeat.
+    """
+    board = Hex_Board.Board(hex_cnt, width, '', make_organisms(hex_cnt, width, radius))
+    folder = tempfile.mkdtemp()
+    try:
+        return time_calls(lambda: board.save(os.path.join(folder, 'board.png')), repeats)
+    finally:
+        shutil.rmtree(folder)
+
+
+def bench_ciliate_moves(hex_cnt, width, radius, repeats):
+    """
+    Times proposing the next move of the 4 ciliates.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per batch of proposals of every repeat.
+    """
+    simulation = Hex_Board.Simulation(hex_cnt, width, make_organisms(hex_cnt, width, radius))
+    return time_calls(simulation.ciliates.propose_moves, repeats, number=100)
+
+
+def bench_amoeba_init(hex_cnt, width, radius, repeats):
+    """
+    Times building an amoeba, from its blob conformation to its first move.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per amoeba of every repeat.
+    """
+    board = Hex_Board.Board(hex_cnt, width, '', organisms=None)
+    return time_calls(lambda: Hex_Board.initialize_amoeba(radius, board, Hex_Board.spawn_random_streams(SEED, 1)[0]),
+                      repeats)
+
+
+def bench_amoeba_moves(hex_cnt, width, radius, repeats):
+    """
+    Times the amoeba move pipeline, taking one move and drawing the next.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+
+        **Returns**
+            list: float
+                    Seconds per move of every repeat.
+    """
+    board = Hex_Board.Board(hex_cnt, width, '', organisms=None)
+    amoeba = Hex_Board.initialize_amoeba(radius, board, Hex_Board.spawn_random_streams(SEED, 1)[0])
+    amoeba.index = 0
+
+    def move():
+        board.update_organism(0, amoeba, *amoeba.get_move_delta())
+        amoeba.advance(board)
+    board.organisms = [amoeba]
+    for hxhy in amoeba.hxhy_list:
+        board.add_owner(hxhy, 0)
+    return time_calls(move, repeats, number=100)
+
+
+def bench_get_ring(hex_cnt, width, radius, repeats, number=20):
+    """
+    Times listing every ring around the board midpoint out to the board's edge. A single pass is over in about
+    a millisecond, so every repeat times number passes and the fastest repeat is kept.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+            number: int
+                    Passes over all rings per repeat.
+
+        **Returns**
+            list: float
+                    Seconds per call of get_ring() of every repeat.
+    """
+    center, radii = (hex_cnt // 2, 0), range(1, hex_cnt // 2 + 1)
+
+    def get_rings():
+        for r in radii:
+            Hex_Board.get_ring(center, r)
+    return [seconds / (number * len(radii)) for seconds in timeit.repeat(get_rings, number=number, repeat=repeats)]
+
+
+def bench_run_simulation(hex_cnt, width, radius, repeats, steps=RUN_STEPS):
+    """
+    Times an end to end run_simulation() of a few time steps, saving every frame as .png.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            radius: int
+                    Radius of the amoeba's initial blob conformation.
+            repeats: int
+                    Number of timed repeats.
+            steps: int
+                    Time steps of every run.
+
+        **Returns**
+            list: float
+                    Seconds per run of every repeat.
+    """
+    def run():
+        folder = tempfile.mkdtemp() + os.sep
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                Hex_Board.run_simulation(steps, hex_cnt, width, make_organisms(hex_cnt, width, radius), folder)
+        finally:
+            shutil.rmtree(folder)
+    return time_calls(run, repeats)
+
+
+# Benchmarks by name. Each takes (hex_cnt, width, radius, repeats) and returns the seconds per call of every repeat.
+# The ones in AMOEBA_BENCHMARKS also sweep AMOEBA_RADII.
+BENCHMARKS = {
+    'board_init': bench_board_init,
+    'board_geometry': bench_board_geometry,
+    'board_raster': bench_board_raster,
+    'board_save': bench_board_save,
+    'ciliate_moves': bench_ciliate_moves,
+    'amoeba_init': bench_amoeba_init,
+    'amoeba_moves': bench_amoeba_moves,
+    'get_ring': bench_get_ring,
+    'run_simulation': bench_run_simulation,
+}
+AMOEBA_BENCHMARKS = ('amoeba_init', 'amoeba_moves')
+
+
+def time_calls(function, repeats, number=1):
+    """
+    Times a function a number of times per repeat.
+
+        **Parameters**
+            function: callable
+                    The work to time. Takes no arguments.
+            repeats: int
+                    Number of timed repeats.
+            number: int
+                    Calls per repeat. The time of a repeat is divided by it.
+
+        **Returns**
+            list: float
+                    Seconds per call of every repeat.
+    """
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        seconds.append((time.perf_counter() - start) / number)
+    return seconds
+
+
+def run_benchmarks(configs, names, repeats, radii=AMOEBA_RADII):
+    """
+    Runs the chosen benchmarks on every chosen board configuration.
+
+        **Parameters**
+            configs: list: str
+                    Names of board configurations, see BOARD_CONFIGS.
+            names: list: str
+                    Names of benchmarks, see BENCHMARKS.
+            repeats: int
+                    Number of timed repeats of every benchmark.
+            radii: tuple: int
+                    Amoeba radii swept by the amoeba benchmarks. Radii too big for a board are skipped.
+
+        **Returns**
+            list: dict
+                    One result per benchmark, board and radius.
+    """
+    results = []
+    for config in configs:
+        hex_cnt, width, config_radius = BOARD_CONFIGS[config]
+        for name in names:
+            sweep = [r for r in radii if 2 * r + 1 < hex_cnt // 2] if name in AMOEBA_BENCHMARKS else [config_radius]
+            for radius in sweep:
+                # One untimed call first, so lazily built caches do not land in the first repeat
+                BENCHMARKS[name](hex_cnt, width, radius, 1)
+                seconds = BENCHMARKS[name](hex_cnt, width, radius, repeats)
+                results.append({'name': name, 'config': config, 'hex_count': hex_cnt, 'width': width,
+                                'radius': radius, 'repeats': repeats, 'seconds_min': min(seconds),
+                                'seconds_median': statistics.median(seconds)})
+                print(name, config, 'radius', radius, format(min(seconds) * 1000, '.3f'), 'ms')
+    return results
+
+
+def get_result_key(result):
+    """
+    Helper function to compare_results(). Identifies a benchmark result across results files.
+
+        **Parameters**
+            result: dict
+                    One benchmark result, see run_benchmarks().
+
+        **Returns**
+            tuple
+                Name, board configuration and amoeba radius of the benchmark.
+    """
+    return result['name'], result['config'], result['radius']
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Compares results against a baseline. A benchmark regresses when its fastest time grew by more than the
+    tolerance. Benchmarks missing from either side are skipped.
+
+        **Parameters**
+            results: list: dict
+                    Results of this run.
+            baseline: list: dict
+                    Results of the baseline run.
+            tolerance: float
+                    Allowed slow down as a fraction, e.g. 0.2 for 20%.
+
+        **Returns**
+            list: dict
+                    Every compared benchmark with its 'ratio' of new to baseline time and a 'regressed' flag.
+    """
+    baseline_by_key = {get_result_key(result): result for result in baseline}
+    comparisons = []
+    for result in results:
+        old = baseline_by_key.get(get_result_key(result))
+        if old is None:
+            continue
+        ratio = result['seconds_min'] / old['seconds_min']
+        comparisons.append({'name': result['name'], 'config': result['config'], 'radius': result['radius'],
+                            'ratio': round(ratio, 3), 'regressed': ratio > 1 + tolerance})
+    return comparisons
+
+
+def get_machine_info():
+    """
+    Gets what the timings depend on besides the code, to tell apart results from different machines.
+
+        **Parameters**
+            None
+
+        **Returns**
+            dict
+                Python and NumPy versions, platform, processor count and time of the run.
+    """
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the building blocks of the hexagonal microbe simulation.')
+    parser.add_argument('--configs', default=','.join(BOARD_CONFIGS),
+                        help='Board configurations to run, from ' + ', '.join(BOARD_CONFIGS) + '.')
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help='Benchmarks to run, from ' + ', '.join(BENCHMARKS) + '.')
+    parser.add_argument('--radii', default=','.join(str(r) for r in AMOEBA_RADII),
+                        help='Amoeba radii swept by the amoeba benchmarks.')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed repeats of every benchmark.')
+    parser.add_argument('--steps', type=int, default=RUN_STEPS, help='Time steps of the end to end benchmark.')
+    parser.add_argument('--out', default=None, help='Write the results to this .json file.')
+    parser.add_argument('--baseline', default=None, help='Compare against the results in this .json file.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Slow down over the baseline flagged as a regression, as a fraction.')
+    args = parser.parse_args()
+
+    BENCHMARKS['run_simulation'] = functools.partial(bench_run_simulation, steps=args.steps)
+    bench_results = run_benchmarks(args.configs.split(','), args.only.split(','), args.repeats,
+                                   tuple(int(r) for r in args.radii.split(',')))
+    report = {'machine': get_machine_info(), 'results': bench_results}
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            report['comparison'] = compare_results(bench_results, json.load(f)['results'], args.tolerance)
+        regressions = [comparison for comparison in report['comparison'] if comparison['regressed']]
+        for comparison in regressions:
+            print('Regression:', comparison['name'], comparison['config'], 'radius', comparison['radius'],
+                  'is', comparison['ratio'], 'times the baseline')
+    if args.out is not None:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if regressions else 0)
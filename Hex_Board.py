@@ -7,64 +7,113 @@ Software Carpentry
 Due: 12/19/2022
 
 Main protocol starts with the key system adjustment knobs, followed by an initiator for a blank board.
-The hexagonal microbial simulation then runs for the specified time steps. Images are saved out to a
-temporary folder that must be specified. A movie is made of the images and the image folder is deleted.
+The hexagonal microbial simulation then runs for the specified time steps. By default each frame is streamed
+straight into the video encoder. Alternatively, images are saved out to a temporary folder that must be specified,
+a movie is made of the images and the image folder is deleted.
 
 !!!
-    Important Details: If the knobs are adjusted to make the system too big, then the program can
-                        crash due to memory issues. If the system is too small, then the microbes
-                        cannot be properly initialized. No more than 999 time steps are allowed.
+    Important Details: Frames bigger than Board.frame_pixel_budget are refused. Very large boards should
+                        render a viewport of the board or save tiles instead. If the system is too small,
+                        then the microbes cannot be properly initialized.
 !!!!
 *******************************************************************************************************
 """
 
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from multiprocessing import Pipe, Process, shared_memory
+import numpy as np
 import math
+import functools
+import itertools
+import io
 import os
+import json
+import time
+import pickle
+import cProfile
+import collections
 import shutil
-import random
+import subprocess
+import threading
 import moviepy.video.io.ImageSequenceClip as MakeClip
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+from moviepy.config import get_setting
 
+# Axial steps to the 6 neighbors of a hexagon, clockwise from the upper-left.
+HEX_DIRECTIONS = [(-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1)]
+# Ciliate move types are 0: forward, 1: backward, 2: rotate +60, 3: rotate -60, drawn with these weights.
+CILIATE_MOVE_TYPES = [0, 0, 0, 0, 0, 0, 1, 1, 2, 3]
+CILIATE_MOVE_TYPE_ARRAY = np.array(CILIATE_MOVE_TYPES, dtype=np.int64)
+# Axial (head, mid, tail) offsets from a ciliate's current middle after a move, indexed [orientation, move_type].
+# Rotations swing the head one neighbor around the middle and keep the tail opposite it.
+CILIATE_MOVE_OFFSETS = np.array([[[np.multiply(2, HEX_DIRECTIONS[o]), HEX_DIRECTIONS[o], (0, 0)],
+                                  [(0, 0), HEX_DIRECTIONS[(o + 3) % 6], np.multiply(2, HEX_DIRECTIONS[(o + 3) % 6])],
+                                  [HEX_DIRECTIONS[(o + 5) % 6], (0, 0), HEX_DIRECTIONS[(o + 2) % 6]],
+                                  [HEX_DIRECTIONS[(o + 1) % 6], (0, 0), HEX_DIRECTIONS[(o + 4) % 6]]]
+                                 for o in range(6)], dtype=np.int64)
+# Change in orientation for each move type
+CILIATE_TURNS = np.array([0, 0, 5, 1])
+# The same offsets as two steps along HEX_DIRECTIONS, with step 6 standing still, indexed [orientation, move_type].
+# Chaining two reads of the board's neighbor table then finds a ciliate's next cells, see Board.neighbor_table.
+CILIATE_MOVE_STEPS = np.array([[[(6, 6) if not offset.any() else
+                                 (HEX_DIRECTIONS.index(tuple(offset)), 6) if tuple(offset) in HEX_DIRECTIONS else
+                                 (HEX_DIRECTIONS.index(tuple(offset // 2)),) * 2
+                                 for offset in move] for move in orientation] for orientation in CILIATE_MOVE_OFFSETS],
+                              dtype=np.int64)
 
-class Board:
+
+class BoardGeometry:
     """
-    Class object holds information for the board layout. Reinitialized with each time step.
+    Class object holds everything about a board that depends only on its size: the hexagon dimensions, the column
+    ranges and cell ids, the fence, the neighbor cache and the empty occupancy grid.
+    Built once per (hex_diag, width) by get_board_geometry() and shared by every board of that size, so it must not
+    be changed. The pixel-to-hex label maps of the most recently used viewports are kept here too, see
+    Board.get_raster(), so they are dropped along with the geometry.
     """
-    def __init__(self, hex_diag, width, name, organisms):
+    # Most viewports of one board size whose label maps are kept
+    raster_cache_size = 2
+
+    def __init__(self, hex_diag, width):
         """
-        Establishes pertinent self objects for use in the main program.
+        Establishes pertinent self objects for use by boards of this size.
 
             **Parameters**
                 hex_diag: int
                         The user specified number of hexagons across the diagonal of the board
                 width: int
                         The user specified pixel width of a single hexagon
-                name: str
-                        Current name of the board including file path.
-                organisms: list: Ciliate, Amoeba
-                        List of 4 Ciliate objects followed by 1 Amoeba object for this time step.
 
             **Returns**
                 No return
         """
-        self.hex_diag, self.width, self.name, self.organisms = hex_diag, width, name, organisms
+        self.hex_diag, self.width = hex_diag, width
         self.height = self.get_height()
         self.midpoint = (math.floor(self.hex_diag / 2), 0)
         # Get max_hy and min_hy values indexed 0 to hex_diag
-        self.hy_maxes = [math.floor(0.5 * (self.hex_diag - i)) for i in range(self.hex_diag + 1)]
-        self.hy_mins = [math.ceil(-0.5 * i) for i in range(self.hex_diag + 1)]
+        self.hy_maxes = tuple(math.floor(0.5 * (self.hex_diag - i)) for i in range(self.hex_diag + 1))
+        self.hy_mins = tuple(math.ceil(-0.5 * i) for i in range(self.hex_diag + 1))
         # Get max_x internal quadrant dimensions for defining a hex
-        self.quad_max_xs = [(round(self.width / 2 - j * 1 / 3 ** 0.5)) for j in range(round(self.height / 2))]
+        self.quad_max_xs = tuple(round(self.width / 2 - j * 1 / 3 ** 0.5) for j in range(round(self.height / 2)))
         self.px_max, self.py_max = self.get_pxy_max()
-        self.out_of_bounds = self.get_oob()
-        self.img = self.blank()
-        if self.organisms is None:
-            pass
-        else:
-            for org in self.organisms:
-                for hxhy in org.hxhy_list:
-                    if hxhy:
-                        self.paint_pixels_of_hex(org.rgb, hxhy)
+        # Cell ids count down each column of constant hx, so a cell id is worked out from its column start.
+        self.col_starts = self.get_col_starts()
+        # Cell id N stands for anything off the board, both in the label map and in the neighbor table.
+        self.oob_id = self.col_starts[-1]
+        self.hy_offset = 1 - self.hy_mins[-1]
+        # Array copies of the column ranges for vectorized cell id lookups
+        self.col_start_array = get_read_only_array(self.col_starts[:-1])
+        self.hy_min_array = get_read_only_array(self.hy_mins)
+        self.hy_max_array = get_read_only_array(self.hy_maxes)
+        self.out_of_bounds = frozenset(self.get_oob())
+        self.neighbor_cache = self.get_neighbor_cache()
+        self.free_grid = self.get_free_grid()
+        self.free_grid.flags.writeable = False
+        self.hex_offsets = self.get_hex_offsets()
+        self.neighbor_ids = None
+        # Label map data by viewport, least recently used first
+        self.rasters = collections.OrderedDict()
 
     def get_height(self):
         """
@@ -126,704 +175,3818 @@ class Board:
         # Dump into a single list of tuples defining the out-of-bounds layer
         return [*sides, *top_and_bot]
 
-    def blank(self):
+    def get_col_starts(self):
         """
-        Creates a blank board for when this class is first initialized with no organisms on it.
+        Gets the cell id of the first hexagon in each column of constant hx. Cell ids count down each column.
 
             **Parameters**
                 self
 
             **Returns**
-                Image object
-                    A white pixel image of size px_max, py_max.
+                tuple: int
+                        Cell id of the top of each column, indexed 0 to hex_diag, then the total number of cells.
         """
-        # Make white rectangular backdrop
-        return Image.new(mode="RGB", size=(self.px_max, self.py_max), color=(255, 255, 255))
+        col_starts = [0]
+        for hx in range(self.hex_diag + 1):
+            col_starts.append(col_starts[-1] + self.hy_maxes[hx] - self.hy_mins[hx] + 1)
+        return tuple(col_starts)
 
-    def paint_pixels_of_hex(self, rgb, hxhy):
+    def get_neighbor_cache(self):
         """
-        Paints the pixels of a single hexagon on the board.
+        Creates the lookup of the 6 neighboring hexagonal coordinates of every cell, for boards that fit in
+        Board.cell_cache_budget. Larger boards get None and work their neighbors out on demand.
 
             **Parameters**
                 self
-                rgb: tuple
-                        Tuple of RGB integers for the hexagon
-                hxhy: tuple
-                        Tuple of the hexagon's hexagonal coordinates on the board.
 
             **Returns**
-                No return
+                dict
+                    Lookup from hexagonal coordinate to a tuple of its neighbors in HEX_DIRECTIONS order, or None.
         """
-        shift_x = math.floor(self.width / 2 + self.width / 2 * (hxhy[0] * 3 / 2))
-        shift_y = math.floor(self.height / 2 + self.width / 2 * (hxhy[0] / 2 * 3 ** 0.5 + hxhy[1] * 3 ** 0.5))
-        for j, item in enumerate(self.quad_max_xs):
-            for i in range(item):
-                self.img.putpixel((shift_x + i, shift_y + j), rgb)
-                self.img.putpixel((shift_x - i, shift_y + j), rgb)
-                self.img.putpixel((shift_x - i, shift_y - j), rgb)
-                self.img.putpixel((shift_x + i, shift_y - j), rgb)
+        if self.oob_id > Board.cell_cache_budget:
+            return None
+        return {(hx, hy): tuple(get_neighbor_coords((hx, hy)))
+                for hx in range(self.hex_diag + 1) for hy in range(self.hy_mins[hx], self.hy_maxes[hx] + 1)}
 
-    def save(self):
+    def get_free_grid(self):
         """
-        Saves the current board out as .png.
+        Creates the occupancy grid of an empty board, a dense array indexed by [hx + 1, hy + hy_offset]. The grid
+        carries a one cell fence border, and every grid cell that is not on the board is marked as fence.
 
             **Parameters**
                 self
 
             **Returns**
-                No return
+                occupancy: np.ndarray
+                        Integer grid of FENCE or FREE.
         """
-        # Save out the image to local folder
-        if not self.name.endswith(".png"):
-            self.name += ".png"
-        self.img.save(self.name)
-
+        occupancy = np.full((self.hex_diag + 3, self.hy_maxes[0] - self.hy_mins[-1] + 3), Board.FENCE, dtype=np.int32)
+        for hx in range(self.hex_diag + 1):
+            occupancy[hx + 1, self.hy_mins[hx] + self.hy_offset:self.hy_maxes[hx] + self.hy_offset + 1] = Board.FREE
+        return occupancy
 
-class Ciliate:
-    """
-    Class object holds a single ciliate's information at the level of hexagons. Automatically calculates its next move.
-    """
-    def __init__(self, rgb, hxhy_list, brd):
+    def get_hex_offsets(self):
         """
-        Establishes pertinent self objects for use in the main program.
+        Gets the pixel offsets of a single hexagon from its center, mirrored into all four quadrants.
 
             **Parameters**
-                rgb: tuple
-                        RGB pixel color of the ciliate
-                hxhy_list: list
-                        Current coordinate list of the ciliate
-                brd: Board
-                        Current iteration of the Board
+                self
 
             **Returns**
-                No return
+                dx: np.ndarray
+                        x offset of every pixel of the hexagon.
+                dy: np.ndarray
+                        y offset of every pixel of the hexagon.
         """
-        self.rgb = rgb
-        self.hxhy_list = hxhy_list
-        self.brd = brd
-        self.moved_hxhy_list = self.random_move()
+        offsets = set()
+        for j, item in enumerate(self.quad_max_xs):
+            for i in range(item):
+                offsets.update([(i, j), (-i, j), (-i, -j), (i, -j)])
+        dx, dy = np.array(sorted(offsets)).T
+        return get_read_only_array(dx), get_read_only_array(dy)
 
-    def random_move(self):
+    def get_cell_centers(self, cell_ids):
         """
-        Gets the ciliate's new coordinate list for the next time step via a random but valid move.
+        Works out the pixel centers of an array of cells, from their hexagonal coordinates.
 
             **Parameters**
                 self
+                cell_ids: np.ndarray
+                        Integer cell ids on the board.
 
             **Returns**
-                hypothetical_new_hxhy_list: list: tuple
-                        List of ciliate's new self coordinates.
+                x: np.ndarray
+                        Integer pixel x center of every cell.
+                y: np.ndarray
+                        Integer pixel y center of every cell.
         """
-        # 0: forward, 1: backward, 2: rotate +60, 3: rotate -60
-        move_type = random.choice([0, 0, 0, 0, 0, 0, 1, 1, 2, 3])
-        orientation = self.get_orientation()
-        hypothetical_new_hxhy_list = self.hypothetical_new_hxhy(move_type, orientation)
-        is_valid = self.is_valid_move(hypothetical_new_hxhy_list)
-        if is_valid:
-            return hypothetical_new_hxhy_list
-        else:
-            return self.hxhy_list
+        hx, hy = self.get_cell_coords(cell_ids)
+        x = np.floor(self.width / 2 + self.width / 2 * (hx * 3 / 2)).astype(np.int64)
+        y = np.floor(self.height / 2 + self.width / 2 * (hx / 2 * 3 ** 0.5 + hy * 3 ** 0.5)).astype(np.int64)
+        return x, y
 
-    def get_orientation(self):
+    def get_cell_ids(self, hx, hy):
         """
-        Gets the ciliate's bodily orientation as an index.
+        Gets the dense integer cell ids of arrays of hexagonal coordinates.
 
             **Parameters**
                 self
+                hx: np.ndarray
+                        Integer hx coordinates.
+                hy: np.ndarray
+                        Integer hy coordinates, same shape as hx.
 
             **Returns**
-                int
-                    Orientation index from 0 to 5.
+                np.ndarray
+                    Cell ids, with oob_id for hexagons off the board.
         """
-        # Head is 0: upper left, 1: up, 2: upper right, 3: lower right, 4: down, 5: lower left
-        if self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).up_left:
-            return 0
-        elif self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).up:
-            return 1
-        elif self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).up_right:
-            return 2
-        elif self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).low_right:
-            return 3
-        elif self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).down:
-            return 4
-        elif self.hxhy_list[0] == Neighbors2Hex(self.hxhy_list[1], self.brd).low_left:
-            return 5
+        hx_clipped = np.clip(hx, 0, self.hex_diag)
+        hy_mins = self.hy_min_array[hx_clipped]
+        on_board = (hx == hx_clipped) & (hy >= hy_mins) & (hy <= self.hy_max_array[hx_clipped])
+        cell_ids = self.col_start_array[hx_clipped] + hy - hy_mins
+        return np.where(on_board, cell_ids, self.oob_id).astype(np.int32)
 
-    def hypothetical_new_hxhy(self, move_type, orientation):
+    def get_cell_coords(self, cell_ids):
         """
-        Gets the ciliate's bodily orientation as an index.
+        Gets the hexagonal coordinates of an array of cell ids. The inverse of get_cell_ids().
 
             **Parameters**
                 self
-                move_type: int
-                        Integer from 0 to 3 indicating forward, backward, rotate +/-60
-                orientation: int
-                        Orientation index from 0 to 5.
+                cell_ids: np.ndarray
+                        Integer cell ids on the board.
 
             **Returns**
-                list: tuple
-                        List of hexagonal coordinates laying the new ciliate position
-        """
-        # Get vector from middle to head of ciliate
-        vector_1to0 = (self.hxhy_list[0][0] - self.hxhy_list[1][0], self.hxhy_list[0][1] - self.hxhy_list[1][1])
-        head_will_be_at, mid_will_be_at, tail_will_be_at = (), (), ()
-        # Based on that vector, the move type, and current orientation, get hypothetical new coordinates
-        if move_type == 0:  # Forwards
-            head_will_be_at = (self.hxhy_list[0][0] + vector_1to0[0], self.hxhy_list[0][1] + vector_1to0[1])
-            mid_will_be_at = (self.hxhy_list[1][0] + vector_1to0[0], self.hxhy_list[1][1] + vector_1to0[1])
-            tail_will_be_at = (self.hxhy_list[2][0] + vector_1to0[0], self.hxhy_list[2][1] + vector_1to0[1])
-        elif move_type == 1:  # Backwards
-            head_will_be_at = (self.hxhy_list[0][0] - vector_1to0[0], self.hxhy_list[0][1] - vector_1to0[1])
-            mid_will_be_at = (self.hxhy_list[1][0] - vector_1to0[0], self.hxhy_list[1][1] - vector_1to0[1])
-            tail_will_be_at = (self.hxhy_list[2][0] - vector_1to0[0], self.hxhy_list[2][1] - vector_1to0[1])
-        elif move_type == 2:  # Rotate +60
-            mid_will_be_at = self.hxhy_list[1]
-            if orientation == 0:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_left
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_right
-            elif orientation == 1:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_left
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_right
-            elif orientation == 2:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).down
-            elif orientation == 3:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_right
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_left
-            elif orientation == 4:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_right
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_left
-            elif orientation == 5:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).down
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up
-        elif move_type == 3:  # Rotate -60
-            mid_will_be_at = self.hxhy_list[1]
-            if orientation == 0:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).down
-            elif orientation == 1:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_right
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_left
-            elif orientation == 2:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_right
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_left
-            elif orientation == 3:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).down
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up
-            elif orientation == 4:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_left
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_right
-            elif orientation == 5:
-                head_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).up_left
-                tail_will_be_at = Neighbors2Hex(self.hxhy_list[1], self.brd).low_right
-        return [head_will_be_at, mid_will_be_at, tail_will_be_at]
-
-    def is_valid_move(self, new_hxhy_list):
+                hx: np.ndarray
+                        hx coordinate of each cell.
+                hy: np.ndarray
+                        hy coordinate of each cell.
         """
-        Checks if a move will hit another organism or go off the board.
-
-            **Parameters**
-                self
-                new_hxhy_list: list: tuple
-                        The list of hexagonal coordinates for the new ciliate layout
+        hx = np.searchsorted(self.col_start_array, cell_ids, side='right') - 1
+        hy = cell_ids - self.col_start_array[hx] + self.hy_min_array[hx]
+        return hx, hy
 
-            **Returns**
-                True/False
+    @property
+    def neighbor_table(self):
         """
-        big_list = self.get_list_of_everything_besides_this_ciliate()
-        for hxhy in new_hxhy_list:
-            if hxhy in big_list:
-                return False
-        return True
+        The neighbor table, built on first use. None for boards over Board.cell_cache_budget. See
+        get_neighbor_table().
+        """
+        if self.neighbor_ids is None and self.oob_id <= Board.cell_cache_budget:
+            self.neighbor_ids = self.get_neighbor_table()
+        return self.neighbor_ids
 
-    def get_list_of_everything_besides_this_ciliate(self):
+    def get_neighbor_table(self):
         """
-        Helper function to is_valid_move(). Makes one big list containing the outer boundary fence
-        and the organisms besides this ciliate.
+        Creates the neighbor table. Row i holds the cell ids of the 6 neighbors of cell i in HEX_DIRECTIONS order,
+        with oob_id for neighbors that are off the board, and then i itself. The extra row oob_id leads only to
+        oob_id, so reads of the table can be chained without checking for the edge in between.
 
             **Parameters**
                 self
 
             **Returns**
-                big_list_of_hxhy: list: tuple
-                        List of hex coordinates for all organisms (besides this ciliate) and outer boundary fence.
+                neighbor_table: np.ndarray
+                        Read-only integer array of shape (N_cells + 1, 7).
         """
-        big_list_of_hxhy = self.brd.out_of_bounds
-        if self.brd.organisms is not None:
-            all_organisms = self.brd.organisms
-            for org in all_organisms:
-                big_list_of_hxhy.extend(org.hxhy_list)
-            for hxhy in self.hxhy_list:
-                if hxhy in big_list_of_hxhy:
-                    big_list_of_hxhy.remove(hxhy)
-        return big_list_of_hxhy
+        cell_ids = np.arange(self.oob_id)
+        hx, hy = self.get_cell_coords(cell_ids)
+        neighbor_table = np.full((self.oob_id + 1, 7), self.oob_id, dtype=np.int32)
+        for i, (dx, dy) in enumerate(HEX_DIRECTIONS):
+            neighbor_table[:-1, i] = self.get_cell_ids(hx + dx, hy + dy)
+        neighbor_table[:-1, 6] = cell_ids
+        neighbor_table.flags.writeable = False
+        return neighbor_table
 
 
-class Amoeba:
+class Board:
     """
-    Class object holds the amoeba's information at the level of hexagons. Automatically calculates its next move.
+    Class object holds information for the board layout. Persists across time steps. Organism moves only update
+    cell states and occupancy, and pixels are painted lazily, just for the hexagons that changed since the last frame.
+    Pixels are 8-bit palette indexes, so a frame costs one byte per pixel until it reaches the video encoder.
     """
-    def __init__(self, rgb, hxhy_list, brd):
+    # Occupancy grid values. Any other value is the index of the owning organism in self.organisms.
+    FENCE, FREE = -2, -1
+    # Memory budgets for large boards. Boards with more cells than cell_cache_budget skip the per-cell neighbor cache
+    # and work out neighbors arithmetically. Frames or tiles bigger than frame_pixel_budget pixels are refused.
+    cell_cache_budget = 250000
+    frame_pixel_budget = 2 ** 24
+    # Serial numbers telling boards apart in frame keys, see get_frame_key()
+    frame_serials = itertools.count()
+
+    def __init__(self, hex_diag, width, name, organisms, viewport=None):
         """
-        Establishes pertinent self objects for use by the main program.
+        Establishes pertinent self objects for use in the main program.
 
             **Parameters**
-                rgb: tuple
-                        RGB pixel color of the amoeba
-                hxhy_list: list
-                        Current coordinate list of the amoeba.
-                brd: Board
-                        Current iteration of the Board
+                hex_diag: int
+                        The user specified number of hexagons across the diagonal of the board
+                width: int
+                        The user specified pixel width of a single hexagon
+                name: str
+                        Current name of the board including file path.
+                organisms: list: Ciliate, Amoeba
+                        List of 4 Ciliate objects followed by 1 Amoeba object at the start of the simulation.
+                viewport: tuple
+                        Optional pixel window (x0, y0, width, height) of the board to render frames of.
+                        The whole board is rendered if not given.
 
             **Returns**
                 No return
         """
-        self.rgb = rgb
-        self.hxhy_list = hxhy_list
-        self.brd = brd
-        self.perimeter_hxhy_list = self.get_perimeter()
-        self.fingertips_hxhy_list, self.necks_hxhy_list, self.base_hxhy_list = self.get_fngr_neck_base()
-        self.reduced_p_hxhy_list = self.get_reduced_perimeter()
-        self.moved_hxhy_list = self.random_move()
+        self.hex_diag, self.width, self.name, self.organisms = hex_diag, width, name, organisms
+        # Everything that depends only on the board size is worked out once and shared by every board of that size
+        self.geometry = get_board_geometry(hex_diag, width)
+        self.use_geometry()
+        self.viewport = tuple(viewport) if viewport is not None else (0, 0, self.px_max, self.py_max)
+        # Pixels are not allocated until a frame is asked for, so a headless board never pays for rendering.
+        self.label_map, self.cell_pixel_order, self.raster_cells, self.cell_pixel_starts = None, None, None, None
+        self.pixel_buffer, self.dirty_cells = None, []
+        # Frame keys are the board's serial and a count of the frames that differ from the one before. Once a key is
+        # asked for, every change of a cell state is kept with the state it replaced. See get_frame_key().
+        self.frame_serial, self.frame_version, self.frame_changes = next(Board.frame_serials), 0, None
+        # Palette index 0 is the white background. Cell states are palette indexes, with one extra background cell.
+        self.palette = [(255, 255, 255)]
+        self.cell_state = np.zeros(self.oob_id + 1, dtype=np.uint8)
+        self.occupancy = self.geometry.free_grid.copy()
+        # Stale moves can briefly stack two organisms on one hexagon. Those cells keep their full owner set here.
+        self.stacked = {}
+        # Counts the pixels painted. Simulations swap in their own RunStats.
+        self.stats = RunStats(enabled=False)
+        if self.organisms is None:
+            pass
+        else:
+            for i, org in enumerate(self.organisms):
+                for hxhy in org.hxhy_list:
+                    if hxhy:
+                        self.add_owner(hxhy, i)
+                        self.paint_pixels_of_hex(self.organisms[self.owner_of(hxhy)].rgb, hxhy)
 
-    def get_perimeter(self):
+    @property
+    def out_of_bounds(self):
         """
-        Creates a list of the amoeba's perimeter hexagon coordinates.
+        The hexagonal coordinates of the fence bordering the board. See BoardGeometry.get_oob().
+        """
+        return self.geometry.out_of_bounds
+
+    @property
+    def frame_size(self):
+        """
+        The (width, height) in pixels of the frames this board renders.
+        """
+        return self.viewport[2], self.viewport[3]
+
+    def use_geometry(self):
+        """
+        Points the board's size dependent values at its shared geometry. See BoardGeometry.
 
             **Parameters**
                 self
 
             **Returns**
-                perimeter_hxhy_list: list: tuple
-                        List of hexagonal coordinates that have an empty neighbor.
+                No return
         """
-        perimeter_hxhy_list = []
-        for hxhy in self.hxhy_list:
-            for neigh_hxhy in Neighbors2Hex(hxhy, self.brd).neighbors:
-                if neigh_hxhy not in self.hxhy_list:
-                    perimeter_hxhy_list.append(hxhy)
-                    break
-        return perimeter_hxhy_list
+        geometry = self.geometry
+        self.height, self.midpoint = geometry.height, geometry.midpoint
+        self.hy_maxes, self.hy_mins, self.quad_max_xs = geometry.hy_maxes, geometry.hy_mins, geometry.quad_max_xs
+        self.px_max, self.py_max = geometry.px_max, geometry.py_max
+        self.col_starts, self.oob_id, self.hy_offset = geometry.col_starts, geometry.oob_id, geometry.hy_offset
+        self.neighbor_cache = geometry.neighbor_cache
 
-    def get_fngr_neck_base(self):
+    def get_cell_id(self, hxhy):
         """
-        Creates a list of the amoeba's fingertip hexagon coordinates.
+        Gets the dense integer cell id of a hexagon.
 
             **Parameters**
                 self
+                hxhy: tuple
+                        Hexagonal coordinate pair of interest.
 
             **Returns**
-                fingertips: list: tuple
-                        List of hexagonal coordinates that have only one self neighbor.
-                necks: list: tuple
-                        List of hexagonal coordinates that are necks in amoeba appendages.
-                bases: list: tuple
-                        List of hexagonal coordinates that join amoeba appendages to the main body.
+                int
+                    Cell id of the hexagon, or None if it is off the board.
         """
-        # Scan perimeter hexagons to see if they are fingertips, neck pieces, or the bases of necks
-        fingertips, necks, bases = [], [], []
-        for hxhy in self.perimeter_hxhy_list:
-            p_neigh_count = 0  # peripheral neighbors
-            b_neigh_count = 0  # body neighbors
-            for neigh_hxhy in Neighbors2Hex(hxhy, self.brd).neighbors:
-                if neigh_hxhy in self.perimeter_hxhy_list:
-                    p_neigh_count += 1
-                if neigh_hxhy not in self.perimeter_hxhy_list and neigh_hxhy in self.hxhy_list:
-                    b_neigh_count += 1
-            fingertips, necks, bases = self.append_fngr_neck_base(
-                hxhy, fingertips, necks, bases, p_neigh_count, b_neigh_count)
-        return fingertips, necks, bases
+        hx, hy = hxhy
+        if 0 <= hx <= self.hex_diag and self.hy_mins[hx] <= hy <= self.hy_maxes[hx]:
+            return self.col_starts[hx] + hy - self.hy_mins[hx]
+        return None
 
-    def append_fngr_neck_base(self, hxhy, fingertips, necks, bases, p_neigh_count, b_neigh_count):
+    def get_cell_ids(self, hx, hy):
         """
-        Helper function of get_fngr_neck_base(). Appends lists based on neighbor index classifications.
+        Vectorized get_cell_id() over arrays of hexagonal coordinates.
 
             **Parameters**
                 self
-                hxhy: tuple
-                        Hexagonal coordinate of the amoeba piece of interest
-                fingertips: list
-                        An empty list to be appended to.
-                necks: list
-                        An empty list to be appended to.
-                bases: list
-                        An empty list to be appended to.
-                p_neigh_count: int
-                        The number of neighbors to hxhy that are in the amoeba's perimeter list
-                b_neigh_count: int
-                        The number of neighbors to hxhy that are in the amoeba's internal body space.
+                hx: np.ndarray
+                        Integer hx coordinates.
+                hy: np.ndarray
+                        Integer hy coordinates, same shape as hx.
 
             **Returns**
-                fingertips: list: tuple
-                        List of hexagonal coordinates that have only one self neighbor.
-                necks: list: tuple
-                        List of hexagonal coordinates that are necks in amoeba appendages.
-                bases: list: tuple
-                        List of hexagonal coordinates that join amoeba appendages to the main body.
+                np.ndarray
+                    Cell ids, with oob_id for hexagons off the board.
         """
-        # Analyze neighbor counts (peripheral and body) to cover all possible morphologies and append accordingly.
-        if p_neigh_count == 1 and b_neigh_count == 0:
-            fingertips.append(hxhy)
-        elif p_neigh_count == 2 and b_neigh_count == 0:
-            # Can be a link in a skinny (neck)
-            # Can be a wart on a wall (pass)
-            is_wart = self.test_is_wart(hxhy)
-            if not is_wart:
-                necks.append(hxhy)
-        elif p_neigh_count == 3 and b_neigh_count == 0:
-            # Can be in the crux of a 'Y' (pass)
-            # Can be (base)
-            is_crux_of_y = self.test_is_crux_of_y(hxhy)
-            if not is_crux_of_y:
-                bases.append(hxhy)
-        elif p_neigh_count == 3 and b_neigh_count == 1:
-            # Can be mid of a side near a corner (pass)
-            # Can be (base)
-            is_3_to_1_base = self.test_is_3_to_1(hxhy)
-            if is_3_to_1_base:
-                bases.append(hxhy)
-        elif p_neigh_count == 4 and b_neigh_count == 0:
-            # Can be the center of a dog bone (base)
-            # Can be the top stem piece of a mushroom (3-to-1) (base)
-            # or the middle-edge piece of a small triangle (pass)
-            is_dog_bone = self.test_is_dog_bone(hxhy)
-            is_3_to_1_base = self.test_is_3_to_1(hxhy)
-            if is_dog_bone:
-                necks.append(hxhy)
-            elif is_3_to_1_base:
-                bases.append(hxhy)
-        return fingertips, necks, bases
+        return self.geometry.get_cell_ids(hx, hy)
 
-    def test_is_wart(self, hxhy):
+    def get_cell_coords(self, cell_ids):
         """
-        Helper function of append_fngr_neck_base(). Checks if hxhy is a wart case.
+        Gets the hexagonal coordinates of an array of cell ids. The inverse of get_cell_ids().
 
             **Parameters**
                 self
-                hxhy: tuple
-                        Hexagonal coordinate of the amoeba piece of interest
+                cell_ids: np.ndarray
+                        Integer cell ids on the board.
 
             **Returns**
-                True/False
+                hx: np.ndarray
+                        hx coordinate of each cell.
+                hy: np.ndarray
+                        hy coordinate of each cell.
         """
-        # The two neighbors of a wart are right next to each other.
-        indexes = []
-        for i, neigh_hxhy in enumerate(Neighbors2Hex(hxhy, self.brd).neighbors):
-            if neigh_hxhy in self.hxhy_list:
-                indexes.append(i)
-        if abs(indexes[0] - indexes[1]) == 1 or abs(indexes[0] - indexes[1]) == 5:
-            return True
-        return False
+        return self.geometry.get_cell_coords(cell_ids)
 
-    def test_is_crux_of_y(self, hxhy):
+    @property
+    def neighbor_table(self):
         """
-        Helper function of append_fngr_neck_base(). Checks if hxhy is a crux case.
+        The board's table of neighbor cell ids, shared by boards of its size. None for boards over
+        cell_cache_budget. See BoardGeometry.get_neighbor_table().
+        """
+        return self.geometry.neighbor_table
+
+    def get_neighbors(self, hxhy):
+        """
+        Gets the 6 neighboring hexagonal coordinates of a hexagon in HEX_DIRECTIONS order. Board cells read the
+        neighbor cache when the board has one. Everything else falls back to coordinate arithmetic.
 
             **Parameters**
                 self
                 hxhy: tuple
-                        Hexagonal coordinate of the amoeba piece of interest
+                        Hexagonal coordinate pair of interest.
 
             **Returns**
-                True/False
+                tuple: tuple
+                        Hexagonal coordinates neighboring the center point.
         """
-        # The three neighbors of a Y-crux are all right next to each other.
-        indexes = []
-        for i, neigh_hxhy in enumerate(Neighbors2Hex(hxhy, self.brd).neighbors):
-            if neigh_hxhy in self.hxhy_list:
-                indexes.append(i)
-        diff1 = abs(indexes[0] - indexes[1])
-        diff2 = abs(indexes[1] - indexes[2])
-        if diff1 == 1 or diff1 == 5:
-            if diff2 == 1 or diff2 == 5:
-                return True
-        return False
+        if self.neighbor_cache is not None:
+            neighbors = self.neighbor_cache.get(hxhy)
+            if neighbors is not None:
+                return neighbors
+        return tuple(get_neighbor_coords(hxhy))
 
-    def test_is_3_to_1(self, hxhy):
+    def owner_of(self, hxhy):
         """
-        Helper function of append_fngr_neck_base(). Checks if hxhy is a 3_to_1 base case.
+        Looks up who owns a hexagon.
 
             **Parameters**
                 self
                 hxhy: tuple
-                        Hexagonal coordinate of the amoeba piece of interest
+                        Hexagonal coordinate pair of interest.
 
             **Returns**
-                True/False
+                int
+                    Board.FENCE if off the board, Board.FREE if empty, otherwise the index of the owning organism.
         """
-        # The 4 neighbors of a 3-to-1 base have a -0-1-2-gap-4-gap- pattern. Easier to index the gaps instead.
-        indexes = []
-        for i, neigh_hxhy in enumerate(Neighbors2Hex(hxhy, self.brd).neighbors):
-            if neigh_hxhy not in self.hxhy_list:
-                indexes.append(i)
-        if abs(indexes[0] - indexes[1]) == 2 or abs(indexes[0] - indexes[1]) == 4:
-            return True
-        return False
+        gx, gy = hxhy[0] + 1, hxhy[1] + self.hy_offset
+        if 0 <= gx < self.occupancy.shape[0] and 0 <= gy < self.occupancy.shape[1]:
+            return int(self.occupancy[gx, gy])
+        return Board.FENCE
 
-    def test_is_dog_bone(self, hxhy):
+    def is_free(self, hxhy):
         """
-        Helper function of append_fngr_neck_base(). Checks if hxhy is a dog bone case.
+        Checks if a hexagon is on the board and not owned by any organism.
 
             **Parameters**
                 self
                 hxhy: tuple
-                        Hexagonal coordinate of the amoeba piece of interest
+                        Hexagonal coordinate pair of interest.
 
             **Returns**
                 True/False
         """
-        # The 4 neighbors of a dog bone base have a -0-1-gap-3-4-gap- pattern. Easier to index the gaps instead.
-        indexes = []
-        for i, neigh_hxhy in enumerate(Neighbors2Hex(hxhy, self.brd).neighbors):
-            if neigh_hxhy not in self.hxhy_list:
-                indexes.append(i)
-        if abs(indexes[0] - indexes[1]) == 3:
-            return True
-        return False
+        return self.owner_of(hxhy) == Board.FREE
 
-    def get_reduced_perimeter(self):
+    def get_free_mask(self, hx, hy):
         """
-        Helper function of append_fngr_neck_base(). Checks if hxhy is a dog bone case.
+        Vectorized is_free() over arrays of hexagonal coordinates.
 
             **Parameters**
                 self
+                hx: np.ndarray
+                hy: np.ndarray
 
             **Returns**
-                reduced_perimeter_hxhy_list: list: tuple
-                        List of amoeba's perimeter hexagons but with narrow necks removed
+                np.ndarray
+                    Boolean mask of the hexagons that are on the board and not owned by any organism.
         """
-        # get perimeter list but with narrow points removed. Leave the fingertips in the list.
-        reduced_perimeter_hxhy_list = self.perimeter_hxhy_list.copy()
-        for hxhy in self.perimeter_hxhy_list:
-            # Keep the meat touchers that are not neck bases. Keep the fingertips. Delete the rest of the necks.
-            if hxhy in self.necks_hxhy_list or hxhy in self.base_hxhy_list:
-                reduced_perimeter_hxhy_list.remove(hxhy)
-        return reduced_perimeter_hxhy_list
+        gx, gy = hx + 1, hy + self.hy_offset
+        in_grid = (gx >= 0) & (gx < self.occupancy.shape[0]) & (gy >= 0) & (gy < self.occupancy.shape[1])
+        is_free = in_grid & (self.occupancy[np.where(in_grid, gx, 0), np.where(in_grid, gy, 0)] == Board.FREE)
+        return is_free
 
-    def random_move(self):
+    def owners_of(self, hxhy):
         """
-        Gets the amoeba's new coordinate list for the next time step via a random but valid move.
+        Lists every organism covering a hexagon. Usually one, but a stale move can stack two organisms.
 
             **Parameters**
                 self
+                hxhy: tuple
+                        Hexagonal coordinate pair of interest.
 
             **Returns**
-                hypothetical_new_hxhy_list: list: tuple
-                        List of amoeba's new self coordinates.
-        """
-        is_valid, hex_to_add, hex_to_remove = False, (0, 0), (0, 0)
-        while not is_valid:
-            # Randomly select from the reduced perimeter list for the move
-            hex_chosen = self.perimeter_hxhy_list[random.randint(0, len(self.perimeter_hxhy_list) - 1)]
-            # Choose random non-self neighbor to that hexagon to lay as new
-            hex_to_add = self.get_added_hex(hex_chosen)
-            if hex_to_add == (-1, 0):
-                continue
-            # Find the farthest hex in the amoeba to be removed
-            hex_to_remove = self.get_farthest_perimeter_hex(hex_to_add)
-            # Check that the hex to add won't land out of bounds or on another organism
-            is_valid = self.is_valid_move(hex_to_add)
-            if not is_valid:
-                print('Invalid move, trying again...')
-        hypothetical_new_hxhy_list = self.hxhy_list.copy()
-        hypothetical_new_hxhy_list.append(hex_to_add)
-        hypothetical_new_hxhy_list.remove(hex_to_remove)
-        return hypothetical_new_hxhy_list
+                list: int
+                        Organism indexes covering the hexagon. [Board.FENCE] if off the board.
+        """
+        if hxhy in self.stacked:
+            return sorted(self.stacked[hxhy])
+        owner = self.owner_of(hxhy)
+        if owner == Board.FREE:
+            return []
+        return [owner]
+
+    def get_owner_counts(self, cell_ids):
+        """
+        Vectorized len(owners_of()) over an array of cell ids.
+
+            **Parameters**
+                self
+                cell_ids: np.ndarray
+                        Integer cell ids. Ids of oob_id count as having no owner, so check them separately.
+
+            **Returns**
+                np.ndarray
+                    Number of organisms covering each cell.
+        """
+        on_board = cell_ids < self.oob_id
+        hx, hy = self.get_cell_coords(np.where(on_board, cell_ids, 0))
+        counts = np.where(on_board, self.occupancy[hx + 1, hy + self.hy_offset] >= 0, 0).astype(np.int32)
+        for hxhy, owners in self.stacked.items():
+            counts[cell_ids == self.get_cell_id(hxhy)] = len(owners)
+        return counts
 
-    def get_added_hex(self, hxhy):
+    def add_owner(self, hxhy, index):
         """
-        Helper function to random_move(). Determines the new hexagon to add to the amoeba body.
-        Based on the chosen perimeter hexagon.
+        Marks a board hexagon as covered by an organism. The highest organism index is kept on top, matching the
+        order organisms are painted in.
 
             **Parameters**
                 self
                 hxhy: tuple
-                        Amoeba self perimeter hexagon chosen at random.
+                        Hexagonal coordinate pair on the board.
+                index: int
+                        Index of the organism in self.organisms.
 
             **Returns**
-                random.choice: list: tuple
-                        Random choice of valid empty neighbors to the chosen self perimeter hex.
+                No return
         """
-        # From this self-perimeter hex, find empty neighbors. Check that these empty neighbors are not in a
-        # "base" position (dogbone, 3_to_1, non-crux of Y, non-wart) based on their number of self-perimeter neighbors.
-        empty_neighbors = []
-        for neigh_hxhy in Neighbors2Hex(hxhy, self.brd).neighbors:
-            if neigh_hxhy not in self.hxhy_list:
-                p_neigh_count = 0
-                for neigh_neigh_hxhy in Neighbors2Hex(neigh_hxhy, self.brd).neighbors:
-                    if neigh_neigh_hxhy in self.perimeter_hxhy_list:
-                        p_neigh_count += 1
-                if p_neigh_count == 2:
-                    # Could create a wart or a neck
-                    creates_wart = self.test_is_wart(neigh_hxhy)
-                    if creates_wart:
-                        empty_neighbors.append(neigh_hxhy)
-                elif p_neigh_count == 3:
-                    # Could fill in the crux-of-a-Y or create a base
-                    fills_in_crux = self.test_is_crux_of_y(neigh_hxhy)
-                    if fills_in_crux:
-                        empty_neighbors.append(neigh_hxhy)
-                elif p_neigh_count == 4:
-                    # Could create a dogbone or 3_to_1 base scenario and should be skipped.
-                    creates_dogbone = self.test_is_dog_bone(neigh_hxhy)
-                    creates_3_to_1 = self.test_is_dog_bone(neigh_hxhy)
-                    if not creates_dogbone and not creates_3_to_1:
-                        empty_neighbors.append(neigh_hxhy)
-                else:
-                    empty_neighbors.append(neigh_hxhy)
-        # If empty_neighbors is empty then the chosen hex doesn't have empty neighbors that are valid moves.
-        # Just send it off the board to (-1, 0) to be caught by the is_valid checker.
-        if len(empty_neighbors) == 0:
-            invalid_point = (-1, 0)
-            return invalid_point
-        return random.choice(empty_neighbors)
+        gx, gy = hxhy[0] + 1, hxhy[1] + self.hy_offset
+        current = self.occupancy[gx, gy]
+        if current == Board.FREE:
+            self.occupancy[gx, gy] = index
+        else:
+            owners = self.stacked.setdefault(hxhy, {int(current)})
+            owners.add(index)
+            self.occupancy[gx, gy] = max(owners)
 
-    def get_farthest_perimeter_hex(self, center_hex):
+    def remove_owner(self, hxhy, index):
         """
-        Helper function to random_move(). Checks larger and larger concentric rings around a centerpoint.
-        Checks until the outer ring shows up empty for reduced_perimeter coordinates. Will only choose a fingertip
-        if only fingertips to choose from in the selected ring. Selects randomly from the larger half of the
-        valid list of rings.
+        Removes an organism from a board hexagon, leaving it free unless another organism is stacked on it.
 
             **Parameters**
                 self
-                center_hex: tuple
-                        The hexagon being added to the amoeba.
+                hxhy: tuple
+                        Hexagonal coordinate pair on the board.
+                index: int
+                        Index of the organism in self.organisms.
+
+            **Returns**
+                No return
+        """
+        gx, gy = hxhy[0] + 1, hxhy[1] + self.hy_offset
+        if hxhy in self.stacked:
+            owners = self.stacked[hxhy]
+            owners.discard(index)
+            self.occupancy[gx, gy] = max(owners)
+            if len(owners) == 1:
+                del self.stacked[hxhy]
+        else:
+            self.occupancy[gx, gy] = Board.FREE
+
+    def get_raster(self):
+        """
+        Gets the pixel label image of the board viewport, building and caching it on first use.
+        Each pixel holds the id of the cell it belongs to. Background pixels hold the extra cell id N.
+
+            **Parameters**
+                self
+
+            **Returns**
+                label_map: np.ndarray
+                        Integer array of shape (height, width) of the viewport mapping pixels to cell ids.
+                pixel_order: np.ndarray
+                        Flat pixel indexes sorted by cell id.
+                raster_cells: np.ndarray
+                        Sorted ids of the cells that have pixels in the viewport, background last.
+                pixel_starts: np.ndarray
+                        Start of each raster cell's run in pixel_order. raster_cells[k] owns
+                        pixel_order[starts[k]:starts[k + 1]].
+        """
+        # Label maps depend only on the board size and viewport, so they are kept on the shared geometry
+        rasters = self.geometry.rasters
+        if self.viewport in rasters:
+            rasters.move_to_end(self.viewport)
+        else:
+            label_map = self.rasterize_cells(self.viewport)
+            # Frames are capped at frame_pixel_budget pixels, so pixel indexes fit in int32
+            pixel_order = np.argsort(label_map, axis=None, kind="stable").astype(np.int32)
+            sorted_labels = label_map.ravel()[pixel_order]
+            pixel_starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_labels)) + 1, [sorted_labels.size]))
+            raster = (label_map, pixel_order, sorted_labels[pixel_starts[:-1]], pixel_starts)
+            for array in raster:
+                array.flags.writeable = False
+            rasters[self.viewport] = raster
+            # Keep only the most recently used viewports of this board size
+            while len(rasters) > BoardGeometry.raster_cache_size:
+                rasters.popitem(last=False)
+        return rasters[self.viewport]
+
+    def rasterize_cells(self, window):
+        """
+        Helper function to get_raster(). Stamps the pixel footprint of a hexagon onto the center of every cell
+        in a pixel window, a block of cells at a time to bound memory.
+
+            **Parameters**
+                self
+                window: tuple
+                        Pixel window (x0, y0, width, height) of the board.
+
+            **Returns**
+                label_map: np.ndarray
+                        Integer array of shape (height, width) mapping pixels to cell ids.
+        """
+        x0, y0, frame_w, frame_h = window
+        if frame_w * frame_h > Board.frame_pixel_budget:
+            raise ValueError('A ' + str(frame_w) + ' x ' + str(frame_h) + ' frame is over the frame pixel budget of '
+                             + str(Board.frame_pixel_budget) + '. Render a viewport or save tiles instead.')
+        dx, dy = self.geometry.hex_offsets
+        label_map = np.full((frame_h, frame_w), self.oob_id, dtype=np.int32)
+        cell_ids = self.get_window_cells(window)
+        for start in range(0, len(cell_ids), 4096):
+            ids = cell_ids[start:start + 4096]
+            # Pixel centers of the block's cells only, relative to the window
+            center_x, center_y = self.geometry.get_cell_centers(ids)
+            shift_x, shift_y = center_x - x0, center_y - y0
+            px, py = shift_x[:, None] + dx[None, :], shift_y[:, None] + dy[None, :]
+            inside = (px >= 0) & (px < frame_w) & (py >= 0) & (py < frame_h)
+            label_map[py[inside], px[inside]] = np.broadcast_to(ids[:, None], px.shape)[inside]
+        return label_map
+
+    def get_window_cells(self, window):
+        """
+        Helper function to rasterize_cells(). Gets the ids of the cells whose footprint can reach a pixel window,
+        in cell id order so overlapping edge pixels come out the same as on a full frame.
+
+            **Parameters**
+                self
+                window: tuple
+                        Pixel window (x0, y0, width, height) of the board.
+
+            **Returns**
+                np.ndarray
+                    Sorted cell ids.
+        """
+        x0, y0, frame_w, frame_h = window
+        # Cell centers step 3/4 of a width across and one height down, so pad the window by a hexagon each way
+        hx_lo = max(0, math.floor((x0 - 2 * self.width) / (0.75 * self.width)))
+        hx_hi = min(self.hex_diag, math.ceil((x0 + frame_w + self.width) / (0.75 * self.width)))
+        columns = []
+        for hx in range(hx_lo, hx_hi + 1):
+            hy_lo = math.floor((y0 - 2 * self.height) / self.height - hx / 2)
+            hy_hi = math.ceil((y0 + frame_h + self.height) / self.height - hx / 2)
+            hy_lo, hy_hi = max(hy_lo, self.hy_mins[hx]), min(hy_hi, self.hy_maxes[hx])
+            if hy_lo <= hy_hi:
+                columns.append(np.arange(hy_lo, hy_hi + 1) + self.col_starts[hx] - self.hy_mins[hx])
+        if not columns:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(columns)
+
+    def get_palette_index(self, rgb):
+        """
+        Gets the palette index of a color, adding the color to the board palette if it is new. Cell states and
+        pixels are uint8, so the palette holds at most 256 colors.
+
+            **Parameters**
+                self
+                rgb: tuple
+                        Tuple of RGB integers
+
+            **Returns**
+                int
+                    Index of the color in self.palette.
+        """
+        if rgb not in self.palette:
+            if len(self.palette) == 256:
+                raise ValueError('The board palette is full: ' + str(rgb) + ' would be its 257th color')
+            self.palette.append(rgb)
+        return self.palette.index(rgb)
+
+    def paint_pixels_of_hex(self, rgb, hxhy):
+        """
+        Paints a single hexagon on the board by setting its cell state. Pixels are filled in by render().
+
+            **Parameters**
+                self
+                rgb: tuple
+                        Tuple of RGB integers for the hexagon
+                hxhy: tuple
+                        Tuple of the hexagon's hexagonal coordinates on the board.
+
+            **Returns**
+                No return
+        """
+        self.set_cell_states([self.get_cell_id(hxhy)], self.get_palette_index(rgb))
+
+    def set_cell_states(self, cell_ids, states):
+        """
+        Sets the states of cells and marks them for repainting.
+
+            **Parameters**
+                self
+                cell_ids: list: int
+                        Ids of the cells to set.
+                states: np.ndarray
+                        New palette index of each cell, or one for all of them.
+
+            **Returns**
+                No return
+        """
+        cell_ids = np.asarray(cell_ids, dtype=np.int64)
+        if self.frame_changes is not None:
+            self.frame_changes.append((cell_ids, self.cell_state[cell_ids]))
+        self.cell_state[cell_ids] = states
+        if self.pixel_buffer is not None:
+            self.dirty_cells.extend(cell_ids.tolist())
+
+    def get_pixels(self):
+        """
+        Brings the pixel buffer up to date and returns it. The first call renders the whole board. Later calls
+        repaint only the cells that changed since the previous call, or the whole board if most of it changed.
+
+            **Parameters**
+                self
+
+            **Returns**
+                np.ndarray
+                    Palette index pixel buffer of shape (py_max, px_max).
+        """
+        if self.pixel_buffer is None:
+            self.label_map, self.cell_pixel_order, self.raster_cells, self.cell_pixel_starts = self.get_raster()
+            self.pixel_buffer = self.render()
+            self.stats.count('pixels_painted', self.pixel_buffer.size)
+        elif len(self.dirty_cells) > len(self.raster_cells) // 4:
+            self.pixel_buffer = self.render()
+            self.stats.count('pixels_painted', self.pixel_buffer.size)
+        else:
+            self.repaint_cells(set(self.dirty_cells))
+        self.dirty_cells = []
+        return self.pixel_buffer
+
+    @property
+    def pixels(self):
+        """
+        The up to date pixel buffer. See get_pixels().
+        """
+        return self.get_pixels()
+
+    def render(self):
+        """
+        Renders the whole board in one gather of cell states over the label map.
+
+            **Parameters**
+                self
+
+            **Returns**
+                np.ndarray
+                    Palette index pixel buffer of shape (py_max, px_max).
+        """
+        return self.cell_state[self.label_map]
+
+    def get_palette_array(self):
+        """
+        Gets the board palette as an array for converting palette indexes to RGB.
+
+            **Parameters**
+                self
+
+            **Returns**
+                np.ndarray
+                    uint8 array of shape (n_colors, 3).
+        """
+        return np.array(self.palette, dtype=np.uint8)
+
+    def get_frame_key(self):
+        """
+        Gets a key of the frame the board would render. Boards with equal keys render equal frames. Only the cells
+        whose state changed since the previous key are looked at: the key moves on if any of them is in the viewport
+        and now differs from its state at the previous key. Palette colors are never changed once added.
+
+            **Parameters**
+                self
+
+            **Returns**
+                tuple
+                    The board's serial and frame version.
+        """
+        if self.frame_changes is None:
+            self.frame_changes = []
+        elif len(self.frame_changes) > 0:
+            cell_ids = np.concatenate([ids for ids, old_states in self.frame_changes])
+            old_states = np.concatenate([old_states for ids, old_states in self.frame_changes])
+            # The first change of each cell holds its state at the previous key
+            cell_ids, first = np.unique(cell_ids, return_index=True)
+            changed = cell_ids[old_states[first] != self.cell_state[cell_ids]]
+            if self.raster_cells is not None and len(changed) > 0:
+                runs = np.minimum(np.searchsorted(self.raster_cells, changed), len(self.raster_cells) - 1)
+                changed = changed[self.raster_cells[runs] == changed]
+            self.frame_version += len(changed) > 0
+            self.frame_changes = []
+        return self.frame_serial, self.frame_version
+
+    def repaint_cells(self, cell_ids):
+        """
+        Repaints only the given cells on the existing pixel buffer from their current cell states. Cells outside
+        the viewport are skipped.
+
+            **Parameters**
+                self
+                cell_ids: list: int
+                        Ids of the cells whose state changed.
+
+            **Returns**
+                No return
+        """
+        if len(cell_ids) == 0:
+            return
+        flat_pixels = self.pixel_buffer.reshape(-1)
+        cell_ids = np.fromiter(cell_ids, dtype=np.int64, count=len(cell_ids))
+        runs = np.minimum(np.searchsorted(self.raster_cells, cell_ids), len(self.raster_cells) - 1)
+        in_view = self.raster_cells[runs] == cell_ids
+        if self.stats.enabled:
+            self.stats.count('pixels_painted', np.sum(self.cell_pixel_starts[runs[in_view] + 1]
+                                                      - self.cell_pixel_starts[runs[in_view]]))
+        for cell_id, k in zip(cell_ids[in_view], runs[in_view]):
+            pixel_idx = self.cell_pixel_order[self.cell_pixel_starts[k]:self.cell_pixel_starts[k + 1]]
+            flat_pixels[pixel_idx] = self.cell_state[cell_id]
+
+    def apply_move(self, index, vacated, occupied):
+        """
+        Applies one organism move to the board as a delta. Updates the occupancy grid and marks only the
+        hexagons that changed for repainting, each in the color of the organism now on top of it.
+
+            **Parameters**
+                self
+                index: int
+                        Index of the organism in self.organisms.
+                vacated: list: tuple
+                        Hexagonal coordinates the organism left.
+                occupied: list: tuple
+                        Hexagonal coordinates the organism moved into.
+
+            **Returns**
+                No return
+        """
+        for hxhy in vacated:
+            self.remove_owner(hxhy, index)
+        for hxhy in occupied:
+            self.add_owner(hxhy, index)
+        for hxhy in [*vacated, *occupied]:
+            owner = self.owner_of(hxhy)
+            if owner == Board.FREE:
+                self.set_cell_states([self.get_cell_id(hxhy)], 0)
+            else:
+                self.paint_pixels_of_hex(self.organisms[owner].rgb, hxhy)
+
+    def update_organism(self, index, org, vacated, occupied):
+        """
+        Replaces an organism on the board with its moved version and applies its move delta.
+
+            **Parameters**
+                self
+                index: int
+                        Index of the organism in self.organisms.
+                org: Ciliate, Amoeba
+                        The organism at its new position.
+                vacated: list: tuple
+                        Hexagonal coordinates the organism left.
+                occupied: list: tuple
+                        Hexagonal coordinates the organism moved into.
+
+            **Returns**
+                No return
+        """
+        self.organisms[index] = org
+        self.apply_move(index, vacated, occupied)
+
+    def apply_moves(self, moves):
+        """
+        Applies a batch of conflict-free moves at once. Every hexagon a move occupies must be free beforehand, so
+        the batch can be written straight into the occupancy grid without any stacking.
+
+            **Parameters**
+                self
+                moves: list: tuple
+                        (organism index, vacated, occupied) of each move.
+
+            **Returns**
+                No return
+        """
+        if len(self.stacked) > 0:
+            # Organisms laid out on top of each other need the owner bookkeeping of apply_move()
+            for index, vacated, occupied in moves:
+                self.apply_move(index, vacated, occupied)
+            return
+        vacated = [hxhy for index, vacated, occupied in moves for hxhy in vacated]
+        occupied = [hxhy for index, vacated, occupied in moves for hxhy in occupied]
+        owners = np.array([index for index, vacated, occupied in moves for _ in occupied], dtype=np.int32)
+        # Vacated hexagons are cleared first. No move in the batch claims a hexagon another one leaves.
+        for hxhys, new_owners in ((vacated, Board.FREE), (occupied, owners)):
+            hx, hy = np.array(hxhys, dtype=np.int64).reshape(-1, 2).T
+            self.occupancy[hx + 1, hy + self.hy_offset] = new_owners
+        self.paint_moves(moves)
+
+    def paint_moves(self, moves):
+        """
+        Sets the cell states of the hexagons changed by a batch of conflict-free moves, and marks them for
+        repainting.
+
+            **Parameters**
+                self
+                moves: list: tuple
+                        (organism index, vacated, occupied) of each move.
+
+            **Returns**
+                No return
+        """
+        vacated = [hxhy for index, vacated, occupied in moves for hxhy in vacated]
+        occupied = [hxhy for index, vacated, occupied in moves for hxhy in occupied]
+        owners = [index for index, vacated, occupied in moves for _ in occupied]
+        palette_indexes = {index: self.get_palette_index(self.organisms[index].rgb) for index in set(owners)}
+        states = np.array([palette_indexes[index] for index in owners], dtype=np.uint8)
+        for hxhys, new_states in ((vacated, 0), (occupied, states)):
+            hx, hy = np.array(hxhys, dtype=np.int64).reshape(-1, 2).T
+            self.set_cell_states(self.get_cell_ids(hx, hy), new_states)
+
+    @property
+    def img(self):
+        """
+        The current pixel buffer as a palette ("P" mode) PIL image.
+        """
+        return get_palette_image(self.pixels, self.get_palette_array())
+
+    def save(self, name=None):
+        """
+        Saves the current board out as .png.
+
+            **Parameters**
+                self
+                name: str
+                        Optional new name of the board including file path.
+
+            **Returns**
+                No return
+        """
+        # Save out the image to local folder
+        if name is not None:
+            self.name = name
+        if not self.name.endswith(".png"):
+            self.name += ".png"
+        self.img.save(self.name)
+
+    def save_tiles(self, name=None, tile_size=(2048, 2048)):
+        """
+        Saves the current board out as a grid of .png tiles named <name>_<row>_<col>.png, for boards too big to
+        save as one image. Only one tile's pixels are held in memory at a time.
+
+            **Parameters**
+                self
+                name: str
+                        Optional new name of the board including file path.
+                tile_size: tuple
+                        Pixel (width, height) of each tile.
+
+            **Returns**
+                No return
+        """
+        if name is not None:
+            self.name = name
+        base_name = self.name[:-4] if self.name.endswith(".png") else self.name
+        tile_w, tile_h = tile_size
+        palette = self.get_palette_array()
+        for row, y0 in enumerate(range(0, self.py_max, tile_h)):
+            for col, x0 in enumerate(range(0, self.px_max, tile_w)):
+                window = (x0, y0, min(tile_w, self.px_max - x0), min(tile_h, self.py_max - y0))
+                pixels = self.cell_state[self.rasterize_cells(window)]
+                get_palette_image(pixels, palette).save(base_name + '_' + str(row) + '_' + str(col) + '.png')
+
+    def __getstate__(self):
+        """
+        Pickles the board without its geometry, pixels, raster and neighbor lookups. They are all rebuilt from the
+        board size and cell states, so a checkpoint only holds what the simulation has changed.
+        """
+        state = self.__dict__.copy()
+        for name in ('geometry', 'label_map', 'cell_pixel_order', 'raster_cells', 'cell_pixel_starts', 'pixel_buffer',
+                     'neighbor_cache'):
+            state[name] = None
+        state['dirty_cells'], state['frame_changes'], state['stats'] = [], None, None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Unpickles the board. The next frame renders the whole board from its cell states.
+        """
+        self.__dict__.update(state)
+        self.geometry = get_board_geometry(self.hex_diag, self.width)
+        self.use_geometry()
+        self.frame_serial = next(Board.frame_serials)
+        self.stats = RunStats(enabled=False)
+
+
+class Ciliate:
+    """
+    Class object holds a single ciliate's information at the level of hexagons. Automatically calculates its next move.
+    """
+    def __init__(self, rgb, hxhy_list, brd, rng=None):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                rgb: tuple
+                        RGB pixel color of the ciliate
+                hxhy_list: list
+                        Current coordinate list of the ciliate
+                brd: Board
+                        Current iteration of the Board
+                rng: RandomStream
+                        This ciliate's random number stream. A fresh unseeded stream if not given.
+
+            **Returns**
+                No return
+        """
+        self.rgb = rgb
+        self.hxhy_list = hxhy_list
+        self.brd = brd
+        self.rng = rng if rng is not None else RandomStream()
+        self.moved_hxhy_list = self.random_move()
+
+    def get_move_delta(self):
+        """
+        Gets the hexagons this ciliate leaves and enters with its next move.
+
+            **Parameters**
+                self
+
+            **Returns**
+                vacated: list: tuple
+                        Hexagonal coordinates left behind by the move.
+                occupied: list: tuple
+                        Hexagonal coordinates newly covered by the move.
+        """
+        vacated = [hxhy for hxhy in self.hxhy_list if hxhy not in self.moved_hxhy_list]
+        occupied = [hxhy for hxhy in self.moved_hxhy_list if hxhy not in self.hxhy_list]
+        return vacated, occupied
+
+    def random_move(self):
+        """
+        Gets the ciliate's new coordinate list for the next time step via a random but valid move.
+
+            **Parameters**
+                self
+
+            **Returns**
+                hypothetical_new_hxhy_list: list: tuple
+                        List of ciliate's new self coordinates.
+        """
+        move_type = self.rng.choice(CILIATE_MOVE_TYPES)
+        orientation = self.get_orientation()
+        hypothetical_new_hxhy_list = self.hypothetical_new_hxhy(move_type, orientation)
+        is_valid = self.is_valid_move(hypothetical_new_hxhy_list)
+        if is_valid:
+            return hypothetical_new_hxhy_list
+        else:
+            return self.hxhy_list
+
+    def get_orientation(self):
+        """
+        Gets the ciliate's bodily orientation as an index.
+
+            **Parameters**
+                self
+
+            **Returns**
+                int
+                    Orientation index from 0 to 5.
+        """
+        # Head is 0: upper left, 1: up, 2: upper right, 3: lower right, 4: down, 5: lower left
+        neighbors = self.brd.get_neighbors(self.hxhy_list[1])
+        if self.hxhy_list[0] in neighbors:
+            return neighbors.index(self.hxhy_list[0])
+
+    def hypothetical_new_hxhy(self, move_type, orientation):
+        """
+        Gets the ciliate's coordinates after a move, valid or not.
+
+            **Parameters**
+                self
+                move_type: int
+                        Integer from 0 to 3 indicating forward, backward, rotate +/-60
+                orientation: int
+                        Orientation index from 0 to 5.
+
+            **Returns**
+                list: tuple
+                        List of hexagonal coordinates laying the new ciliate position, None where off the board.
+        """
+        # Look up the new head, middle and tail as offsets from the current middle. Cells off the board come back
+        # as None
+        hx, hy = self.hxhy_list[1]
+        new_hxhy_list = [(hx + dx, hy + dy) for dx, dy in CILIATE_MOVE_OFFSETS[orientation, move_type].tolist()]
+        return [hxhy if self.brd.get_cell_id(hxhy) is not None else None for hxhy in new_hxhy_list]
+
+    def is_valid_move(self, new_hxhy_list):
+        """
+        Checks if a move will hit another organism or go off the board.
+
+            **Parameters**
+                self
+                new_hxhy_list: list: tuple
+                        The list of hexagonal coordinates for the new ciliate layout
+
+            **Returns**
+                True/False
+        """
+        # Each hexagon this ciliate covers cancels one owner on the board. Anything left over blocks the move.
+        for hxhy in new_hxhy_list:
+            if hxhy is None:
+                return False
+            owners = self.brd.owners_of(hxhy)
+            if Board.FENCE in owners:
+                return False
+            if len(owners) - (hxhy in self.hxhy_list) > 0:
+                return False
+        return True
+
+
+class CiliatePopulation:
+    """
+    Class object holds any number of ciliates as NumPy arrays of head, middle and tail cell ids and orientations.
+    Proposes the next move of every ciliate at once from CILIATE_MOVE_OFFSETS, checked against one board snapshot.
+    """
+    # Per-ciliate arrays, in the order they are handed between populations by remove() and add()
+    ARRAY_FIELDS = ('ids', 'cells', 'orientations', 'pending', 'pending_orientations')
+    # Most time steps of draws read ahead from the ciliates' streams at a time, see draw_uniforms()
+    draw_chunk = 64
+
+    def __init__(self, ciliates, brd, ids=None):
+        """
+        Establishes pertinent self objects for use in the main program. Takes over each ciliate's pending move.
+
+            **Parameters**
+                ciliates: list: Ciliate
+                        The ciliates to hold, in board order.
+                brd: Board
+                        The board the ciliates live on.
+                ids: list: int
+                        Board organism index of each ciliate. Ciliate i is organism i on the board if not given.
+
+            **Returns**
+                No return
+        """
+        self.brd = brd
+        self.ids = np.arange(len(ciliates)) if ids is None else np.array(ids, dtype=np.int64)
+        self.rgbs = [ciliate.rgb for ciliate in ciliates]
+        self.rngs = [ciliate.rng for ciliate in ciliates]
+        # Upcoming draws of every ciliate's stream, one column per time step, and how many columns are used up.
+        # See draw_uniforms().
+        self.uniforms, self.draws_used = np.zeros((len(ciliates), 0)), 0
+        self.cells = self.get_cell_array([ciliate.hxhy_list for ciliate in ciliates])
+        self.orientations = self.get_orientations(self.cells)
+        self.pending = self.get_cell_array([ciliate.moved_hxhy_list for ciliate in ciliates])
+        self.pending_orientations = self.get_orientations(self.pending)
+        self.members = [CiliateMember(self, i) for i in range(len(ciliates))]
+
+    def __len__(self):
+        """
+        The number of ciliates in the population.
+        """
+        return len(self.members)
+
+    def __getitem__(self, i):
+        """
+        The CiliateMember view of ciliate i.
+        """
+        return self.members[i]
+
+    def remove(self, rows):
+        """
+        Takes ciliates out of the population so another population can add() them, random streams and pending
+        moves included.
+
+            **Parameters**
+                self
+                rows: list: int
+                        Positions of the ciliates in this population.
+
+            **Returns**
+                dict
+                    The removed ciliates' arrays under ARRAY_FIELDS, plus their 'rgbs' and 'rngs'.
+        """
+        self.sync_streams()
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        packet = {'rgbs': [self.rgbs[i] for i in rows], 'rngs': [self.rngs[i] for i in rows]}
+        for field in CiliatePopulation.ARRAY_FIELDS:
+            packet[field] = getattr(self, field)[rows]
+            setattr(self, field, getattr(self, field)[keep])
+        self.rgbs = [rgb for rgb, is_kept in zip(self.rgbs, keep) if is_kept]
+        self.rngs = [rng for rng, is_kept in zip(self.rngs, keep) if is_kept]
+        self.members = [CiliateMember(self, i) for i in range(len(self.rgbs))]
+        return packet
+
+    def add(self, packet):
+        """
+        Adds ciliates taken out of another population by remove().
+
+            **Parameters**
+                self
+                packet: dict
+                        The ciliates' arrays, colors and random streams.
+
+            **Returns**
+                No return
+        """
+        self.sync_streams()
+        for field in CiliatePopulation.ARRAY_FIELDS:
+            setattr(self, field, np.concatenate([getattr(self, field), packet[field]]))
+        self.rgbs, self.rngs = self.rgbs + packet['rgbs'], self.rngs + packet['rngs']
+        self.members = [CiliateMember(self, i) for i in range(len(self.rgbs))]
+
+    def get_anchor_columns(self):
+        """
+        Gets the column each ciliate is anchored to, the hx of its middle.
+
+            **Parameters**
+                self
+
+            **Returns**
+                np.ndarray
+                    hx of each ciliate's middle.
+        """
+        return self.brd.get_cell_coords(self.cells[:, 1])[0]
+
+    def get_cell_array(self, hxhy_lists):
+        """
+        Helper function to __init__(). Turns (head, mid, tail) coordinate lists into an array of cell ids.
+
+            **Parameters**
+                self
+                hxhy_lists: list: list: tuple
+                        Hexagonal coordinates of each ciliate.
+
+            **Returns**
+                np.ndarray
+                    Integer array of shape (N, 3).
+        """
+        return np.array([[self.brd.get_cell_id(hxhy) for hxhy in hxhy_list] for hxhy_list in hxhy_lists],
+                        dtype=np.int32).reshape(-1, 3)
+
+    def get_orientations(self, cells):
+        """
+        Gets the bodily orientation of every ciliate, the HEX_DIRECTIONS index of the head seen from the middle.
+
+            **Parameters**
+                self
+                cells: np.ndarray
+                        Cell ids of shape (N, 3).
+
+            **Returns**
+                np.ndarray
+                    Orientation index from 0 to 5 of each ciliate.
+        """
+        hx, hy = self.brd.get_cell_coords(cells)
+        head = np.stack([hx[:, 0] - hx[:, 1], hy[:, 0] - hy[:, 1]], axis=1)
+        return np.argmax((head[:, None, :] == np.array(HEX_DIRECTIONS)[None, :, :]).all(axis=2), axis=1)
+
+    def get_hxhy_lists(self, cells):
+        """
+        Turns an array of cell ids back into hexagonal coordinate lists.
+
+            **Parameters**
+                self
+                cells: np.ndarray
+                        Cell ids of shape (N, 3).
+
+            **Returns**
+                list: list: tuple
+                        Hexagonal coordinates of each ciliate.
+        """
+        hx, hy = self.brd.get_cell_coords(cells)
+        return [list(zip(row_x, row_y)) for row_x, row_y in zip(hx.tolist(), hy.tolist())]
+
+    def propose_moves(self):
+        """
+        Draws a move type for every ciliate from its own random stream and keeps the moves that are valid on the
+        board as it is now. Ciliates with an invalid move stay put.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        move_types = CILIATE_MOVE_TYPE_ARRAY[(self.draw_uniforms() * len(CILIATE_MOVE_TYPES)).astype(np.int64)]
+        neighbor_table = self.brd.neighbor_table
+        if neighbor_table is not None:
+            # Two steps from the middle along the neighbor table reach the head, middle and tail after the move
+            steps = CILIATE_MOVE_STEPS[self.orientations, move_types]
+            candidates = neighbor_table[neighbor_table[self.cells[:, 1, None], steps[:, :, 0]], steps[:, :, 1]]
+        else:
+            hx, hy = self.brd.get_cell_coords(self.cells[:, 1])
+            offsets = CILIATE_MOVE_OFFSETS[self.orientations, move_types]
+            candidates = self.brd.get_cell_ids(hx[:, None] + offsets[:, :, 0], hy[:, None] + offsets[:, :, 1])
+        # Each hexagon this ciliate covers cancels one owner on the board. Anything left over blocks the move.
+        own = (candidates[:, :, None] == self.cells[:, None, :]).any(axis=2)
+        blocked = (candidates == self.brd.oob_id) | (self.brd.get_owner_counts(candidates) - own > 0)
+        valid = ~blocked.any(axis=1)
+        self.pending = np.where(valid[:, None], candidates, self.cells)
+        self.pending_orientations = np.where(valid, (self.orientations + CILIATE_TURNS[move_types]) % 6,
+                                             self.orientations)
+
+    def draw_uniforms(self):
+        """
+        Helper function to propose_moves(). Gets the next draw of every ciliate's stream as one array. The draws are
+        read as slices of the streams' blocks a stretch of time steps at a time, and handed out a column at a time,
+        so a time step costs no Python call per ciliate. Each ciliate gets the same draws as from its own
+        RandomStream.random().
+
+            **Parameters**
+                self
+
+            **Returns**
+                np.ndarray
+                    One uniform per ciliate.
+        """
+        if self.draws_used == self.uniforms.shape[1]:
+            self.sync_streams()
+            upcoming = [rng.peek(CiliatePopulation.draw_chunk) for rng in self.rngs]
+            # Streams can be at different points of their blocks, so take as many draws as all of them have left
+            chunk = min((len(draws) for draws in upcoming), default=1)
+            self.uniforms = np.array([draws[:chunk] for draws in upcoming]).reshape(len(self.rngs), chunk)
+        uniforms = self.uniforms[:, self.draws_used]
+        self.draws_used += 1
+        return uniforms
+
+    def sync_streams(self):
+        """
+        Uses up the draws draw_uniforms() has handed out on the ciliates' own streams, and drops the ones it has not.
+        Done before the streams are handed on or saved, so they stand exactly where the ciliates left them.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        for rng in self.rngs:
+            rng.skip(self.draws_used)
+        self.uniforms, self.draws_used = np.zeros((len(self.rngs), 0)), 0
+
+    def __getstate__(self):
+        """
+        Pickles the population with its streams synced. See sync_streams().
+        """
+        self.sync_streams()
+        return self.__dict__.copy()
+
+    def get_move_deltas(self):
+        """
+        Gets the hexagons every ciliate leaves and enters with its pending move.
+
+            **Parameters**
+                self
+
+            **Returns**
+                list: tuple
+                        (vacated, occupied) hexagonal coordinates of each ciliate. Empty for ciliates that stay put.
+        """
+        moving = np.flatnonzero((self.pending != self.cells).any(axis=1))
+        old, new = self.cells[moving], self.pending[moving]
+        vacated = self.get_hxhy_runs(old, ~(old[:, :, None] == new[:, None, :]).any(axis=2))
+        occupied = self.get_hxhy_runs(new, ~(new[:, :, None] == old[:, None, :]).any(axis=2))
+        # Ciliates that stay put share one empty delta
+        deltas = [((), ())] * len(self)
+        for i, vacated_hxhys, occupied_hxhys in zip(moving.tolist(), vacated, occupied):
+            deltas[i] = (vacated_hxhys, occupied_hxhys)
+        return deltas
+
+    def get_hxhy_runs(self, cells, mask):
+        """
+        Helper function to get_move_deltas(). Gets the hexagonal coordinates of the masked cells of each row.
+
+            **Parameters**
+                self
+                cells: np.ndarray
+                        Cell ids of shape (M, 3).
+                mask: np.ndarray
+                        Boolean array of the same shape picking the cells to keep.
+
+            **Returns**
+                list: list: tuple
+                        Hexagonal coordinates of the kept cells of each row, in row order.
+        """
+        hx, hy = self.brd.get_cell_coords(cells[mask])
+        hxhys = list(zip(hx.tolist(), hy.tolist()))
+        ends = np.cumsum(mask.sum(axis=1)).tolist()
+        return [hxhys[start:end] for start, end in zip([0, *ends[:-1]], ends)]
+
+    def advance(self, accepted=None):
+        """
+        Applies the ciliates' pending moves to the population and proposes the next moves.
+
+            **Parameters**
+                self
+                accepted: np.ndarray
+                        Optional boolean mask of the ciliates whose moves were accepted. All of them if not given.
+
+            **Returns**
+                No return
+        """
+        if accepted is None:
+            self.cells, self.orientations = self.pending, self.pending_orientations
+        else:
+            self.cells = np.where(accepted[:, None], self.pending, self.cells)
+            self.orientations = np.where(accepted, self.pending_orientations, self.orientations)
+        self.propose_moves()
+
+
+class CiliateMember:
+    """
+    Class object is a read-only view of one ciliate in a CiliatePopulation. Stands in for a Ciliate on the board.
+    """
+    def __init__(self, population, index):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                population: CiliatePopulation
+                        The population holding the ciliate.
+                index: int
+                        Index of the ciliate in the population.
+
+            **Returns**
+                No return
+        """
+        self.population, self.index = population, index
+        self.rgb = population.rgbs[index]
+        self.rng = population.rngs[index]
+
+    @property
+    def hxhy_list(self):
+        """
+        The ciliate's current head, middle and tail coordinates.
+        """
+        return self.population.get_hxhy_lists(self.population.cells[self.index:self.index + 1])[0]
+
+    @property
+    def moved_hxhy_list(self):
+        """
+        The ciliate's coordinates after its pending move.
+        """
+        return self.population.get_hxhy_lists(self.population.pending[self.index:self.index + 1])[0]
+
+
+class Amoeba:
+    """
+    Class object holds the amoeba's information at the level of hexagons. Automatically calculates its next move.
+    Body and perimeter classifications are kept as HexSets and updated locally as the amoeba moves.
+    """
+    def __init__(self, rgb, hxhy_list, brd, rng=None):
+        """
+        Establishes pertinent self objects for use by the main program.
+
+            **Parameters**
+                rgb: tuple
+                        RGB pixel color of the amoeba
+                hxhy_list: list
+                        Current coordinate list of the amoeba.
+                brd: Board
+                        Current iteration of the Board
+                rng: RandomStream
+                        The amoeba's random number stream. A fresh unseeded stream if not given.
+
+            **Returns**
+                No return
+        """
+        self.rgb = rgb
+        self.hxhy_list = HexSet(hxhy_list)
+        self.brd = brd
+        self.rng = rng if rng is not None else RandomStream()
+        # Index of this amoeba in the board's organisms list. Set by the Simulation that holds it.
+        self.index = None
+        self.perimeter_hxhy_list = HexSet(self.get_perimeter())
+        self.fingertips_hxhy_list, self.necks_hxhy_list, self.base_hxhy_list = self.get_fngr_neck_base()
+        self.reduced_p_hxhy_list = HexSet(self.get_reduced_perimeter())
+        # Empty hexagons the amoeba may grow into, and the ones next to each perimeter hexagon. See is_growth_hex().
+        self.growth_hxhy_list = HexSet(hxhy for hxhy in get_hexes_near(self.perimeter_hxhy_list, 1)
+                                       if self.is_growth_hex(hxhy))
+        self.frontier = {hxhy: self.get_growth_hexes(hxhy) for hxhy in self.perimeter_hxhy_list}
+        self.frontier_arrays = None
+        self.moved_delta = self.random_move()
+
+    @property
+    def moved_hxhy_list(self):
+        """
+        The amoeba's coordinate list after its next move.
+        """
+        vacated, occupied = self.moved_delta
+        return [hxhy for hxhy in self.hxhy_list if hxhy not in vacated] + occupied
+
+    def advance(self, brd):
+        """
+        Applies the amoeba's pending move to its own state and calculates its next move.
+        Only the hexagons near the added and removed cells are reclassified.
+
+            **Parameters**
+                self
+                brd: Board
+                        Current iteration of the Board
+
+            **Returns**
+                No return
+        """
+        vacated, occupied = self.moved_delta
+        self.brd = brd
+        if len(occupied) > 0:
+            self.update_topology(occupied[0], vacated[0])
+        self.moved_delta = self.random_move()
+
+    def get_anchor_column(self):
+        """
+        Gets the column the amoeba is anchored to, the mean hx of its body rounded down.
+
+            **Parameters**
+                self
+
+            **Returns**
+                int
+                    Anchor column.
+        """
+        return sum(hxhy[0] for hxhy in self.hxhy_list) // len(self.hxhy_list)
+
+    def reject_move(self, brd):
+        """
+        Drops the amoeba's pending move after it lost a conflict and calculates a new one.
+
+            **Parameters**
+                self
+                brd: Board
+                        Current iteration of the Board
+
+            **Returns**
+                No return
+        """
+        self.brd = brd
+        self.moved_delta = self.random_move()
+
+    def update_topology(self, hex_added, hex_removed):
+        """
+        Helper function to advance(). Moves one hexagon of the body and patches the perimeter, fingertip, neck,
+        base and reduced perimeter sets around the two changed cells.
+
+            **Parameters**
+                self
+                hex_added: tuple
+                        Hexagonal coordinate joining the amoeba.
+                hex_removed: tuple
+                        Hexagonal coordinate leaving the amoeba.
+
+            **Returns**
+                No return
+        """
+        self.hxhy_list.append(hex_added)
+        self.hxhy_list.remove(hex_removed)
+        # Perimeter status only changes for the two cells and their immediate neighbors
+        changed_hxhys = [hex_added, hex_removed]
+        for hxhy in get_hexes_near([hex_added, hex_removed], 1):
+            is_perimeter = False
+            if hxhy in self.hxhy_list:
+                for neigh_hxhy in self.brd.get_neighbors(hxhy):
+                    if neigh_hxhy not in self.hxhy_list:
+                        is_perimeter = True
+                        break
+            if is_perimeter != (hxhy in self.perimeter_hxhy_list):
+                changed_hxhys.append(hxhy)
+            if is_perimeter:
+                self.perimeter_hxhy_list.append(hxhy)
+            else:
+                self.perimeter_hxhy_list.discard(hxhy)
+        # Classifications read the perimeter status of neighbors, so they can change out to a radius of 2
+        for hxhy in get_hexes_near([hex_added, hex_removed], 2):
+            for hxhy_set in (self.fingertips_hxhy_list, self.necks_hxhy_list,
+                             self.base_hxhy_list, self.reduced_p_hxhy_list):
+                hxhy_set.discard(hxhy)
+            if hxhy in self.perimeter_hxhy_list:
+                p_neigh_count, b_neigh_count = self.get_neighbor_counts(hxhy)
+                self.append_fngr_neck_base(hxhy, self.fingertips_hxhy_list, self.necks_hxhy_list,
+                                           self.base_hxhy_list, p_neigh_count, b_neigh_count)
+                if hxhy not in self.necks_hxhy_list and hxhy not in self.base_hxhy_list:
+                    self.reduced_p_hxhy_list.append(hxhy)
+        # Growth status reads the body and perimeter status of neighbors, so it only changes next to the cells
+        # changed above. Perimeter hexagons next to a change of growth status get their growth hexagons listed again.
+        stale = dict.fromkeys(changed_hxhys)
+        for hxhy in get_hexes_near(changed_hxhys, 1):
+            is_growth = self.is_growth_hex(hxhy)
+            if is_growth != (hxhy in self.growth_hxhy_list):
+                if is_growth:
+                    self.growth_hxhy_list.append(hxhy)
+                else:
+                    self.growth_hxhy_list.remove(hxhy)
+                stale.update(dict.fromkeys(self.brd.get_neighbors(hxhy)))
+        for hxhy in stale:
+            if hxhy in self.perimeter_hxhy_list:
+                self.frontier[hxhy] = self.get_growth_hexes(hxhy)
+            else:
+                self.frontier.pop(hxhy, None)
+        self.frontier_arrays = None
+
+    def get_move_delta(self):
+        """
+        Gets the hexagons this amoeba leaves and enters with its next move.
+
+            **Parameters**
+                self
+
+            **Returns**
+                vacated: list: tuple
+                        Hexagonal coordinates left behind by the move.
+                occupied: list: tuple
+                        Hexagonal coordinates newly covered by the move.
+        """
+        return self.moved_delta
+
+    def get_perimeter(self):
+        """
+        Creates a list of the amoeba's perimeter hexagon coordinates.
+
+            **Parameters**
+                self
+
+            **Returns**
+                perimeter_hxhy_list: list: tuple
+                        List of hexagonal coordinates that have an empty neighbor.
+        """
+        perimeter_hxhy_list = []
+        for hxhy in self.hxhy_list:
+            for neigh_hxhy in self.brd.get_neighbors(hxhy):
+                if neigh_hxhy not in self.hxhy_list:
+                    perimeter_hxhy_list.append(hxhy)
+                    break
+        return perimeter_hxhy_list
+
+    def get_fngr_neck_base(self):
+        """
+        Creates a list of the amoeba's fingertip hexagon coordinates.
+
+            **Parameters**
+                self
+
+            **Returns**
+                fingertips: list: tuple
+                        List of hexagonal coordinates that have only one self neighbor.
+                necks: list: tuple
+                        List of hexagonal coordinates that are necks in amoeba appendages.
+                bases: list: tuple
+                        List of hexagonal coordinates that join amoeba appendages to the main body.
+        """
+        # Scan perimeter hexagons to see if they are fingertips, neck pieces, or the bases of necks
+        fingertips, necks, bases = HexSet(), HexSet(), HexSet()
+        for hxhy in self.perimeter_hxhy_list:
+            p_neigh_count, b_neigh_count = self.get_neighbor_counts(hxhy)
+            fingertips, necks, bases = self.append_fngr_neck_base(
+                hxhy, fingertips, necks, bases, p_neigh_count, b_neigh_count)
+        return fingertips, necks, bases
+
+    def get_neighbor_counts(self, hxhy):
+        """
+        Helper function of get_fngr_neck_base(). Counts the peripheral and body neighbors of a perimeter hexagon.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+
+            **Returns**
+                p_neigh_count: int
+                        The number of neighbors to hxhy that are in the amoeba's perimeter list
+                b_neigh_count: int
+                        The number of neighbors to hxhy that are in the amoeba's internal body space.
+        """
+        p_neigh_count = 0  # peripheral neighbors
+        b_neigh_count = 0  # body neighbors
+        for neigh_hxhy in self.brd.get_neighbors(hxhy):
+            if neigh_hxhy in self.perimeter_hxhy_list:
+                p_neigh_count += 1
+            if neigh_hxhy not in self.perimeter_hxhy_list and neigh_hxhy in self.hxhy_list:
+                b_neigh_count += 1
+        return p_neigh_count, b_neigh_count
+
+    def append_fngr_neck_base(self, hxhy, fingertips, necks, bases, p_neigh_count, b_neigh_count):
+        """
+        Helper function of get_fngr_neck_base(). Appends lists based on neighbor index classifications.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+                fingertips: HexSet
+                        The fingertip set to be appended to.
+                necks: HexSet
+                        The neck set to be appended to.
+                bases: HexSet
+                        The base set to be appended to.
+                p_neigh_count: int
+                        The number of neighbors to hxhy that are in the amoeba's perimeter list
+                b_neigh_count: int
+                        The number of neighbors to hxhy that are in the amoeba's internal body space.
+
+            **Returns**
+                fingertips: list: tuple
+                        List of hexagonal coordinates that have only one self neighbor.
+                necks: list: tuple
+                        List of hexagonal coordinates that are necks in amoeba appendages.
+                bases: list: tuple
+                        List of hexagonal coordinates that join amoeba appendages to the main body.
+        """
+        # Analyze neighbor counts (peripheral and body) to cover all possible morphologies and append accordingly.
+        if p_neigh_count == 1 and b_neigh_count == 0:
+            fingertips.append(hxhy)
+        elif p_neigh_count == 2 and b_neigh_count == 0:
+            # Can be a link in a skinny (neck)
+            # Can be a wart on a wall (pass)
+            is_wart = self.test_is_wart(hxhy)
+            if not is_wart:
+                necks.append(hxhy)
+        elif p_neigh_count == 3 and b_neigh_count == 0:
+            # Can be in the crux of a 'Y' (pass)
+            # Can be (base)
+            is_crux_of_y = self.test_is_crux_of_y(hxhy)
+            if not is_crux_of_y:
+                bases.append(hxhy)
+        elif p_neigh_count == 3 and b_neigh_count == 1:
+            # Can be mid of a side near a corner (pass)
+            # Can be (base)
+            is_3_to_1_base = self.test_is_3_to_1(hxhy)
+            if is_3_to_1_base:
+                bases.append(hxhy)
+        elif p_neigh_count == 4 and b_neigh_count == 0:
+            # Can be the center of a dog bone (base)
+            # Can be the top stem piece of a mushroom (3-to-1) (base)
+            # or the middle-edge piece of a small triangle (pass)
+            is_dog_bone = self.test_is_dog_bone(hxhy)
+            is_3_to_1_base = self.test_is_3_to_1(hxhy)
+            if is_dog_bone:
+                necks.append(hxhy)
+            elif is_3_to_1_base:
+                bases.append(hxhy)
+        return fingertips, necks, bases
+
+    def test_is_wart(self, hxhy):
+        """
+        Helper function of append_fngr_neck_base(). Checks if hxhy is a wart case.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+
+            **Returns**
+                True/False
+        """
+        # The two neighbors of a wart are right next to each other.
+        indexes = []
+        for i, neigh_hxhy in enumerate(self.brd.get_neighbors(hxhy)):
+            if neigh_hxhy in self.hxhy_list:
+                indexes.append(i)
+        if abs(indexes[0] - indexes[1]) == 1 or abs(indexes[0] - indexes[1]) == 5:
+            return True
+        return False
+
+    def test_is_crux_of_y(self, hxhy):
+        """
+        Helper function of append_fngr_neck_base(). Checks if hxhy is a crux case.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+
+            **Returns**
+                True/False
+        """
+        # The three neighbors of a Y-crux are all right next to each other.
+        indexes = []
+        for i, neigh_hxhy in enumerate(self.brd.get_neighbors(hxhy)):
+            if neigh_hxhy in self.hxhy_list:
+                indexes.append(i)
+        diff1 = abs(indexes[0] - indexes[1])
+        diff2 = abs(indexes[1] - indexes[2])
+        if diff1 == 1 or diff1 == 5:
+            if diff2 == 1 or diff2 == 5:
+                return True
+        return False
+
+    def test_is_3_to_1(self, hxhy):
+        """
+        Helper function of append_fngr_neck_base(). Checks if hxhy is a 3_to_1 base case.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+
+            **Returns**
+                True/False
+        """
+        # The 4 neighbors of a 3-to-1 base have a -0-1-2-gap-4-gap- pattern. Easier to index the gaps instead.
+        indexes = []
+        for i, neigh_hxhy in enumerate(self.brd.get_neighbors(hxhy)):
+            if neigh_hxhy not in self.hxhy_list:
+                indexes.append(i)
+        if abs(indexes[0] - indexes[1]) == 2 or abs(indexes[0] - indexes[1]) == 4:
+            return True
+        return False
+
+    def test_is_dog_bone(self, hxhy):
+        """
+        Helper function of append_fngr_neck_base(). Checks if hxhy is a dog bone case.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of the amoeba piece of interest
+
+            **Returns**
+                True/False
+        """
+        # The 4 neighbors of a dog bone base have a -0-1-gap-3-4-gap- pattern. Easier to index the gaps instead.
+        indexes = []
+        for i, neigh_hxhy in enumerate(self.brd.get_neighbors(hxhy)):
+            if neigh_hxhy not in self.hxhy_list:
+                indexes.append(i)
+        if abs(indexes[0] - indexes[1]) == 3:
+            return True
+        return False
+
+    def get_reduced_perimeter(self):
+        """
+        Helper function of append_fngr_neck_base(). Checks if hxhy is a dog bone case.
+
+            **Parameters**
+                self
+
+            **Returns**
+                reduced_perimeter_hxhy_list: list: tuple
+                        List of amoeba's perimeter hexagons but with narrow necks removed
+        """
+        # get perimeter list but with narrow points removed. Leave the fingertips in the list.
+        reduced_perimeter_hxhy_list = self.perimeter_hxhy_list.copy()
+        for hxhy in self.perimeter_hxhy_list:
+            # Keep the meat touchers that are not neck bases. Keep the fingertips. Delete the rest of the necks.
+            if hxhy in self.necks_hxhy_list or hxhy in self.base_hxhy_list:
+                reduced_perimeter_hxhy_list.remove(hxhy)
+        return reduced_perimeter_hxhy_list
+
+    def random_move(self):
+        """
+        Gets the amoeba's next move in a single draw. A perimeter hexagon is picked at random, then one of its
+        growth hexagons, and moves onto hexagons that are off the board or taken by another organism are left out.
+        Leaving those out renormalizes the odds exactly as redrawing until a valid move comes up would.
+
+            **Parameters**
+                self
+
+            **Returns**
+                vacated: list: tuple
+                        The hexagon the move removes from the amoeba. Empty if boxed in with no valid move.
+                occupied: list: tuple
+                        The hexagon the move adds to the amoeba. Empty if boxed in with no valid move.
+        """
+        hexes_to_add, weights = self.get_frontier_arrays()
+        is_valid = self.brd.get_free_mask(hexes_to_add[:, 0], hexes_to_add[:, 1])
+        cumulative_weights = np.cumsum(np.where(is_valid, weights, 0))
+        if len(cumulative_weights) == 0 or cumulative_weights[-1] == 0:
+            # Boxed in by other organisms, so sit this move out
+            return [], []
+        pick = np.searchsorted(cumulative_weights, self.rng.random() * cumulative_weights[-1], side='right')
+        hex_to_add = tuple(hexes_to_add[min(pick, len(cumulative_weights) - 1)].tolist())
+        # Find the farthest hex in the amoeba to be removed
+        hex_to_remove = self.get_farthest_perimeter_hex(hex_to_add)
+        return [hex_to_remove], [hex_to_add]
+
+    def get_frontier_arrays(self):
+        """
+        Helper function to random_move(). Flattens the frontier into one array of growth hexagons, each weighted
+        by the odds of picking it: one over the perimeter hexagon count, split evenly between the growth hexagons
+        of that perimeter hexagon. Kept until the amoeba's body next changes.
+
+            **Parameters**
+                self
+
+            **Returns**
+                hexes_to_add: np.ndarray
+                        (M, 2) hexagonal coordinates of the growth hexagons. A hexagon shared by several perimeter
+                        hexagons is listed once for each.
+                weights: np.ndarray
+                        Odds of picking each growth hexagon, before invalid moves are left out.
+        """
+        if self.frontier_arrays is None:
+            growth_counts = np.array([len(growth_hexes) for growth_hexes in self.frontier.values()])
+            hexes_to_add = np.fromiter((coordinate for growth_hexes in self.frontier.values()
+                                        for hxhy in growth_hexes for coordinate in hxhy),
+                                       dtype=np.int64, count=2 * growth_counts.sum()).reshape(-1, 2)
+            weights = np.repeat(1 / np.maximum(growth_counts, 1), growth_counts) / len(self.frontier)
+            self.frontier_arrays = (hexes_to_add, weights)
+        return self.frontier_arrays
+
+    def get_growth_hexes(self, hxhy):
+        """
+        Helper function to random_move(). Lists the empty neighbors of a perimeter hexagon the amoeba may grow
+        into. Depends only on the amoeba's own shape, so other organisms are checked separately.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Amoeba self perimeter hexagon.
+
+            **Returns**
+                list: tuple
+                        Growth hexagons next to the perimeter hex, in neighbor order. May be empty.
+        """
+        return [neigh_hxhy for neigh_hxhy in self.brd.get_neighbors(hxhy) if neigh_hxhy in self.growth_hxhy_list]
+
+    def is_growth_hex(self, hxhy):
+        """
+        Helper function to random_move(). Checks if an empty hexagon next to the amoeba's perimeter can be added to
+        the amoeba without creating a neck or a base.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate of interest.
+
+            **Returns**
+                True/False
+        """
+        if hxhy in self.hxhy_list:
+            return False
+        # Check that the empty hexagon is not in a "base" position (dogbone, 3_to_1, non-crux of Y, non-wart) based
+        # on its number of self-perimeter neighbors.
+        p_neigh_count = 0
+        for neigh_hxhy in self.brd.get_neighbors(hxhy):
+            if neigh_hxhy in self.perimeter_hxhy_list:
+                p_neigh_count += 1
+        if p_neigh_count == 0:
+            # Not next to the amoeba at all
+            return False
+        elif p_neigh_count == 2:
+            # Could create a wart or a neck
+            return self.test_is_wart(hxhy)
+        elif p_neigh_count == 3:
+            # Could fill in the crux-of-a-Y or create a base
+            return self.test_is_crux_of_y(hxhy)
+        elif p_neigh_count == 4:
+            # Could create a dogbone or 3_to_1 base scenario and should be skipped.
+            creates_dogbone = self.test_is_dog_bone(hxhy)
+            creates_3_to_1 = self.test_is_dog_bone(hxhy)
+            return not creates_dogbone and not creates_3_to_1
+        return True
+
+    def get_farthest_perimeter_hex(self, center_hex):
+        """
+        Helper function to random_move(). Measures the hex distance from a centerpoint to every reduced perimeter
+        hexagon in one vectorized pass. Starting at radius 2, the consecutive run of radii that hold reduced
+        perimeter coordinates stands in for a set of concentric rings. Will only choose a fingertip if only
+        fingertips to choose from in the selected ring. Selects randomly from the larger half of the rings.
+
+            **Parameters**
+                self
+                center_hex: tuple
+                        The hexagon being added to the amoeba.
+
+            **Returns**
+                rng.choice: list: tuple
+                        Random choice from selected ring to be erased from the self in the new coordinates.
+        """
+        # The largest ring that still has reduced_perimeter coordinates should choose one at random if more than one,
+        # but should not choose a fingertip if it's a tie. This will help keep the amoeba elongated.
+        reduced_p_array = np.array(self.reduced_p_hxhy_list.items)
+        offsets = reduced_p_array - np.array(center_hex)
+        distances = get_hex_distances(offsets)
+        occupied_radii = set(distances[distances >= 2].tolist())
+        if len(occupied_radii) == 0:
+            # Nothing two rings out, so fall back to the closest reduced perimeter hexagons
+            occupied_radii = {int(distances.min())}
+        # Rings run from the first occupied radius until the first empty one
+        first_radius = min(occupied_radii)
+        ring_count = 1
+        while first_radius + ring_count in occupied_radii:
+            ring_count += 1
+
+        # Randomly select from the outer half of the ring set for recruitment.
+        index_1_of_2 = math.ceil(1 / 2 * (ring_count - 1))
+        index_2_of_2 = ring_count - 1
+        index = self.rng.randint(index_1_of_2, index_2_of_2)
+        radius = first_radius + index
+        # List the ring in the same order get_ring() walks it
+        in_ring = np.nonzero(distances == radius)[0]
+        ring_order = get_ring_positions(offsets[in_ring], radius)
+        outer_ring_list = [self.reduced_p_hxhy_list[i] for i in in_ring[np.argsort(ring_order)]]
+
+        # Remove fingertips from selection if non-fingertips to choose from
+        refined_ring_list = []
+        fngr_count = 0
+        if len(outer_ring_list) > 1:
+            for hxhy in outer_ring_list:
+                if hxhy in self.fingertips_hxhy_list:
+                    fngr_count += 1
+            if fngr_count == len(outer_ring_list):
+                for hxhy in outer_ring_list:
+                    refined_ring_list.append(hxhy)
+            else:
+                for hxhy in outer_ring_list:
+                    if hxhy not in self.fingertips_hxhy_list:
+                        refined_ring_list.append(hxhy)
+        else:
+            refined_ring_list.extend(outer_ring_list)
+        return self.rng.choice(refined_ring_list)
+
+
+class HexSet:
+    """
+    Class object holds a set of hexagonal coordinates in list order. Membership checks, appends, removals and
+    picks by index are all O(1). A removal fills its gap with the last item, so the order is not insertion order.
+    """
+    def __init__(self, hxhy_list=()):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                hxhy_list: list: tuple
+                        Optional starting hexagonal coordinates.
+
+            **Returns**
+                No return
+        """
+        self.items, self.index = [], {}
+        for hxhy in hxhy_list:
+            self.append(hxhy)
+
+    def append(self, hxhy):
+        """
+        Adds a hexagonal coordinate to the end of the set if it is not already in it.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate pair to add.
+
+            **Returns**
+                No return
+        """
+        if hxhy not in self.index:
+            self.index[hxhy] = len(self.items)
+            self.items.append(hxhy)
+
+    def remove(self, hxhy):
+        """
+        Removes a hexagonal coordinate from the set. Raises KeyError if it is missing.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate pair to remove.
+
+            **Returns**
+                No return
+        """
+        i = self.index.pop(hxhy)
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+    def discard(self, hxhy):
+        """
+        Removes a hexagonal coordinate from the set if it is in it.
+
+            **Parameters**
+                self
+                hxhy: tuple
+                        Hexagonal coordinate pair to remove.
+
+            **Returns**
+                No return
+        """
+        if hxhy in self.index:
+            self.remove(hxhy)
+
+    def copy(self):
+        """
+        Makes a shallow copy of the set.
+
+            **Parameters**
+                self
+
+            **Returns**
+                HexSet
+                    A new HexSet with the same items in the same order.
+        """
+        return HexSet(self.items)
+
+    def __contains__(self, hxhy):
+        return hxhy in self.index
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+
+class RandomStream:
+    """
+    Class object holds one seeded NumPy random number stream. Uniform draws are made in blocks ahead of time and
+    served one at a time by random(), or many at a time as array slices by peek() and skip(), so the simulation
+    pays for the generator once per block instead of once per draw.
+    """
+    def __init__(self, generator=None, block_size=4096):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                generator: np.random.Generator
+                        Seeded generator feeding this stream. A fresh unseeded generator if not given.
+                block_size: int
+                        Number of uniform draws made at a time.
+
+            **Returns**
+                No return
+        """
+        self.generator = generator if generator is not None else np.random.default_rng()
+        self.block_size = block_size
+        # The current block, its draws as Python floats for random(), and the position of the next draw in it
+        self.block, self.draws, self.position = np.zeros(0), [], 0
+        # Generator state the current block was drawn from, so a pickled stream can draw it again
+        self.block_state = None
+        # Position the next block starts at. An unpickled stream draws its block again lazily and resumes there.
+        self.resume_position = 0
+
+    def draw_block(self):
+        """
+        Draws the next block of uniforms.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.block_state = self.generator.bit_generator.state
+        self.block = self.generator.random(self.block_size)
+        self.draws = self.block.tolist()
+        self.position, self.resume_position = self.resume_position, 0
+
+    def get_position(self):
+        """
+        Gets the number of draws already served from the current block.
+
+            **Parameters**
+                self
+
+            **Returns**
+                int
+        """
+        return self.position if self.draws else self.resume_position
+
+    def random(self):
+        """
+        Gets the next uniform draw in [0, 1), drawing a new block when the current one runs out.
+
+            **Parameters**
+                self
+
+            **Returns**
+                float
+        """
+        try:
+            draw = self.draws[self.position]
+        except IndexError:
+            # A loop, as a stream pickled at the very end of a block draws it again only to run off its end
+            while self.position == len(self.draws):
+                self.draw_block()
+            draw = self.draws[self.position]
+        self.position += 1
+        return draw
+
+    def peek(self, n):
+        """
+        Gets up to n upcoming draws without using them up. Draws a new block first if the current one has run
+        out, but never reaches past the end of a block, so fewer than n draws may come back.
+
+            **Parameters**
+                self
+                n: int
+                        Most draws to get.
+
+            **Returns**
+                np.ndarray
+                    Between 1 and n upcoming uniforms, in draw order.
+        """
+        while self.position == len(self.draws):
+            self.draw_block()
+        return self.block[self.position:self.position + n]
+
+    def skip(self, n):
+        """
+        Uses up the next n draws, as handed out by peek().
+
+            **Parameters**
+                self
+                n: int
+                        Number of draws to use up. No more than peek() gave.
+
+            **Returns**
+                No return
+        """
+        self.position += n
+
+    def randint(self, a, b):
+        """
+        Gets a random integer from a to b, both included.
+
+            **Parameters**
+                self
+                a: int
+                b: int
+
+            **Returns**
+                int
+        """
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        """
+        Gets a random item of a non-empty sequence.
+
+            **Parameters**
+                self
+                seq: list
+
+            **Returns**
+                An item of seq.
+        """
+        return seq[int(self.random() * len(seq))]
+
+    def __getstate__(self):
+        """
+        Pickles the stream as generator state and position only. The current block is drawn again after
+        unpickling, on the first draw, which keeps checkpoints of thousands of streams small and quick to load.
+        """
+        has_block = self.block_state is not None
+        return {'generator_state': self.block_state if has_block else self.generator.bit_generator.state,
+                'has_block': has_block, 'block_size': self.block_size, 'position': self.get_position()}
+
+    def __setstate__(self, state):
+        """
+        Unpickles the stream at the exact draw it was pickled at.
+        """
+        bit_generator = getattr(np.random, state['generator_state']['bit_generator'])()
+        bit_generator.state = state['generator_state']
+        self.generator, self.block_size = np.random.Generator(bit_generator), state['block_size']
+        self.block, self.draws, self.position = np.zeros(0), [], 0
+        # The generator sits at the start of the current block, so the next block drawn is the current one again
+        self.block_state = state['generator_state'] if state['has_block'] else None
+        self.resume_position = state['position'] if state['has_block'] else 0
+
+
+class RunStats:
+    """
+    Class object collects wall-clock time per phase and event counters over a run. Disabled stats hand out one
+    shared do-nothing timer and skip counting, so instrumented code runs at full speed when nobody is looking.
+    Phases may nest, in which case the outer phase includes the inner one.
+    """
+    # Context manager handed out by disabled stats
+    idle_timer = nullcontext()
+
+    def __init__(self, enabled=True):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                enabled: bool
+                        Collect anything at all.
+
+            **Returns**
+                No return
+        """
+        self.enabled = enabled
+        # Per phase name: total seconds and number of passes. Per counter name: running total.
+        self.seconds, self.calls, self.counters = {}, {}, {}
+
+    def phase(self, name):
+        """
+        Times one pass through a phase, used as `with stats.phase('name'):`.
+
+            **Parameters**
+                self
+                name: str
+                        Name of the phase.
+
+            **Returns**
+                context manager
+        """
+        if not self.enabled:
+            return RunStats.idle_timer
+        return self.time_phase(name)
+
+    @contextmanager
+    def time_phase(self, name):
+        """
+        Helper function to phase(). Adds the time spent inside the with block to the phase.
+
+            **Parameters**
+                self
+                name: str
+                        Name of the phase.
+
+            **Returns**
+                No return
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, n=1):
+        """
+        Adds to an event counter.
+
+            **Parameters**
+                self
+                name: str
+                        Name of the counter.
+                n: int
+                        Number of events.
+
+            **Returns**
+                No return
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def as_dict(self):
+        """
+        Gets the collected stats as plain data.
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    'seconds' and 'calls' per phase, slowest phase first, and 'counters'.
+        """
+        phases = sorted(self.seconds, key=self.seconds.get, reverse=True)
+        return {'seconds': {name: round(self.seconds[name], 6) for name in phases},
+                'calls': {name: self.calls[name] for name in phases},
+                'counters': dict(sorted(self.counters.items()))}
+
+    def save(self, path):
+        """
+        Writes the collected stats to a .json file.
+
+            **Parameters**
+                self
+                path: str
+                        Name of the .json file.
+
+            **Returns**
+                No return
+        """
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+class Simulation:
+    """
+    Class object holds the pure simulation state: a board used for geometry and occupancy, a ciliate population and
+    any number of amoebae.
+    Advances time steps without rendering. Frames are only painted when a frame sink is given to step().
+    """
+    def __init__(self, hex_cnt, width, organisms, seed=None, viewport=None, simultaneous=True, stats=None):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                hex_cnt: int
+                        Number of hexagons across the diagonal of the board.
+                width: int
+                        Pixel width of a single hexagon.
+                organisms: list: Ciliate, Amoeba
+                        List of Ciliate objects followed by Amoeba objects, each holding its own random stream.
+                seed: int
+                        Seed the organisms' random streams were spawned from, if any. Kept for the record.
+                viewport: tuple
+                        Optional pixel window (x0, y0, width, height) of the board to render frames of.
+                simultaneous: bool
+                        Move the organisms in conflict-free batches, see step_simultaneous(). Set to False to move
+                        them one at a time in board order, as earlier versions did.
+                stats: RunStats
+                        Optional stats to time the phases of the run and count its events in.
+
+            **Returns**
+                No return
+        """
+        self.seed, self.simultaneous = seed, simultaneous
+        stats = stats if stats is not None else RunStats(enabled=False)
+        # Separate amoebae and ciliates. The ciliates are held as one population and indexed first on the board.
+        ciliates = [org for org in organisms if not isinstance(org, Amoeba)]
+        self.amoebae = [org for org in organisms if isinstance(org, Amoeba)]
+        with stats.phase('board_setup'):
+            self.board = Board(hex_cnt, width, '', [*ciliates, *self.amoebae], viewport)
+        self.set_stats(stats)
+        self.ciliates = CiliatePopulation(ciliates, self.board)
+        self.board.organisms[:len(self.ciliates)] = self.ciliates.members
+        for i, amoeba in enumerate(self.amoebae):
+            amoeba.index = len(self.ciliates) + i
+        self.t = 0
+        # (organism index, vacated, occupied) for every move of the latest time step, in the order they happened
+        self.moves = []
+
+    def step(self, n=1, sink=None, every=1, recorder=None):
+        """
+        Advances the simulation by n time steps. In each time step every amoeba moves three times and each
+        ciliate moves once, either simultaneously or one organism at a time.
+
+            **Parameters**
+                self
+                n: int
+                        Number of time steps to advance.
+                sink: VideoStream, ImageFolder, FramePipeline
+                        Optional frame sink. Gets the rendered board after every time step divisible by every.
+                every: int
+                        Render one frame every this many time steps.
+                recorder: TrajectoryWriter
+                        Optional trajectory log. Records the moves of every time step.
+
+            **Returns**
+                No return
+        """
+        for _ in range(n):
+            self.t += 1
+            self.moves = []
+            if self.simultaneous:
+                self.step_simultaneous()
+            else:
+                self.step_sequential()
+            if recorder is not None:
+                with self.stats.phase('trajectory'):
+                    recorder.record(self)
+            if sink is not None and self.t % every == 0:
+                write_frame(self.board, sink, self.stats)
+
+    def step_sequential(self):
+        """
+        Helper function to step(). Moves the organisms one at a time. Every amoeba moves three times, taking turns,
+        and then each ciliate moves once. Pending moves can be stale, so organisms may end up stacked.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        # Move the amoebae three times per time step.
+        with self.stats.phase('amoeba_moves'):
+            for i in range(3):
+                for amoeba in self.amoebae:
+                    vacated, occupied = amoeba.get_move_delta()
+                    self.stats.count('amoeba_moves_boxed_in', len(occupied) == 0)
+                    # Put the move on the board first, so the amoeba's next move can grow into the hexagon it left
+                    self.board.update_organism(amoeba.index, amoeba, vacated, occupied)
+                    amoeba.advance(self.board)
+                    self.moves.append((amoeba.index, vacated, occupied))
+        # Move the ciliates one time each, then propose all their next moves at once.
+        with self.stats.phase('ciliate_moves'):
+            for i, (vacated, occupied) in enumerate(self.ciliates.get_move_deltas()):
+                self.stats.count('ciliate_moves_invalid', len(occupied) == 0)
+                self.board.apply_move(i, vacated, occupied)
+                self.moves.append((i, vacated, occupied))
+            self.ciliates.advance()
+
+    def step_simultaneous(self):
+        """
+        Helper function to step(). Moves the organisms in three rounds. In the first round every ciliate and every
+        amoeba moves at once. In the next two rounds only the amoebae move. Each round the pending moves are checked
+        for conflicts, and every move that survives is committed to the board in one batch.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        for round_number in range(3):
+            self.moves.extend(move_batch(self.board, self.ciliates, self.amoebae, round_number == 0,
+                                         stats=self.stats))
+
+    def state(self):
+        """
+        Gets a snapshot of the simulation state.
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    Time step 't', and lists of hexagonal coordinate lists under 'ciliates' and 'amoebae'.
+        """
+        return {'t': self.t,
+                'ciliates': [list(ciliate.hxhy_list) for ciliate in self.ciliates],
+                'amoebae': [list(amoeba.hxhy_list) for amoeba in self.amoebae]}
+
+    def set_stats(self, stats):
+        """
+        Swaps in the stats the simulation and its board time phases and count events in.
+
+            **Parameters**
+                self
+                stats: RunStats
+                        The stats to use. Disabled stats if None.
+
+            **Returns**
+                No return
+        """
+        self.stats = stats if stats is not None else RunStats(enabled=False)
+        self.board.stats = self.stats
+
+    def __getstate__(self):
+        """
+        Pickles the simulation without its stats, which belong to the run rather than to the simulation state.
+        """
+        state = self.__dict__.copy()
+        state['stats'] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Unpickles the simulation with disabled stats. See set_stats().
+        """
+        self.__dict__.update(state)
+        self.set_stats(None)
+
+
+class StripSimulation:
+    """
+    Class object runs a simulation across worker processes, for boards too big for one. The board is cut into one
+    strip of columns per worker, and every worker proposes and makes the moves of the organisms anchored in its
+    strip. Each batch, the parent process gathers the proposals of all workers, resolves their conflicts over the
+    whole board and commits the accepted moves to the occupancy grid, which the workers read through shared memory.
+    Organisms change hands between time steps when their anchor column crosses into another strip. As conflicts
+    are resolved just like in Simulation.step_simultaneous(), and every organism draws from its own random stream,
+    the run matches a Simulation of the same organisms move for move. Call close() when done.
+    """
+    def __init__(self, hex_cnt, width, organisms, workers=None, seed=None, viewport=None, stats=None):
+        """
+        Establishes pertinent self objects for use in the main program and starts the worker processes.
+
+            **Parameters**
+                hex_cnt: int
+                        Number of hexagons across the diagonal of the board.
+                width: int
+                        Pixel width of a single hexagon.
+                organisms: list: Ciliate, Amoeba
+                        List of Ciliate objects followed by Amoeba objects, each holding its own random stream.
+                workers: int
+                        Number of worker processes. One per CPU if not given.
+                seed: int
+                        Seed the organisms' random streams were spawned from, if any. Kept for the record.
+                viewport: tuple
+                        Optional pixel window (x0, y0, width, height) of the board to render frames of.
+                stats: RunStats
+                        Optional stats to time the phases of the run in, as seen from the parent process.
+
+            **Returns**
+                No return
+        """
+        self.seed = seed
+        self.stats = stats if stats is not None else RunStats(enabled=False)
+        ciliates = [org for org in organisms if not isinstance(org, Amoeba)]
+        amoebae = [org for org in organisms if isinstance(org, Amoeba)]
+        for i, amoeba in enumerate(amoebae):
+            amoeba.index = len(ciliates) + i
+        workers = min(workers or os.cpu_count() or 1, hex_cnt + 1)
+        self.bounds = np.linspace(0, hex_cnt + 1, workers + 1).round().astype(int)
+        # The parent keeps the board for rendering. Its occupancy grid moves into shared memory.
+        with self.stats.phase('board_setup'):
+            self.board = Board(hex_cnt, width, '', [*ciliates, *amoebae], viewport)
+        self.board.stats = self.stats
+        self.memory = shared_memory.SharedMemory(create=True, size=self.board.occupancy.nbytes)
+        occupancy = np.ndarray(self.board.occupancy.shape, dtype=np.int32, buffer=self.memory.buf)
+        occupancy[:] = self.board.occupancy
+        self.board.occupancy = occupancy
+        self.connections, self.processes = [], []
+        for worker in range(workers):
+            connection, worker_connection = Pipe()
+            process = Process(target=run_strip_worker, daemon=True,
+                              args=(worker_connection, self.memory.name, occupancy.shape, hex_cnt, width, self.bounds,
+                                    worker))
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+        # Hand every organism to the worker owning the strip of its anchor column
+        population = CiliatePopulation(ciliates, self.board)
+        ciliate_strips = get_strips(self.bounds, population.get_anchor_columns())
+        amoeba_strips = [get_strips(self.bounds, amoeba.get_anchor_column()) for amoeba in amoebae]
+        arrivals = []
+        for strip in range(workers):
+            arrivals.append((strip, population.remove(np.flatnonzero(ciliate_strips == strip)),
+                             [amoeba for amoeba, amoeba_strip in zip(amoebae, amoeba_strips) if amoeba_strip == strip]))
+            ciliate_strips = ciliate_strips[ciliate_strips != strip]
+            for amoeba in arrivals[-1][2]:
+                amoeba.brd = None
+        self.adopt(arrivals)
+        self.t = 0
+        # (organism index, vacated, occupied) for every move of the latest time step, in the order they happened
+        self.moves = []
+
+    def adopt(self, arrivals):
+        """
+        Hands organisms over to the workers owning their new strips.
+
+            **Parameters**
+                self
+                arrivals: list: tuple
+                        (strip, ciliate packet or None, amoebae) of each handover.
+
+            **Returns**
+                No return
+        """
+        worker_arrivals = [[] for _ in self.connections]
+        for strip, packet, amoebae in arrivals:
+            worker_arrivals[strip].append((packet, amoebae))
+        for connection, arrivals in zip(self.connections, worker_arrivals):
+            if len(arrivals) > 0:
+                connection.send(('adopt', arrivals))
+
+    def step(self, n=1, sink=None, every=1):
+        """
+        Advances the simulation by n time steps. In each time step every amoeba moves three times and each
+        ciliate moves once, in the batches of Simulation.step_simultaneous().
+
+            **Parameters**
+                self
+                n: int
+                        Number of time steps to advance.
+                sink: VideoStream, ImageFolder, FramePipeline
+                        Optional frame sink. Gets the rendered board after every time step divisible by every.
+                every: int
+                        Render one frame every this many time steps.
+
+            **Returns**
+                No return
+        """
+        for _ in range(n):
+            self.t += 1
+            self.moves = []
+            # Each message tells the workers which moves of the last batch went through and asks for the next batch
+            accepted = [None] * len(self.connections)
+            for round_number in range(3):
+                with self.stats.phase('strip_moves'):
+                    for connection, worker_accepted in zip(self.connections, accepted):
+                        connection.send(('propose', worker_accepted, round_number == 0))
+                    proposals = [connection.recv() for connection in self.connections]
+                with self.stats.phase('conflicts'):
+                    accepted = self.resolve_conflicts(proposals)
+                    moves = sorted(move for worker_proposals, worker_accepted in zip(proposals, accepted)
+                                   for move, is_accepted in zip(worker_proposals, worker_accepted) if is_accepted)
+                with self.stats.phase('apply_moves'):
+                    self.board.apply_moves(moves)
+                self.moves.extend(moves)
+            with self.stats.phase('migration'):
+                for connection, worker_accepted in zip(self.connections, accepted):
+                    connection.send(('finish', worker_accepted))
+                self.adopt([arrival for connection in self.connections for arrival in connection.recv()])
+            if sink is not None and self.t % every == 0:
+                write_frame(self.board, sink, self.stats)
+
+    def resolve_conflicts(self, proposals):
+        """
+        Helper function to step(). Resolves the conflicts between the proposals of all workers at once, see
+        resolve_conflicts().
+
+            **Parameters**
+                self
+                proposals: list: list: tuple
+                        (organism index, vacated, occupied) of each proposed move, one list per worker.
+
+            **Returns**
+                list: np.ndarray
+                        Boolean mask of the accepted proposals of each worker.
+        """
+        batch = [proposal for worker_proposals in proposals for proposal in worker_proposals]
+        accepted = resolve_conflicts(self.board, batch)
+        return np.split(accepted, np.cumsum([len(worker_proposals) for worker_proposals in proposals])[:-1])
+
+    def state(self):
+        """
+        Gets a snapshot of the simulation state, in the layout of Simulation.state().
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    Time step 't', and lists of hexagonal coordinate lists under 'ciliates' and 'amoebae'.
+        """
+        for connection in self.connections:
+            connection.send(('state',))
+        ciliates, amoebae = [], []
+        for connection in self.connections:
+            worker_ciliates, worker_amoebae = connection.recv()
+            ciliates += worker_ciliates
+            amoebae += worker_amoebae
+        return {'t': self.t,
+                'ciliates': [hxhy_list for index, hxhy_list in sorted(ciliates)],
+                'amoebae': [hxhy_list for index, hxhy_list in sorted(amoebae)]}
+
+    def close(self):
+        """
+        Stops the worker processes and frees the shared occupancy grid. The board keeps a private copy of it.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        for connection in self.connections:
+            connection.send(('stop',))
+        for process in self.processes:
+            process.join()
+        self.board.occupancy = self.board.occupancy.copy()
+        self.memory.close()
+        self.memory.unlink()
+
+
+class ImageFolder:
+    """
+    Class object saves rendered frames out as numbered .png images in a folder. Held frames get no image of their
+    own. Their numbers are logged in the folder's hold log instead, see repeat() and make_video().
+    """
+    hold_log = 'holds.txt'
+
+    def __init__(self, img_path, digits=3, frame_count=0):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                img_path: str
+                        Complete folder pathway to where simulation images are saved to.
+                digits: int
+                        Zero padded length of the image names.
+                frame_count: int
+                        Number of the next frame. Nonzero when carrying on from a checkpoint.
+
+            **Returns**
+                No return
+        """
+        self.img_path, self.digits = img_path, digits
+        self.frame_count = frame_count
+        # Board frame key of the latest frame, see write_frame()
+        self.frame_key = None
+
+    def write(self, pixels, palette):
+        """
+        Saves one frame as a palette .png, named by its frame number.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+
+            **Returns**
+                No return
+        """
+        self.commit(self.encode(pixels, palette))
+
+    def encode(self, pixels, palette):
+        """
+        Compresses one frame to .png bytes. Safe to call from several threads at once, see FramePipeline.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+
+            **Returns**
+                bytes
+                    The .png file contents.
+        """
+        png = io.BytesIO()
+        get_palette_image(pixels, palette).save(png, format='PNG')
+        return png.getvalue()
+
+    def commit(self, encoded):
+        """
+        Writes an encoded frame out, named by its frame number. Frames must be committed in order.
+
+            **Parameters**
+                self
+                encoded: bytes
+                        The .png file contents from encode().
+
+            **Returns**
+                No return
+        """
+        with open(self.img_path + get_image_name(self.frame_count, self.digits) + '.png', 'wb') as f:
+            f.write(encoded)
+        self.frame_count += 1
+
+    def repeat(self):
+        """
+        Holds the latest frame for one more frame by logging its frame number in the hold log. No image is written,
+        so the image before it stands for both frames.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        with open(self.img_path + ImageFolder.hold_log, 'a') as f:
+            f.write(str(self.frame_count) + '\n')
+        self.frame_count += 1
+
+    def split(self):
+        """
+        Nothing to finish for an image folder, every frame is already its own file. Here so all frame sinks can be
+        checkpointed the same way.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        pass
+
+    def get_cursor(self):
+        """
+        Gets where the output stands, to reopen the image folder from a checkpoint. See open_sink().
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    The sink class name under 'sink' and its constructor arguments under 'args'.
+        """
+        return {'sink': 'ImageFolder',
+                'args': {'img_path': self.img_path, 'digits': self.digits, 'frame_count': self.frame_count}}
+
+    def close(self):
+        """
+        Nothing to finish for an image folder. Here so all frame sinks can be closed the same way.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        pass
+
+
+class VideoStream:
+    """
+    Class object streams rendered frames straight into the video encoder. No image files are written and only the
+    frame being encoded is held in memory.
+    """
+    def __init__(self, file_name, size, fps, segment_names=(), frame_count=0):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                file_name: str
+                        Name of the .mp4 video being made.
+                size: tuple
+                        Pixel (width, height) of every frame.
+                fps: int
+                        Frames Per Second of the video being made.
+                segment_names: list: str
+                        Finished segments of the video, when carrying on from a checkpoint. See split().
+                frame_count: int
+                        Number of frames already in the finished segments.
+
+            **Returns**
+                No return
+        """
+        self.file_name, self.size, self.fps = file_name, tuple(size), fps
+        self.segment_names, self.frame_count = list(segment_names), frame_count
+        # Frame count at the start of the current segment
+        self.segment_start = frame_count
+        # Board frame key and RGB frame of the latest frame, see write_frame()
+        self.frame_key, self.last_frame = None, None
+        self.writer = FFMPEG_VideoWriter(self.get_segment_name(), self.size, fps)
+
+    def get_segment_name(self):
+        """
+        Gets the name of the file being encoded into. That is the video itself until the stream is first split.
+
+            **Parameters**
+                self
+
+            **Returns**
+                str
+                    Name of the current .mp4 file.
+        """
+        if not self.segment_names:
+            return self.file_name
+        return self.file_name + '.part' + str(len(self.segment_names)) + '.mp4'
+
+    def write(self, pixels, palette):
+        """
+        Encodes one frame.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+
+            **Returns**
+                No return
+        """
+        self.commit(self.encode(pixels, palette))
+
+    def encode(self, pixels, palette):
+        """
+        Turns palette indexes into RGB for the encoder. Safe to call from several threads at once, see FramePipeline.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+
+            **Returns**
+                np.ndarray
+                    uint8 RGB frame of shape (height, width, 3).
+        """
+        return palette[pixels]
+
+    def commit(self, encoded):
+        """
+        Pipes an RGB frame into the encoder. Frames must be committed in order.
+
+            **Parameters**
+                self
+                encoded: np.ndarray
+                        uint8 RGB frame from encode().
+
+            **Returns**
+                No return
+        """
+        self.writer.write_frame(encoded)
+        self.last_frame = encoded
+        self.frame_count += 1
+
+    def repeat(self):
+        """
+        Holds the latest frame for one more frame by piping it to the encoder again. The frame is not rendered or
+        converted again, and the encoder stores an unchanged frame in very few bytes.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.commit(self.last_frame)
+
+    def split(self):
+        """
+        Finishes the current segment of the video and starts the next one, so every frame written so far is safe
+        on disk. The segments are joined into the video by close().
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.writer.close()
+        if not self.segment_names:
+            os.replace(self.file_name, self.file_name + '.part0.mp4')
+            self.segment_names.append(self.file_name + '.part0.mp4')
+        else:
+            self.segment_names.append(self.get_segment_name())
+        self.segment_start = self.frame_count
+        self.writer = FFMPEG_VideoWriter(self.get_segment_name(), self.size, self.fps)
+
+    def get_cursor(self):
+        """
+        Gets where the output stands, to reopen the video from a checkpoint. Only valid right after split().
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    The sink class name under 'sink' and its constructor arguments under 'args'.
+        """
+        return {'sink': 'VideoStream',
+                'args': {'file_name': self.file_name, 'size': self.size, 'fps': self.fps,
+                         'segment_names': list(self.segment_names), 'frame_count': self.frame_count}}
+
+    def close(self):
+        """
+        Finishes the video file, joining its segments if the stream was split.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.writer.close()
+        if self.segment_names:
+            segment_names = list(self.segment_names)
+            # A segment started by the final split holds no frames
+            if self.frame_count > self.segment_start:
+                segment_names.append(self.get_segment_name())
+            else:
+                os.remove(self.get_segment_name())
+            join_video_segments(segment_names, self.file_name)
+
+
+class FramePipeline:
+    """
+    Class object overlaps frame output with the simulation. Frames handed to write() are encoded by a pool of
+    threads while the next time steps run, and reach the wrapped sink in the order they were written. At most
+    queue_size frames are in flight, so write() only blocks when the queue is full.
+    """
+    def __init__(self, sink, workers=2, queue_size=8):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                sink: VideoStream, ImageFolder
+                        The frame sink to encode frames for.
+                workers: int
+                        Number of encoder threads.
+                queue_size: int
+                        Most frames held in memory waiting to be encoded or written.
+
+            **Returns**
+                No return
+        """
+        self.sink = sink
+        self.executor = ThreadPoolExecutor(workers)
+        self.slots = threading.BoundedSemaphore(queue_size)
+        # Task of the latest frame. Each task commits its frame only after the task before it has committed.
+        self.last_task = None
+        # Board frame key of the latest frame, see write_frame()
+        self.frame_key = None
+
+    def write(self, pixels, palette):
+        """
+        Queues one frame for encoding. The pixels are copied, as the board keeps painting into its buffer.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+
+            **Returns**
+                No return
+        """
+        self.submit(self.output_frame, pixels.copy(), palette)
+
+    def repeat(self):
+        """
+        Queues holding the latest frame for one more frame. See VideoStream.repeat().
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.submit(self.repeat_frame)
+
+    def submit(self, function, *args):
+        """
+        Helper function to write() and repeat(). Queues a task on the encoder threads, after the latest one.
+
+            **Parameters**
+                self
+                function: callable
+                        Task taking the given arguments followed by the task before it.
+                args:
+                        Arguments of the task.
+
+            **Returns**
+                No return
+        """
+        # Raise an earlier frame's error here rather than queueing behind it
+        if self.last_task is not None and self.last_task.done():
+            self.last_task.result()
+        self.slots.acquire()
+        self.last_task = self.executor.submit(function, *args, self.last_task)
+        self.last_task.add_done_callback(lambda task: self.slots.release())
+
+    def output_frame(self, pixels, palette, previous_task):
+        """
+        Helper function to write(). Runs on an encoder thread. Encodes a frame, waits for the frame before it to be
+        committed, then commits it. Tasks start in the order they were queued, so a task never waits on a later one.
+
+            **Parameters**
+                self
+                pixels: np.ndarray
+                        Palette index pixel buffer of shape (height, width).
+                palette: np.ndarray
+                        uint8 RGB palette of shape (n_colors, 3).
+                previous_task: Future
+                        Task of the frame before, or None for the first frame.
+
+            **Returns**
+                No return
+        """
+        encoded = self.sink.encode(pixels, palette)
+        if previous_task is not None:
+            previous_task.result()
+        self.sink.commit(encoded)
+
+    def repeat_frame(self, previous_task):
+        """
+        Helper function to repeat(). Runs on an encoder thread. Waits for the frame before to be committed, then
+        holds it.
+
+            **Parameters**
+                self
+                previous_task: Future
+                        Task of the frame before.
+
+            **Returns**
+                No return
+        """
+        previous_task.result()
+        self.sink.repeat()
+
+    def drain(self):
+        """
+        Waits for every queued frame to be committed to the sink. Raises the error of any frame that failed.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        if self.last_task is not None:
+            self.last_task.result()
+
+    def split(self):
+        """
+        Drains the queue and splits the sink. See VideoStream.split().
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.drain()
+        self.sink.split()
+
+    def get_cursor(self):
+        """
+        Drains the queue and gets the sink's cursor. See VideoStream.get_cursor().
+
+            **Parameters**
+                self
+
+            **Returns**
+                dict
+                    The cursor of the sink.
+        """
+        self.drain()
+        return self.sink.get_cursor()
+
+    def finish(self):
+        """
+        Drains the queue and stops the encoder threads, leaving the sink open.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.drain()
+        self.executor.shutdown()
+
+    def close(self):
+        """
+        Finishes the pipeline and closes the sink.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.finish()
+        self.sink.close()
+
+
+class TrajectoryWriter:
+    """
+    Class object logs a simulation's organism positions as cell ids in a compact binary folder:
+        meta.json       board size, organism colors and slot layout, keyframe interval, step and keyframe counts
+        keyframes.i32   every organism's cell ids at each keyframe step, one row of int32 per keyframe
+        deltas.i32      (organism index, vacated cell id, occupied cell id) int32 rows, one per moved hexagon
+        offsets.i64     int64 row index into deltas where each time step's moves start, plus a final end
+    Every file besides meta.json can be opened with numpy.memmap. meta.json is written on opening and rewritten at
+    every keyframe and on closing, each time after the binary files are on disk, so a log cut short by a crash
+    still reads back up to its last keyframe.
+    """
+    def __init__(self, path, simulation, keyframe_interval=100):
+        """
+        Establishes pertinent self objects for use in the main program. Writes the current state as keyframe 0.
+
+            **Parameters**
+                path: str
+                        Folder to write the trajectory into. Created if missing.
+                simulation: Simulation
+                        The simulation being recorded, at its starting time step.
+                keyframe_interval: int
+                        Time steps between full keyframes.
+
+            **Returns**
+                No return
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path, self.keyframe_interval = path, keyframe_interval
+        self.get_cell_id = simulation.board.get_cell_id
+        organisms = simulation.board.organisms
+        slot_sizes = [len(org.hxhy_list) for org in organisms]
+        self.meta = {
+            'hex_diag': simulation.board.hex_diag,
+            'width': simulation.board.width,
+            'start_t': simulation.t,
+            'steps': 0,
+            'keyframes': 0,
+            'keyframe_interval': keyframe_interval,
+            'kinds': [type(org).__name__ for org in organisms],
+            'rgbs': [list(org.rgb) for org in organisms],
+            'slot_starts': [sum(slot_sizes[:i]) for i in range(len(slot_sizes) + 1)],
+        }
+        self.keyframes = open(os.path.join(path, 'keyframes.i32'), 'wb')
+        self.deltas = open(os.path.join(path, 'deltas.i32'), 'wb')
+        self.offsets = open(os.path.join(path, 'offsets.i64'), 'wb')
+        self.delta_count = 0
+        self.offsets.write(np.array([0], dtype=np.int64).tobytes())
+        self.write_keyframe(organisms)
+
+    def write_keyframe(self, organisms):
+        """
+        Helper function to record(). Writes every organism's cell ids as one keyframe row.
+
+            **Parameters**
+                self
+                organisms: list: Ciliate, Amoeba
+                        The board's organisms in board order.
+
+            **Returns**
+                No return
+        """
+        row = [self.get_cell_id(hxhy) for org in organisms for hxhy in org.hxhy_list]
+        self.keyframes.write(np.array(row, dtype=np.int32).tobytes())
+        self.meta['keyframes'] += 1
+        self.write_meta()
+
+    def write_meta(self):
+        """
+        Helper function to write_keyframe() and close(). Puts the binary files on disk, then writes meta.json next
+        to its path and moves it over, so the step and keyframe counts never run ahead of the data.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        for f in (self.keyframes, self.deltas, self.offsets):
+            f.flush()
+            os.fsync(f.fileno())
+        meta_name = os.path.join(self.path, 'meta.json')
+        with open(meta_name + '.tmp', 'w') as f:
+            json.dump(self.meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(meta_name + '.tmp', meta_name)
+
+    def record(self, simulation):
+        """
+        Appends the moves of the simulation's latest time step, and a keyframe if one is due.
+
+            **Parameters**
+                self
+                simulation: Simulation
+                        The simulation being recorded, just after a time step.
+
+            **Returns**
+                No return
+        """
+        rows = []
+        for index, vacated, occupied in simulation.moves:
+            for hxhy_v, hxhy_o in zip(vacated, occupied):
+                rows.append((index, self.get_cell_id(hxhy_v), self.get_cell_id(hxhy_o)))
+        if len(rows) > 0:
+            self.deltas.write(np.array(rows, dtype=np.int32).tobytes())
+        self.delta_count += len(rows)
+        self.offsets.write(np.array([self.delta_count], dtype=np.int64).tobytes())
+        self.meta['steps'] += 1
+        if self.meta['steps'] % self.keyframe_interval == 0:
+            self.write_keyframe(simulation.board.organisms)
+
+    def close(self):
+        """
+        Writes meta.json with the final step count and closes the binary files.
+
+            **Parameters**
+                self
+
+            **Returns**
+                No return
+        """
+        self.write_meta()
+        for f in (self.keyframes, self.deltas, self.offsets):
+            f.close()
+
+
+class TrajectoryReader:
+    """
+    Class object reads a trajectory folder made by TrajectoryWriter through numpy.memmap. Any time step is rebuilt
+    from the keyframe at or before it plus at most keyframe_interval steps of deltas. Only the steps and keyframes
+    counted in meta.json are read, so a log still being written, or cut short, reads back up to its last keyframe.
+    """
+    def __init__(self, path):
+        """
+        Establishes pertinent self objects for use in the main program.
+
+            **Parameters**
+                path: str
+                        Folder the trajectory was written into.
+
+            **Returns**
+                No return
+        """
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.slot_starts = self.meta['slot_starts']
+        self.start_t, self.steps = self.meta['start_t'], self.meta['steps']
+        self.keyframe_interval = self.meta['keyframe_interval']
+        self.keyframes = self.open_memmap('keyframes.i32', np.int32, self.meta['keyframes'] * self.slot_starts[-1])
+        self.keyframes = self.keyframes.reshape(-1, self.slot_starts[-1])
+        self.offsets = self.open_memmap('offsets.i64', np.int64, self.steps + 1)
+        self.deltas = self.open_memmap('deltas.i32', np.int32, 3 * int(self.offsets[-1])).reshape(-1, 3)
+
+    def open_memmap(self, name, dtype, count):
+        """
+        Helper function to __init__(). Maps the start of one binary file read-only. Anything written after it is
+        left out.
+
+            **Parameters**
+                self
+                name: str
+                        File name inside the trajectory folder.
+                dtype: np.dtype
+                        Element type of the file.
+                count: int
+                        Number of elements to map.
+
+            **Returns**
+                np.ndarray
+                    Memory mapped array, or an empty array if count is 0.
+        """
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode='r', shape=(count,))
+
+    def cells_at(self, t):
+        """
+        Rebuilds every organism's cell ids at time step t.
+
+            **Parameters**
+                self
+                t: int
+                        Time step between start_t and start_t + steps.
+
+            **Returns**
+                np.ndarray
+                    Cell ids of all organisms. Organism i holds cells[slot_starts[i]:slot_starts[i + 1]].
+        """
+        step = t - self.start_t
+        if not 0 <= step <= self.steps:
+            raise IndexError('Time step ' + str(t) + ' is not in this trajectory')
+        keyframe = step // self.keyframe_interval
+        cells = np.array(self.keyframes[keyframe])
+        self.apply_deltas(cells, keyframe * self.keyframe_interval, step)
+        return cells
+
+    def apply_deltas(self, cells, from_step, to_step):
+        """
+        Moves cell ids in place from their state after from_step to their state after to_step.
+
+            **Parameters**
+                self
+                cells: np.ndarray
+                        Cell ids of all organisms after from_step (counted from start_t).
+                from_step: int
+                        Step the cells are currently at.
+                to_step: int
+                        Step to bring the cells up to.
+
+            **Returns**
+                No return
+        """
+        for index, vacated, occupied in self.deltas[self.offsets[from_step]:self.offsets[to_step]]:
+            slot = cells[self.slot_starts[index]:self.slot_starts[index + 1]]
+            slot[np.nonzero(slot == vacated)[0][0]] = occupied
+
+    def organism_cells_at(self, t):
+        """
+        Splits the cell ids at time step t by organism.
+
+            **Parameters**
+                self
+                t: int
+                        Time step between start_t and start_t + steps.
+
+            **Returns**
+                list: np.ndarray
+                        Cell ids of each organism in board order.
+        """
+        cells = self.cells_at(t)
+        return [cells[self.slot_starts[i]:self.slot_starts[i + 1]] for i in range(len(self.slot_starts) - 1)]
+
+
+def render_frame_range(traj_path, first_t, last_t, img_path=None, segment_name=None, fps=8, viewport=None):
+    """
+    Renders time steps first_t to last_t of a recorded trajectory, either as numbered .png images or as one
+    video segment. Run by the worker processes of render_trajectory().
+
+        **Parameters**
+            traj_path: str
+                    Folder the trajectory was written into.
+            first_t: int
+                    First time step to render.
+            last_t: int
+                    Last time step to render, included.
+            img_path: str
+                    Folder pathway to save images to, when not writing a video segment.
+            segment_name: str
+                    Name of the .mp4 segment to write instead of images.
+            fps: int
+                    Frames Per Second of the video segment.
+            viewport: tuple
+                    Optional pixel window (x0, y0, width, height) to render instead of the whole board.
+
+        **Returns**
+            int
+                Number of frames rendered.
+    """
+    reader = TrajectoryReader(traj_path)
+    # The geometry and its label map are read-only. Forked workers share the parent's cached copy.
+    board = Board(reader.meta['hex_diag'], reader.meta['width'], '', organisms=None, viewport=viewport)
+    board.label_map = board.get_raster()[0]
+    palette_indexes = [board.get_palette_index(tuple(rgb)) for rgb in reader.meta['rgbs']]
+    slots = [(reader.slot_starts[i], reader.slot_starts[i + 1]) for i in range(len(palette_indexes))]
+    if segment_name is not None:
+        sink = VideoStream(segment_name, board.frame_size, fps)
+    else:
+        sink = ImageFolder(img_path, max(3, len(str(reader.start_t + reader.steps))))
+        sink.frame_count = first_t
+    cells = reader.cells_at(first_t)
+    for t in range(first_t, last_t + 1):
+        if t > first_t:
+            reader.apply_deltas(cells, t - 1 - reader.start_t, t - reader.start_t)
+        # Organisms later in board order are painted on top, as on the live board
+        board.cell_state[:] = 0
+        for (start, end), palette_index in zip(slots, palette_indexes):
+            board.cell_state[cells[start:end]] = palette_index
+        sink.write(board.render(), board.get_palette_array())
+    sink.close()
+    return last_t - first_t + 1
+
+
+def render_trajectory(traj_path, out_path, workers=None, fps=None, viewport=None):
+    """
+    Re-renders a recorded trajectory across a process pool. The time steps are split into one contiguous range
+    per worker. With fps given, each worker encodes a video segment and the segments are joined in order into the
+    video out_path. Otherwise every worker saves .png images into the folder out_path.
+
+        **Parameters**
+            traj_path: str
+                    Folder the trajectory was written into.
+            out_path: str
+                    Image folder pathway, or the name of the .mp4 video when fps is given.
+            workers: int
+                    Number of worker processes. Defaults to the number of cores.
+            fps: int
+                    Frames Per Second of the video. Leave as None to save images instead.
+            viewport: tuple
+                    Optional pixel window (x0, y0, width, height) to render instead of the whole board.
+
+        **Returns**
+            No return
+    """
+    reader = TrajectoryReader(traj_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    first, last = reader.start_t, reader.start_t + reader.steps
+    bounds = np.linspace(first, last + 1, min(workers, last - first + 1) + 1).astype(int)
+    ranges = [(int(bounds[i]), int(bounds[i + 1]) - 1) for i in range(len(bounds) - 1)]
+    # Build the label map once here so forked workers inherit it instead of rebuilding it
+    Board(reader.meta['hex_diag'], reader.meta['width'], '', organisms=None, viewport=viewport).get_raster()
+    if fps is None:
+        os.makedirs(out_path, exist_ok=True)
+        segment_names = [None] * len(ranges)
+    else:
+        segment_names = [out_path + '.part' + str(i) + '.mp4' for i in range(len(ranges))]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [executor.submit(render_frame_range, traj_path, first_t, last_t,
+                                out_path if fps is None else None, segment_name, fps or 8, viewport)
+                for (first_t, last_t), segment_name in zip(ranges, segment_names)]
+        for job in jobs:
+            job.result()
+    if fps is not None:
+        join_video_segments(segment_names, out_path)
+
+
+def join_video_segments(segment_names, file_name):
+    """
+    Helper function to render_trajectory(). Joins video segments in order without re-encoding and deletes them.
+
+        **Parameters**
+            segment_names: list: str
+                    Names of the .mp4 segments in play order.
+            file_name: str
+                    Name of the joined .mp4 video.
+
+        **Returns**
+            No return
+    """
+    list_name = file_name + '.segments.txt'
+    with open(list_name, 'w') as f:
+        for segment_name in segment_names:
+            f.write("file '" + os.path.abspath(segment_name) + "'\n")
+    subprocess.run([get_setting('FFMPEG_BINARY'), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                    '-i', list_name, '-c', 'copy', file_name], check=True)
+    for name in [list_name, *segment_names]:
+        os.remove(name)
+
+
+def get_palette_image(pixels, palette):
+    """
+    Wraps a palette index pixel buffer as a "P" mode PIL image.
+
+        **Parameters**
+            pixels: np.ndarray
+                    Palette index pixel buffer of shape (height, width).
+            palette: np.ndarray
+                    uint8 RGB palette of shape (n_colors, 3).
+
+        **Returns**
+            Image object
+                Palette image sharing the colors of the board.
+    """
+    img = Image.fromarray(pixels, mode="P")
+    img.putpalette(palette.tobytes())
+    return img
+
+
+def write_frame(brd, sink, stats=None):
+    """
+    Brings a board's pixels up to date and hands them to a frame sink as one frame. If nothing the frame shows has
+    changed since the sink's latest frame, the sink holds that frame instead, and the board is neither rendered nor
+    encoded.
+
+        **Parameters**
+            brd: Board
+                    The board to film.
+            sink: VideoStream, ImageFolder, FramePipeline
+                    The frame sink.
+            stats: RunStats
+                    Optional stats to time the 'render' and 'frame_output' phases in. The board's own if not given.
+
+        **Returns**
+            No return
+    """
+    stats = stats if stats is not None else brd.stats
+    with stats.phase('render'):
+        frame_key = brd.get_frame_key()
+        pixels = brd.pixels if frame_key != sink.frame_key else None
+    with stats.phase('frame_output'):
+        if pixels is None:
+            sink.repeat()
+        else:
+            sink.write(pixels, brd.get_palette_array())
+            sink.frame_key = frame_key
+    stats.count('frames')
+    stats.count('frames_repeated', pixels is None)
+
+
+def resolve_conflicts(brd, proposals):
+    """
+    Picks the proposed moves that can be committed together in one batch. A move may only claim hexagons that are
+    on the board and free. When several moves claim the same hexagon, the organism with the lowest board index gets
+    it and the others are turned down, so the outcome does not depend on the order the moves were proposed in.
+
+        **Parameters**
+            brd: Board
+                    The board the moves are made on.
+            proposals: list: tuple
+                    (organism index, vacated, occupied) of each proposed move.
+
+        **Returns**
+            np.ndarray
+                Boolean mask of the proposals that can be committed together.
+    """
+    accepted = np.ones(len(proposals), dtype=bool)
+    claims = [(p, index, hxhy) for p, (index, vacated, occupied) in enumerate(proposals) for hxhy in occupied]
+    if len(claims) == 0:
+        return accepted
+    claim_proposals, claim_owners, claim_hxhys = zip(*claims)
+    claim_proposals, claim_owners = np.array(claim_proposals), np.array(claim_owners)
+    hx, hy = np.array(claim_hxhys, dtype=np.int64).T
+    claim_cells = brd.get_cell_ids(hx, hy)
+    blocked = (claim_cells == brd.oob_id) | (brd.get_owner_counts(claim_cells) > 0)
+    # Sort the claims by hexagon, then by organism. Every claim after the first on a hexagon loses.
+    order = np.lexsort((claim_owners, claim_cells))
+    sorted_cells = claim_cells[order]
+    lost = np.zeros(len(claims), dtype=bool)
+    lost[order[1:]] = sorted_cells[1:] == sorted_cells[:-1]
+    accepted[claim_proposals[blocked | lost]] = False
+    return accepted
+
+
+def move_batch(brd, population, amoebae, with_ciliates=True, stats=None):
+    """
+    Moves a ciliate population and a list of amoebae in one conflict-free batch. Accepted amoebae take their move
+    and propose the next one, turned down amoebae stay put and draw a new move. Accepted ciliates take their move.
+
+        **Parameters**
+            brd: Board
+                    The board the organisms live on.
+            population: CiliatePopulation
+                    The ciliates, whose ids are their board indexes.
+            amoebae: list: Amoeba
+                    The amoebae, whose index attributes are their board indexes.
+            with_ciliates: bool
+                    Let the ciliates move in this batch. The amoebae always do.
+            stats: RunStats
+                    Optional stats to time the phases of the batch and count turned down moves in.
+
+        **Returns**
+            list: tuple
+                (organism index, vacated, occupied) of every committed move.
+    """
+    stats = stats if stats is not None else brd.stats
+    proposals, rows = get_batch_proposals(population, amoebae, with_ciliates, stats)
+    with stats.phase('conflicts'):
+        accepted = resolve_conflicts(brd, proposals)
+        moves = [move for move, is_accepted in zip(proposals, accepted) if is_accepted]
+    with stats.phase('apply_moves'):
+        brd.apply_moves(moves)
+    advance_batch(brd, population, amoebae, rows, accepted, stats)
+    return moves
+
+
+def get_batch_proposals(population, amoebae, with_ciliates, stats):
+    """
+    Helper function to move_batch(). Gathers the pending moves of a ciliate population and a list of amoebae.
+    Ciliates that stay put propose nothing.
+
+        **Parameters**
+            population: CiliatePopulation
+                    The ciliates, whose ids are their board indexes.
+            amoebae: list: Amoeba
+                    The amoebae, whose index attributes are their board indexes.
+            with_ciliates: bool
+                    Let the ciliates move in this batch. The amoebae always do.
+            stats: RunStats
+                    Stats to count boxed in and invalid moves in.
+
+        **Returns**
+            list: tuple
+                (organism index, vacated, occupied) of each proposed move, ciliates first, then one per amoeba.
+            list: int
+                Rows of the ciliates that proposed a move, or None if the ciliates sit the batch out.
+    """
+    proposals = [(amoeba.index, *amoeba.get_move_delta()) for amoeba in amoebae]
+    stats.count('amoeba_moves_boxed_in', sum(len(occupied) == 0 for index, vacated, occupied in proposals))
+    if not with_ciliates:
+        return proposals, None
+    ciliate_deltas = population.get_move_deltas()
+    rows = [i for i, (vacated, occupied) in enumerate(ciliate_deltas) if len(occupied) > 0]
+    stats.count('ciliate_moves_invalid', len(population) - len(rows))
+    return [(int(population.ids[i]), *ciliate_deltas[i]) for i in rows] + proposals, rows
+
 
-            **Returns**
-                random.choice: list: tuple
-                        Random choice from selected ring to be erased from the self in the new coordinates.
-        """
-        # Keep checking concentric rings for self.reduced_perimeter coordinates until none are found.
-        # The largest ring that still has reduced_perimeter coordinates should choose one at random if more than one,
-        # but should not choose a fingertip if it's a tie. This will help keep the amoeba elongated.
-        rings_list_of_lists, ring_list, refined_ring_list = [], [], []
-        initialized, radius = False, 2
-        while not initialized:
-            # Initialize first ring to start the while loop
-            raw_ring_list, ring_list = get_ring(center_hex, radius), []
-            for hxhy in raw_ring_list:
-                if hxhy in self.reduced_p_hxhy_list:
-                    ring_list.append(hxhy)
-            if len(ring_list) == 0:
-                radius += 1
-                continue
-            initialized = True
-
-        # Search larger and larger rings for self perimeter hexagons until none show up
-        while len(ring_list) > 0:
-            rings_list_of_lists.append(ring_list)
-            # Reinitialize to a bigger ring
-            ring_list, radius = [], radius + 1
-            raw_ring_list = get_ring(center_hex, radius)
-            for hxhy in raw_ring_list:
-                if hxhy in self.reduced_p_hxhy_list:
-                    ring_list.append(hxhy)
+def advance_batch(brd, population, amoebae, rows, accepted, stats):
+    """
+    Helper function to move_batch(). Moves the organisms on to their next moves once a batch is on the board.
 
-        # Randomly select from the outer half of the ring set for recruitment.
-        index_1_of_2 = math.ceil(1 / 2 * (len(rings_list_of_lists) - 1))
-        index_2_of_2 = len(rings_list_of_lists) - 1
-        index = random.choice(range(index_1_of_2, index_2_of_2 + 1))
-        outer_ring_list = rings_list_of_lists[index].copy()
+        **Parameters**
+            brd: Board
+                    The board the organisms live on, with the batch applied.
+            population: CiliatePopulation
+                    The ciliates, whose ids are their board indexes.
+            amoebae: list: Amoeba
+                    The amoebae, in the order they proposed their moves.
+            rows: list: int
+                    Rows of the ciliates that proposed a move, or None if the ciliates sat the batch out.
+            accepted: np.ndarray
+                    Boolean mask of the accepted proposals, in the order of get_batch_proposals().
+            stats: RunStats
+                    Stats to time the moves and count turned down moves in.
 
-        # Remove fingertips from selection if non-fingertips to choose from
-        fngr_count = 0
-        if len(outer_ring_list) > 1:
-            for hxhy in outer_ring_list:
-                if hxhy in self.fingertips_hxhy_list:
-                    fngr_count += 1
-            if fngr_count == len(outer_ring_list):
-                for hxhy in outer_ring_list:
-                    refined_ring_list.append(hxhy)
+        **Returns**
+            No return
+    """
+    ciliate_count = 0 if rows is None else len(rows)
+    stats.count('ciliate_moves_rejected', ciliate_count - np.count_nonzero(accepted[:ciliate_count]))
+    stats.count('amoeba_moves_rejected', len(amoebae) - np.count_nonzero(accepted[ciliate_count:]))
+    with stats.phase('amoeba_moves'):
+        for amoeba, is_accepted in zip(amoebae, accepted[ciliate_count:]):
+            if is_accepted:
+                amoeba.advance(brd)
             else:
-                for hxhy in outer_ring_list:
-                    if hxhy not in self.fingertips_hxhy_list:
-                        refined_ring_list.append(hxhy)
-        else:
-            refined_ring_list.extend(outer_ring_list)
-        return random.choice(refined_ring_list)
+                amoeba.reject_move(brd)
+    if rows is not None:
+        with stats.phase('ciliate_moves'):
+            ciliates_accepted = np.zeros(len(population), dtype=bool)
+            ciliates_accepted[rows] = accepted[:ciliate_count]
+            population.advance(ciliates_accepted)
 
-    def is_valid_move(self, hxhy):
-        """
-        Checks if a move will hit another organism or go off the board.
 
-            **Parameters**
-                self
-                hxhy: tuple
-                        The hexagon being added to the amoeba.
+def get_strips(bounds, columns):
+    """
+    Finds the strip of a StripSimulation each column falls in.
 
-            **Returns**
-                True/False
-        """
-        big_list = self.get_list_of_everything_besides_the_amoeba()
-        if hxhy in big_list:
-            return False
-        return True
+        **Parameters**
+            bounds: np.ndarray
+                    First column of every strip, followed by the end of the last one.
+            columns: np.ndarray
+                    hx of each column of interest.
 
-    def get_list_of_everything_besides_the_amoeba(self):
-        """
-        Helper function to is_valid_move(). Makes one big list containing the outer boundary fence
-        and the organisms besides the amoeba.
+        **Returns**
+            np.ndarray
+                Strip number of each column.
+    """
+    return np.clip(np.searchsorted(bounds, columns, side='right') - 1, 0, len(bounds) - 2)
 
-            **Parameters**
-                self
 
-            **Returns**
-                big_list_of_hxhy: list: tuple
-                        List of hex coordinates for all organisms (besides the amoeba) and outer boundary fence.
-        """
-        # Put the out of bounds and the ciliates in a list. Amoeba is indexed last in organisms list.
-        big_list_of_hxhy = self.brd.out_of_bounds
-        if self.brd.organisms is not None:
-            all_organisms = self.brd.organisms
-            for i, org in enumerate(all_organisms):
-                if i < len(all_organisms) - 1:
-                    big_list_of_hxhy.extend(org.hxhy_list)
-        return big_list_of_hxhy
+def run_strip_worker(connection, memory_name, shape, hex_cnt, width, bounds, worker):
+    """
+    Runs one worker process of a StripSimulation. The worker owns the organisms anchored in strip number worker,
+    and reads the occupancy grid the parent process commits their moves to. Answers the commands of the parent
+    process until told to stop:
+        ('adopt', arrivals): takes over (ciliate packet or None, amoebae) arrivals.
+        ('propose', accepted, with ciliates): moves the organisms on from the last batch, given the mask of its
+            accepted proposals, and replies with the proposals of the next batch, see get_batch_proposals().
+        ('finish', accepted): moves the organisms on from the last batch of the time step, then hands over the
+            ones whose anchor left the strip. Replies with their (strip, ciliate packet or None, amoebae).
+        ('state',): replies with (board index, hexagonal coordinates) of every ciliate and every amoeba.
+        ('stop',): exits.
 
+        **Parameters**
+            connection: multiprocessing.connection.Connection
+                    The worker's end of the pipe to the parent process.
+            memory_name: str
+                    Name of the shared memory block holding the occupancy grid.
+            shape: tuple
+                    Shape of the occupancy grid.
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            bounds: np.ndarray
+                    First column of every strip, followed by the end of the last one.
+            worker: int
+                    Number of this worker and its strip.
 
-class Neighbors2Hex:
+        **Returns**
+            No return
     """
-    Class object holds the neighboring hexagonal coordinates around a center point.
+    memory = shared_memory.SharedMemory(name=memory_name)
+    board = Board(hex_cnt, width, '', organisms=None)
+    board.occupancy = np.ndarray(shape, dtype=np.int32, buffer=memory.buf)
+    stats = RunStats(enabled=False)
+    population, amoebae = CiliatePopulation([], board, ids=[]), []
+    # Ciliate rows of the last batch, see get_batch_proposals()
+    rows = None
+    while True:
+        command = connection.recv()
+        if command[0] == 'adopt':
+            for packet, arrivals in command[1]:
+                if packet is not None:
+                    population.add(packet)
+                for amoeba in arrivals:
+                    amoeba.brd = board
+                amoebae.extend(arrivals)
+        elif command[0] in ('propose', 'finish'):
+            if command[1] is not None:
+                advance_batch(board, population, amoebae, rows, command[1], stats)
+            if command[0] == 'propose':
+                proposals, rows = get_batch_proposals(population, amoebae, command[2], stats)
+                connection.send(proposals)
+                continue
+            leaving = []
+            ciliate_strips = get_strips(bounds, population.get_anchor_columns())
+            for target in np.unique(ciliate_strips[ciliate_strips != worker]).tolist():
+                leaving.append((target, population.remove(np.flatnonzero(ciliate_strips == target)), []))
+                ciliate_strips = ciliate_strips[ciliate_strips != target]
+            amoeba_strips = [int(get_strips(bounds, amoeba.get_anchor_column())) for amoeba in amoebae]
+            for amoeba, target in zip(amoebae, amoeba_strips):
+                if target != worker:
+                    amoeba.brd = None
+                    leaving.append((target, None, [amoeba]))
+            amoebae = [amoeba for amoeba, target in zip(amoebae, amoeba_strips) if target == worker]
+            connection.send(leaving)
+        elif command[0] == 'state':
+            connection.send(([(int(population.ids[i]), list(population[i].hxhy_list)) for i in range(len(population))],
+                             [(amoeba.index, list(amoeba.hxhy_list)) for amoeba in amoebae]))
+        elif command[0] == 'stop':
+            break
+    del board.occupancy
+    memory.close()
+
+
+@functools.lru_cache(maxsize=16)
+def get_board_geometry(hex_diag, width):
     """
-    def __init__(self, hxhy, brd):
-        """
-        Establishes pertinent self objects for use in the main program.
+    Gets the shared geometry of boards of a size, building it on first use. The most recently used sizes are kept.
 
-            **Parameters**
-                hxhy: tuple
-                        Hexagonal coordinate pair of interest.
-                brd: Board
-                        Current interation of the Board
+        **Parameters**
+            hex_diag: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
 
-            **Returns**
-                No return
-        """
-        self.hxhy, self.board = hxhy, brd
-        self.neighbors = self.get_neighs()
-        self.up_left, self.up, self.up_right, self.low_right, self.down, self.low_left = (
-            self.neighbors[0], self.neighbors[1], self.neighbors[2],
-            self.neighbors[3], self.neighbors[4], self.neighbors[5])
+        **Returns**
+            BoardGeometry
+                The geometry of every board of this size.
+    """
+    return BoardGeometry(hex_diag, width)
 
-    def get_neighs(self):
-        """
-        Calculates coordinates of the 6 immediate neighboring cells.
-        Indexed in clockwise fashion. Starting from the upper-left.
 
-            **Parameters**
-                self
+def get_read_only_array(values):
+    """
+    Helper function to BoardGeometry. Copies values into an integer array that cannot be written to, so a shared
+    geometry cannot be changed through it by accident.
 
-            **Returns**
-                list: tuple
-                        List of hexagonal coordinates neighboring the center point.
-        """
-        hxhy_up_left = (self.hxhy[0] - 1, self.hxhy[1])
-        hxhy_up = (self.hxhy[0], self.hxhy[1] - 1)
-        hxhy_up_right = (self.hxhy[0] + 1, self.hxhy[1] - 1)
-        hxhy_low_right = (self.hxhy[0] + 1, self.hxhy[1])
-        hxhy_down = (self.hxhy[0], self.hxhy[1] + 1)
-        hxhy_low_left = (self.hxhy[0] - 1, self.hxhy[1] + 1)
-        return [hxhy_up_left, hxhy_up, hxhy_up_right, hxhy_low_right, hxhy_down, hxhy_low_left]
+        **Parameters**
+            values: list: int
+                    The values to copy.
+
+        **Returns**
+            np.ndarray
+                Read-only int64 array.
+    """
+    array = np.array(values, dtype=np.int64)
+    array.flags.writeable = False
+    return array
+
+
+def get_neighbor_coords(hxhy):
+    """
+    Calculates coordinates of the 6 immediate neighboring cells in HEX_DIRECTIONS order.
+
+        **Parameters**
+            hxhy: tuple
+                    Hexagonal coordinate pair of interest.
+
+        **Returns**
+            list: tuple
+                    List of hexagonal coordinates neighboring the center point.
+    """
+    return [(hxhy[0] + dx, hxhy[1] + dy) for dx, dy in HEX_DIRECTIONS]
 
 
 def get_ring(hxhy, r):
@@ -859,13 +4022,80 @@ def get_ring(hxhy, r):
     return ring_list
 
 
-def initialize_4_ciliates(brd):
+def get_hex_distances(offsets):
+    """
+    Calculates hex distances for an array of axial coordinate offsets.
+
+        **Parameters**
+            offsets: np.ndarray
+                    Integer array of shape (n, 2) holding (dhx, dhy) offsets from a center hexagon.
+
+        **Returns**
+            np.ndarray
+                    Ring radius of each offset around the center.
+    """
+    dhx, dhy = offsets[:, 0], offsets[:, 1]
+    return (np.abs(dhx) + np.abs(dhy) + np.abs(dhx + dhy)) // 2
+
+
+def get_ring_positions(offsets, r):
+    """
+    Calculates where each offset falls in the list get_ring() returns for radius r. get_ring() walks the ring in
+    steps of 6, one hexagon from each of the 6 sides per step.
+
+        **Parameters**
+            offsets: np.ndarray
+                    Integer array of shape (n, 2) holding (dhx, dhy) offsets that all lie on the ring.
+            r: int
+                    Radius of the ring.
+
+        **Returns**
+            np.ndarray
+                    Index of each offset in get_ring(center, r).
+    """
+    dhx, dhy = offsets[:, 0], offsets[:, 1]
+    sides = [
+        (dhx == r) & (dhy > -r) & (dhy <= 0),
+        (dhy == -r) & (dhx > 0),
+        (dhx + dhy == -r) & (dhx > -r) & (dhx <= 0),
+        (dhx == -r) & (dhy >= 0) & (dhy < r),
+        (dhy == r) & (dhx < 0),
+        (dhx + dhy == r) & (dhx >= 0) & (dhx < r)]
+    steps = [-dhy, r - dhx, -dhx, dhy, dhx + r, dhx]
+    return np.select(sides, [6 * step + side for side, step in enumerate(steps)])
+
+
+def get_hexes_near(hxhy_list, radius):
+    """
+    Gets every hexagon within a given radius of any of the center hexagons, including the centers.
+
+        **Parameters**
+            hxhy_list: list: tuple
+                    Hexagonal coordinate pairs of the centers.
+            radius: int
+                    Largest ring radius to include.
+
+        **Returns**
+            list: tuple
+                    Hexagonal coordinates near the centers, without repeats.
+    """
+    near = {}
+    for hxhy in hxhy_list:
+        near[hxhy] = None
+        for r in range(1, radius + 1):
+            near.update(dict.fromkeys(get_ring(hxhy, r)))
+    return list(near)
+
+
+def initialize_4_ciliates(brd, rngs=None):
     """
     Establishes the colors and initial self coordinates of the 4 ciliates.
 
         **Parameters**
             brd: Board
                     Custom empty Board object.
+            rngs: list: RandomStream
+                    Optional random number stream for each ciliate.
 
         **Returns**
             list: Ciliate
@@ -878,18 +4108,114 @@ def initialize_4_ciliates(brd):
     hxhy2_o = (brd.hex_diag - dist, brd.hy_mins[-1 * dist - dist])  # upper right
     hxhy3_o = (dist, brd.hy_maxes[dist + dist])  # lower left
     hxhy4_o = (brd.hex_diag - dist, 0)  # lower right
-    # Get neighbors of the center points
-    neighs1, neighs2, neighs3, neighs4 = (
-        Neighbors2Hex(hxhy1_o, brd), Neighbors2Hex(hxhy2_o, brd),
-        Neighbors2Hex(hxhy3_o, brd), Neighbors2Hex(hxhy4_o, brd))
-    hxhy1 = [neighs1.up_left, hxhy1_o, neighs1.low_right]  # upper left
-    hxhy2 = [neighs2.low_left, hxhy2_o, neighs2.up_right]  # upper right
-    hxhy3 = [neighs3.low_left, hxhy3_o, neighs3.up_right]  # lower left
-    hxhy4 = [neighs4.up_left, hxhy4_o, neighs4.low_right]  # lower right
-    return [Ciliate(rgb1, hxhy1, brd), Ciliate(rgb2, hxhy2, brd), Ciliate(rgb3, hxhy3, brd), Ciliate(rgb4, hxhy4, brd)]
+    # Get neighbors of the center points, in HEX_DIRECTIONS order
+    neighs1, neighs2, neighs3, neighs4 = (brd.get_neighbors(hxhy1_o), brd.get_neighbors(hxhy2_o),
+                                          brd.get_neighbors(hxhy3_o), brd.get_neighbors(hxhy4_o))
+    hxhy1 = [neighs1[0], hxhy1_o, neighs1[3]]  # upper left
+    hxhy2 = [neighs2[5], hxhy2_o, neighs2[2]]  # upper right
+    hxhy3 = [neighs3[5], hxhy3_o, neighs3[2]]  # lower left
+    hxhy4 = [neighs4[0], hxhy4_o, neighs4[3]]  # lower right
+    if rngs is None:
+        rngs = [None, None, None, None]
+    return [Ciliate(rgb1, hxhy1, brd, rngs[0]), Ciliate(rgb2, hxhy2, brd, rngs[1]),
+            Ciliate(rgb3, hxhy3, brd, rngs[2]), Ciliate(rgb4, hxhy4, brd, rngs[3])]
+
+
+def get_lattice_spots(brd, col_step, row_step, shift, fits):
+    """
+    Gets the hexagons of a lattice that fit an organism: every col_step-th column, and every row_step-th hexagon down
+    each of those columns, shifted down by shift more hexagons each lattice column to the right. The lattice is
+    centered on the board's midpoint unless moving it fits more organisms on the board.
+
+        **Parameters**
+            brd: Board
+                    Custom empty Board object.
+            col_step: int
+                    Columns between lattice columns.
+            row_step: int
+                    Hexagons between lattice spots down a column.
+            shift: int
+                    How far each lattice column is shifted down from the one on its left.
+            fits: function
+                    Takes the hexagonal coordinates of a lattice spot and returns whether an organism fits there.
+
+        **Returns**
+            list: tuple
+                    Hexagonal coordinates of the lattice spots that fit, column by column.
+    """
+    mid_hx, mid_hy = brd.midpoint
+    best_spots = []
+    # Every other lattice is the centered one moved by less than a lattice step, nearest first
+    for move_hx, move_hy in sorted(itertools.product(range(col_step), range(row_step)), key=sum):
+        spots = []
+        for hx in range(mid_hx % col_step + move_hx, brd.hex_diag + 1, col_step):
+            # The first hexagon of the column in line with the spot the lattice puts in it
+            hy_lo = brd.hy_mins[hx]
+            hy_lo += (mid_hy + move_hy + (hx - mid_hx - move_hx) // col_step * shift - hy_lo) % row_step
+            spots.extend(hxhy for hxhy in zip(itertools.repeat(hx), range(hy_lo, brd.hy_maxes[hx] + 1, row_step))
+                         if fits(hxhy))
+        if len(spots) > len(best_spots):
+            best_spots = spots
+    return best_spots
+
+
+def get_even_picks(n, count):
+    """
+    Picks count of n items in order, one from the middle of each of count equal runs, so the picks spread evenly
+    and a single pick is the middle item.
+
+        **Parameters**
+            n: int
+                    Number of items.
+            count: int
+                    Number of items to pick, at most n.
+
+        **Returns**
+            np.ndarray
+                Indexes of the picked items.
+    """
+    return ((np.arange(count) + 0.5) * n / max(count, 1)).astype(int)
+
+
+def initialize_ciliates(brd, count, rngs=None, avoid=()):
+    """
+    Lays any number of ciliates evenly over a lattice of spots centered on the board, each pointing up with a free
+    hexagon around it. Colors cycle through the 4 ciliate colors.
+
+        **Parameters**
+            brd: Board
+                    Custom empty Board object.
+            count: int
+                    Number of ciliates to lay.
+            rngs: list: RandomStream
+                    Optional random number stream for each ciliate.
+            avoid: list: tuple
+                    Hexagonal coordinates no ciliate may cover, such as the amoeba's.
 
+        **Returns**
+            list: Ciliate
+                    List of initialized Ciliate organism objects.
+    """
+    rgbs = [(0, 0, 0), (255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    avoid = set(avoid)
+    # Ciliates 7 hexagons apart down every column, shifted 3 down each column, are the closest a column of upright
+    # ciliates can sit to the ciliates in the columns next to it with a free hexagon in between
+    def get_hxhy_list(hxhy):
+        return [(hxhy[0], hxhy[1] - 1), hxhy, (hxhy[0], hxhy[1] + 1)]
 
-def initialize_amoeba(radius, brd):
+    def fits(hxhy):
+        hxhy_list = get_hxhy_list(hxhy)
+        return all(brd.get_cell_id(hxhy) is not None for hxhy in hxhy_list) and not avoid.intersection(hxhy_list)
+
+    spots = [get_hxhy_list(hxhy) for hxhy in get_lattice_spots(brd, 1, 7, 3, fits)]
+    if count > len(spots):
+        raise ValueError('Only ' + str(len(spots)) + ' ciliates fit on this board')
+    if rngs is None:
+        rngs = [None] * count
+    return [Ciliate(rgbs[i % 4], spots[pick], brd, rngs[i]) for i, pick in enumerate(get_even_picks(len(spots), count))]
+
+
+def initialize_amoeba(radius, brd, rng=None, center=None):
     """
     Establishes the color and initial self coordinates of the amoeba.
 
@@ -898,6 +4224,10 @@ def initialize_amoeba(radius, brd):
                     Radius of the amoeba's initial blob conformation.
             brd: Board
                     Custom empty Board object.
+            rng: RandomStream
+                    Optional random number stream for the amoeba.
+            center: tuple
+                    Optional hexagonal coordinate of the blob's center. The middle of the board if not given.
 
         **Returns**
             Amoeba: Amoeba
@@ -905,44 +4235,139 @@ def initialize_amoeba(radius, brd):
     """
     # Center of amoeba at center of board
     rgb = (25, 255, 255)
-    hxhy_list = [brd.midpoint]
+    hxhy_list = [brd.midpoint if center is None else center]
     # use rotation method to make concentric hex rings
     for r in range(1, radius + 1):
         hxhy_list.extend(get_ring(hxhy_list[0], r))
-    return Amoeba(rgb, hxhy_list, brd)
+    return Amoeba(rgb, hxhy_list, brd, rng)
+
+
+def initialize_amoebae(radius, brd, count, rngs=None):
+    """
+    Lays any number of amoebae evenly over a lattice of blob centers centered on the board. The blobs are packed as
+    closely as hexagons tile, with one free hexagon between neighboring blobs, so blobs of the same color stay
+    apart. A single amoeba sits in the middle of the board.
+
+        **Parameters**
+            radius: int
+                    Radius of each amoeba's initial blob conformation.
+            brd: Board
+                    Custom empty Board object.
+            count: int
+                    Number of amoebae to lay.
+            rngs: list: RandomStream
+                    Optional random number stream for each amoeba.
+
+        **Returns**
+            list: Amoeba
+                    List of initialized Amoeba objects.
+    """
+    if rngs is None:
+        rngs = [None] * count
+    if count == 1:
+        return [initialize_amoeba(radius, brd, rngs[0])]
+    # Neighboring centers are (2k, -k) and (k, k) apart, 2k hexagons either way. With k = radius + 1 that leaves
+    # one free hexagon between blobs.
+    k = radius + 1
+    # Keep blobs whose outer ring is fully on the board
+    centers = get_lattice_spots(brd, k, 3 * k, k, lambda hxhy: all(brd.get_cell_id(ring_hxhy) is not None
+                                                                   for ring_hxhy in get_ring(hxhy, radius)))
+    if count > len(centers):
+        raise ValueError('Only ' + str(len(centers)) + ' amoebae fit on this board')
+    return [initialize_amoeba(radius, brd, rngs[i], centers[pick])
+            for i, pick in enumerate(get_even_picks(len(centers), count))]
+
+
+def initialize_simulation(hex_cnt, width, amoeba_radius, seed=None, ciliate_count=4, amoeba_count=1,
+                          simultaneous=True, workers=0, stats=None):
+    """
+    Lays the ciliates and amoebae onto a blank board and wraps them in a Simulation. Every organism gets its own
+    random number stream spawned from the seed, so the same seed always gives the same run.
+
+        **Parameters**
+            hex_cnt: int
+                    Number of hexagons across the diagonal of the board.
+            width: int
+                    Pixel width of a single hexagon.
+            amoeba_radius: int
+                    Radius of each amoeba's initial blob conformation.
+            seed: int
+                    Seed of the simulation. Unseeded if not given.
+            ciliate_count: int
+                    Number of ciliates. 4 ciliates around 1 amoeba start in the corners, any other layout is made by
+                    initialize_ciliates().
+            amoeba_count: int
+                    Number of amoebae, laid out by initialize_amoebae().
+            simultaneous: bool
+                    Move the organisms in conflict-free batches. See Simulation.
+            workers: int
+                    Run the simulation across this many worker processes, see StripSimulation. Runs in this
+                    process if 0.
+            stats: RunStats
+                    Optional stats to time the phases of the run and count its events in.
+
+        **Returns**
+            Simulation, StripSimulation
+                    Simulation at time step 0.
+    """
+    rngs = spawn_random_streams(seed, ciliate_count + amoeba_count)
+    blank_board = Board(hex_cnt, width, '', organisms=None)
+    amoebae = initialize_amoebae(amoeba_radius, blank_board, amoeba_count, rngs[ciliate_count:])
+    if ciliate_count == 4 and amoeba_count == 1:
+        ciliates = initialize_4_ciliates(blank_board, rngs[:4])
+    else:
+        amoeba_hxhys = [hxhy for amoeba in amoebae for hxhy in amoeba.hxhy_list]
+        ciliates = initialize_ciliates(blank_board, ciliate_count, rngs[:ciliate_count], amoeba_hxhys)
+    if workers > 0:
+        return StripSimulation(hex_cnt, width, [*ciliates, *amoebae], workers, seed=seed, stats=stats)
+    return Simulation(hex_cnt, width, [*ciliates, *amoebae], seed, simultaneous=simultaneous, stats=stats)
+
 
+def spawn_random_streams(seed, count):
+    """
+    Spawns independent child random number streams from one seed.
+
+        **Parameters**
+            seed: int
+                    Seed of the parent stream. Unseeded if None.
+            count: int
+                    Number of child streams.
+
+        **Returns**
+            list: RandomStream
+                    One stream per child.
+    """
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [RandomStream(np.random.default_rng(child)) for child in children]
 
-def get_image_name(t):
+
+def get_image_name(t, digits=3):
     """
-    Creates the name of the image for this time step.
+    Creates the name of the image for this time step. Names are zero padded so they sort in time order.
 
         **Parameters**
             t: int
                     Current time step.
+            digits: int
+                    Zero padded length of the name. Must fit the final time step.
 
         **Returns**
             str
                     The name to be used for the image file.
     """
-    if 0 <= t <= 9:
-        return '00' + str(t)
-    elif 10 <= t <= 99:
-        return '0' + str(t)
-    elif 100 <= t <= 999:
-        return str(t)
-    else:
-        print('Invalid max time step: 0...999 only')
-        exit()
+    return str(t).zfill(digits)
 
 
-def run_simulation(t_max, hex_cnt, width, organisms, img_path):
+def run_simulation(t_max, hex_cnt, width, organisms, img_path=None, video=None, trajectory_path=None, viewport=None,
+                   simultaneous=True, stats=None, profile_path=None, checkpoint_path=None, checkpoint_every=100,
+                   encoder_threads=0):
     """
-    Initializes the organisms onto the board and cycles through the time steps to
-    run the simulation. Saves the new board configuration at the end of each step.
+    Initializes the organisms onto a single long-lived board and cycles through the time steps to
+    run the simulation. At the end of each step the board is either streamed into the video or saved out as an image.
 
         **Parameters**
             t_max: int
-                    Final time step. Should not exceed 999.
+                    Final time step.
             hex_cnt: int
                     Number of hexagons across the diagonal of the board.
             width: int
@@ -950,37 +4375,203 @@ def run_simulation(t_max, hex_cnt, width, organisms, img_path):
             organisms: list
                     A list of custom organism class objects
             img_path: str
-                    Complete folder pathway to where simulation images are saved to.
+                    Complete folder pathway to where simulation images are saved to. Not used when streaming.
+            video: VideoStream
+                    Optional open video stream to push every frame into instead of saving images.
+            trajectory_path: str
+                    Optional folder to log the organism positions of every time step into, see TrajectoryWriter.
+            viewport: tuple
+                    Optional pixel window (x0, y0, width, height) of the board to output instead of the whole board.
+            simultaneous: bool
+                    Move the organisms in conflict-free batches. See Simulation.
+            stats: RunStats
+                    Optional stats to time the phases of the run and count its events in.
+            profile_path: str
+                    Optional file to save a cProfile profile of the run to, for pstats or snakeviz.
+            checkpoint_path: str
+                    Optional file to save a checkpoint of the run to, see save_checkpoint(). Resume the run from it
+                    with resume_simulation().
+            checkpoint_every: int
+                    Save a checkpoint every this many time steps.
+            encoder_threads: int
+                    Encode frames on this many background threads while the simulation runs on, see FramePipeline.
+                    Frames are encoded in the step loop if 0.
+
+        **Returns**
+            No return
+    """
+    with profile_to(profile_path):
+        sink = video if video is not None else ImageFolder(img_path, max(3, len(str(t_max))))
+        if encoder_threads > 0:
+            sink = FramePipeline(sink, encoder_threads)
+        # Lay the organisms onto the board and output as first simulation step
+        simulation = Simulation(hex_cnt, width, organisms, viewport=viewport, simultaneous=simultaneous, stats=stats)
+        write_frame(simulation.board, sink)
+        recorder = None
+        if trajectory_path is not None:
+            recorder = TrajectoryWriter(trajectory_path, simulation)
+        run_time_steps(simulation, t_max, sink, recorder, checkpoint_path, checkpoint_every)
+        if recorder is not None:
+            recorder.close()
+        if encoder_threads > 0:
+            sink.finish()
+
+
+def resume_simulation(checkpoint_path, t_max, checkpoint_every=100, stats=None, profile_path=None, encoder_threads=0):
+    """
+    Carries on a run of run_simulation() from its last checkpoint up to the final time step. The organisms, their
+    random streams and the board pick up exactly where the checkpoint left them, so the rest of the run is the
+    same as if it had never stopped. Frames go on into the same image folder or video. Trajectory logs are not
+    carried on.
+
+        **Parameters**
+            checkpoint_path: str
+                    The checkpoint file of the run. Keeps being updated as the run goes on.
+            t_max: int
+                    Final time step.
+            checkpoint_every: int
+                    Save a checkpoint every this many time steps.
+            stats: RunStats
+                    Optional stats to time the phases of the rest of the run and count its events in.
+            profile_path: str
+                    Optional file to save a cProfile profile of the rest of the run to.
+            encoder_threads: int
+                    Encode frames on this many background threads, see FramePipeline.
+
+        **Returns**
+            VideoStream, ImageFolder, FramePipeline
+                    The reopened frame sink. Close it to finish the video.
+    """
+    with profile_to(profile_path):
+        simulation, cursor = load_checkpoint(checkpoint_path)
+        simulation.set_stats(stats)
+        sink = open_sink(cursor)
+        if encoder_threads > 0:
+            sink = FramePipeline(sink, encoder_threads)
+        run_time_steps(simulation, t_max, sink, checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+    return sink
+
+
+def run_time_steps(simulation, t_max, sink, recorder=None, checkpoint_path=None, checkpoint_every=100):
+    """
+    Helper function to run_simulation() and resume_simulation(). Cycles through the time steps after the
+    simulation's current one, outputting every frame and saving a checkpoint every checkpoint_every time steps.
+
+        **Parameters**
+            simulation: Simulation
+                    The simulation to advance.
+            t_max: int
+                    Final time step.
+            sink: VideoStream, ImageFolder, FramePipeline
+                    The frame sink.
+            recorder: TrajectoryWriter
+                    Optional trajectory log.
+            checkpoint_path: str
+                    Optional file to save checkpoints to.
+            checkpoint_every: int
+                    Save a checkpoint every this many time steps.
 
         **Returns**
             No return
     """
-    # Lay the organisms onto the board and save as first simulation step
-    board = Board(hex_cnt, width, img_path + '000', organisms)
-    board.save()
-    # Separate amoeba and ciliates
-    amoeba = organisms.pop()
-    ciliates = organisms
-    for t in range(1, t_max + 1):
-        # Record the time step as the image name to be saved.
+    for t in range(simulation.t + 1, t_max + 1):
         print('Time step:', t)
-        img_name = img_path + get_image_name(t)
-        # Move the amoeba three times per time step.
-        for i in range(3):
-            new_hxhy = amoeba.moved_hxhy_list
-            amoeba = Amoeba(amoeba.rgb, new_hxhy, board)
-            board = Board(hex_cnt, width, img_name, [*ciliates, amoeba])
-        # Move the ciliates one time each.
-        for i in range(len(ciliates)):
-            new_hxhy = ciliates[i].moved_hxhy_list
-            ciliates[i] = Ciliate(ciliates[i].rgb, new_hxhy, board)
-            board = Board(hex_cnt, width, img_name, [*ciliates, amoeba])
-        board.save()
-
-
-def make_video(img_path, fps):
-    """
-    Compiles simulation image outputs into a .mp4 video saved to the local working directory.
+        simulation.step(1, sink, recorder=recorder)
+        if checkpoint_path is not None and t % checkpoint_every == 0:
+            with simulation.stats.phase('checkpoint'):
+                # Finish the frames so far first, so the checkpoint never points past what is on disk
+                sink.split()
+                save_checkpoint(simulation, checkpoint_path, sink.get_cursor())
+
+
+def save_checkpoint(simulation, path, cursor=None):
+    """
+    Saves the full simulation state as one pickle: every organism's cells and orientation, their random streams,
+    the board's occupancy and the time step, plus where the frame output stands. The file is written next to path
+    and then moved over it, so a run killed mid-write leaves the previous checkpoint whole.
+
+        **Parameters**
+            simulation: Simulation
+                    The simulation to save.
+            path: str
+                    Name of the checkpoint file.
+            cursor: dict
+                    Optional frame sink cursor, see ImageFolder.get_cursor() and VideoStream.get_cursor().
+
+        **Returns**
+            No return
+    """
+    temp_name = path + '.tmp'
+    with open(temp_name, 'wb') as f:
+        pickle.dump({'simulation': simulation, 'cursor': cursor}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_name, path)
+
+
+def load_checkpoint(path):
+    """
+    Loads a checkpoint saved by save_checkpoint().
+
+        **Parameters**
+            path: str
+                    Name of the checkpoint file.
+
+        **Returns**
+            simulation: Simulation
+                    The simulation as it was saved.
+            cursor: dict
+                    The frame sink cursor, or None if none was saved.
+    """
+    with open(path, 'rb') as f:
+        checkpoint = pickle.load(f)
+    return checkpoint['simulation'], checkpoint['cursor']
+
+
+def open_sink(cursor):
+    """
+    Reopens a frame sink where its cursor left off.
+
+        **Parameters**
+            cursor: dict
+                    Frame sink cursor, see ImageFolder.get_cursor() and VideoStream.get_cursor().
+
+        **Returns**
+            VideoStream, ImageFolder
+                    The reopened frame sink.
+    """
+    sink_classes = {'ImageFolder': ImageFolder, 'VideoStream': VideoStream}
+    return sink_classes[cursor['sink']](**cursor['args'])
+
+
+@contextmanager
+def profile_to(profile_path):
+    """
+    Profiles the body of a with statement with cProfile. Does nothing if no profile file is given.
+
+        **Parameters**
+            profile_path: str
+                    Optional file to save the profile to, for pstats or snakeviz.
+
+        **Returns**
+            No return
+    """
+    if profile_path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+
+
+def make_video(img_path, fps, stats=None):
+    """
+    Compiles simulation image outputs into a .mp4 video saved to the local working directory. Images are shown for
+    as many frames as they were held, see get_image_durations().
     Deletes the image folder.
 
         **Parameters**
@@ -988,16 +4579,48 @@ def make_video(img_path, fps):
                     Complete folder pathway where the simulation images are.
             fps: int
                     Frames Per Second of the video being made.
+            stats: RunStats
+                    Optional stats to time the 'make_video' phase in.
 
         **Returns**
             No return
     """
+    stats = stats if stats is not None else RunStats(enabled=False)
     # Compile the images into a video saved to the local directory, not the image path.
-    image_files = [os.path.join(img_path, img) for img in os.listdir(img_path) if img.endswith(".png")]
-    clip = MakeClip.ImageSequenceClip(image_files, fps=fps)
-    clip.write_videofile('simulation_video.mp4')
+    image_names = sorted(img for img in os.listdir(img_path) if img.endswith(".png"))
+    image_files = [os.path.join(img_path, img) for img in image_names]
+    with stats.phase('make_video'):
+        clip = MakeClip.ImageSequenceClip(image_files, durations=get_image_durations(img_path, image_names, fps))
+        clip.write_videofile('simulation_video.mp4', fps=fps)
     # Delete the image path.
-    shutil.rmtree(image_path)
+    shutil.rmtree(img_path)
+
+
+def get_image_durations(img_path, image_names, fps):
+    """
+    Helper function to make_video(). Works out how long each image of an ImageFolder is shown. An image is shown
+    from its own frame number up to the next image's, as the frames in between were held. The last image is shown
+    up to the last frame logged in the hold log.
+
+        **Parameters**
+            img_path: str
+                    Complete folder pathway where the simulation images are.
+            image_names: list: str
+                    Names of the images, in frame order.
+            fps: int
+                    Frames Per Second of the video being made.
+
+        **Returns**
+            list: float
+                    Seconds each image is shown.
+    """
+    held = []
+    if os.path.exists(img_path + ImageFolder.hold_log):
+        with open(img_path + ImageFolder.hold_log) as f:
+            held = [int(line) for line in f if line.strip()]
+    starts = [int(os.path.splitext(name)[0]) for name in image_names]
+    ends = starts[1:] + [max([starts[-1], *held]) + 1]
+    return [(end - start) / fps for start, end in zip(starts, ends)]
 
 
 if __name__ == "__main__":
@@ -1006,20 +4629,68 @@ if __name__ == "__main__":
     hex_count = 60
     pixel_width_of_hex = 19
     amoeba_radius = 5
-    # Highest time step allowed is 999.
+    # 999 time steps makes a 2 minute video at 8 frames per second.
     max_time_steps = 999
-    # Must specify this folder pathway
+    frames_per_second = 8
+    # Stream frames straight into the video. Set to False to save images to a folder and compile them afterwards.
+    stream_frames = True
+    # Must specify this folder pathway when not streaming
     image_path = 'D:/SIMULATION PHOTOS/'
+    # Set an integer seed to make the run repeatable
+    random_seed = None
+    # Optional folder to log every time step's organism positions into, for re-rendering or analysis
+    trajectory_folder = None
+    # Optional pixel window (x0, y0, width, height) to film instead of the whole board, for very large boards
+    viewport = None
+    # Move all organisms at once in conflict-free batches. Set to False to move them one at a time.
+    simultaneous_moves = True
+    # Optional .json file for per-phase timings and event counters, and .prof file for a cProfile profile of the run
+    stats_file = None
+    profile_file = None
+    # Optional file to checkpoint the run into every checkpoint_interval time steps. Set resume_from_checkpoint to
+    # True to carry an interrupted run on from its last checkpoint, with the other knobs left as they were.
+    checkpoint_file = None
+    checkpoint_interval = 100
+    resume_from_checkpoint = False
+    # Threads encoding frames in the background while the simulation runs on. Set to 0 to encode in the step loop.
+    encoder_threads = 2
 
-    # Initialize and save a blank board to a local folder
-    os.mkdir(image_path)
-    image_name = image_path + "_Blank Hex Board"
-    blank_board = Board(hex_count, pixel_width_of_hex, image_name, organisms=None)
-    blank_board.save()
-    # Get initial list of organism objects
-    collection_of_organisms = [*initialize_4_ciliates(blank_board), initialize_amoeba(amoeba_radius, blank_board)]
-    # Run simulation over time steps
-    run_simulation(max_time_steps, hex_count, pixel_width_of_hex, collection_of_organisms, image_path)
-    # Create a video of the simulation image results
-    frames_per_second = 8
-    make_video(image_path, frames_per_second)
+    run_stats = RunStats(enabled=stats_file is not None)
+    if resume_from_checkpoint:
+        # Carry on the run into the same video or image folder
+        frame_sink = resume_simulation(checkpoint_file, max_time_steps, checkpoint_interval, run_stats, profile_file,
+                                       encoder_threads)
+        with run_stats.phase('frame_output'):
+            frame_sink.close()
+        if not stream_frames:
+            make_video(image_path, frames_per_second, run_stats)
+    else:
+        # Initialize a blank board, saving it to a local folder when not streaming
+        image_name = image_path + "_Blank Hex Board"
+        blank_board = Board(hex_count, pixel_width_of_hex, image_name, organisms=None, viewport=viewport)
+        if not stream_frames:
+            os.mkdir(image_path)
+            blank_board.save()
+        # Get initial list of organism objects, each with its own random stream spawned from the seed
+        streams = spawn_random_streams(random_seed, 5)
+        collection_of_organisms = [*initialize_4_ciliates(blank_board, streams[:4]),
+                                   initialize_amoeba(amoeba_radius, blank_board, streams[4])]
+        if stream_frames:
+            # Run simulation over time steps, encoding each frame as it is made
+            video_stream = VideoStream('simulation_video.mp4', blank_board.frame_size, frames_per_second)
+            run_simulation(max_time_steps, hex_count, pixel_width_of_hex, collection_of_organisms, video=video_stream,
+                           trajectory_path=trajectory_folder, viewport=viewport, simultaneous=simultaneous_moves,
+                           stats=run_stats, profile_path=profile_file, checkpoint_path=checkpoint_file,
+                           checkpoint_every=checkpoint_interval, encoder_threads=encoder_threads)
+            with run_stats.phase('frame_output'):
+                video_stream.close()
+        else:
+            # Run simulation over time steps
+            run_simulation(max_time_steps, hex_count, pixel_width_of_hex, collection_of_organisms, image_path,
+                           trajectory_path=trajectory_folder, viewport=viewport, simultaneous=simultaneous_moves,
+                           stats=run_stats, profile_path=profile_file, checkpoint_path=checkpoint_file,
+                           checkpoint_every=checkpoint_interval, encoder_threads=encoder_threads)
+            # Create a video of the simulation image results
+            make_video(image_path, frames_per_second, run_stats)
+    if stats_file is not None:
+        run_stats.save(stats_file)
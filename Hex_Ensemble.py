@@ -0,0 +1,185 @@
+"""
+*******************************************************************************************************
+"Hexagonal Microbes" - Ensemble Runner
+
+Runs the same simulation configuration across many random seeds in parallel, one process per core.
+Each run spawns its random number streams from its seed, writes to its own output file if asked to, and
+reports a short summary of where the organisms ended up.
+
+Example:
+    python Hex_Ensemble.py --seeds 0-99 --steps 999 --out ensemble_runs --summary ensemble_summary.json
+*******************************************************************************************************
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import time
+import Hex_Board
+
+# Knobs for a single run, matching the defaults in Hex_Board's main protocol.
+DEFAULT_CONFIG = {
+    'hex_count': 60,
+    'pixel_width_of_hex': 19,
+    'amoeba_radius': 5,
+    'ciliate_count': 4,
+    'amoeba_count': 1,
+    'simultaneous': True,
+    'max_time_steps': 999,
+    'frames_per_second': 8,
+    'collect_stats': False,
+}
+
+
+def run_seeded_simulation(config, seed, out_dir=None):
+    """
+    Runs one simulation from a fixed seed. Headless unless an output folder is given, in which case the run
+    streams its frames into its own video named after the seed.
+
+        **Parameters**
+            config: dict
+                    Simulation knobs, see DEFAULT_CONFIG.
+            seed: int
+                    Seed for the random number generator of this run.
+            out_dir: str
+                    Optional folder for the run's video.
+
+        **Returns**
+            dict
+                Summary of the run.
+    """
+    start = time.perf_counter()
+    simulation = Hex_Board.initialize_simulation(
+        config['hex_count'], config['pixel_width_of_hex'], config['amoeba_radius'], seed,
+        config.get('ciliate_count', 4), config.get('amoeba_count', 1), config.get('simultaneous', True),
+        stats=Hex_Board.RunStats(enabled=config.get('collect_stats', False)))
+    video = None
+    if out_dir is not None:
+        video = Hex_Board.VideoStream(os.path.join(out_dir, 'seed_' + str(seed) + '.mp4'),
+                                      simulation.board.frame_size, config['frames_per_second'])
+        Hex_Board.write_frame(simulation.board, video)
+    simulation.step(config['max_time_steps'], video)
+    if video is not None:
+        video.close()
+    return summarize(simulation, seed, time.perf_counter() - start, video)
+
+
+def summarize(simulation, seed, seconds, video):
+    """
+    Helper function to run_seeded_simulation(). Condenses the final simulation state into a summary.
+
+        **Parameters**
+            simulation: Simulation
+                    The finished simulation.
+            seed: int
+                    Seed of the run.
+            seconds: float
+                    Wall clock time of the run.
+            video: VideoStream
+                    The run's video stream, or None for a headless run.
+
+        **Returns**
+            dict
+                Seed, time steps, wall time, amoeba sizes and centers, ciliate head positions, video file and
+                per-phase stats if collected.
+    """
+    state = simulation.state()
+    return {
+        'seed': seed,
+        't': state['t'],
+        'seconds': round(seconds, 3),
+        'amoeba_sizes': [len(amoeba) for amoeba in state['amoebae']],
+        'amoeba_centers': [[sum(hxhy[0] for hxhy in amoeba) / len(amoeba),
+                            sum(hxhy[1] for hxhy in amoeba) / len(amoeba)] for amoeba in state['amoebae']],
+        'ciliate_heads': [list(ciliate[0]) for ciliate in state['ciliates']],
+        'video': None if video is None else video.file_name,
+        'stats': simulation.stats.as_dict() if simulation.stats.enabled else None,
+    }
+
+
+def run_ensemble(config, seeds, out_dir=None, max_workers=None):
+    """
+    Runs one simulation per seed across a process pool sized to the machine's cores.
+
+        **Parameters**
+            config: dict
+                    Simulation knobs, see DEFAULT_CONFIG.
+            seeds: list: int
+                    Seeds to run.
+            out_dir: str
+                    Optional folder for the per-seed videos. Runs are headless without it.
+            max_workers: int
+                    Number of worker processes. Defaults to the number of cores.
+
+        **Returns**
+            list: dict
+                    Run summaries in the same order as seeds.
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    seeds = list(seeds)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_seeded_simulation, [config] * len(seeds), seeds, [out_dir] * len(seeds)))
+
+
+def parse_seeds(text):
+    """
+    Parses a seed list such as '0-99' or '1,5,9' or a mix of both.
+
+        **Parameters**
+            text: str
+                    Comma separated seeds and inclusive seed ranges.
+
+        **Returns**
+            list: int
+                    The seeds in the order given.
+    """
+    seeds = []
+    for part in text.split(','):
+        if '-' in part.strip()[1:]:
+            first, last = part.rsplit('-', 1)
+            seeds.extend(range(int(first), int(last) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run many seeded hexagonal microbe simulations in parallel.')
+    parser.add_argument('--seeds', required=True, help="Seeds to run, e.g. '0-99' or '1,5,9'.")
+    parser.add_argument('--steps', type=int, default=DEFAULT_CONFIG['max_time_steps'], help='Time steps per run.')
+    parser.add_argument('--hex-count', type=int, default=DEFAULT_CONFIG['hex_count'])
+    parser.add_argument('--width', type=int, default=DEFAULT_CONFIG['pixel_width_of_hex'])
+    parser.add_argument('--radius', type=int, default=DEFAULT_CONFIG['amoeba_radius'])
+    parser.add_argument('--ciliates', type=int, default=DEFAULT_CONFIG['ciliate_count'])
+    parser.add_argument('--amoebae', type=int, default=DEFAULT_CONFIG['amoeba_count'])
+    parser.add_argument('--sequential', action='store_true',
+                        help='Move organisms one at a time, as older versions did.')
+    parser.add_argument('--fps', type=int, default=DEFAULT_CONFIG['frames_per_second'])
+    parser.add_argument('--out', default=None, help='Folder for per-seed videos. Runs are headless without it.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes. Defaults to the core count.')
+    parser.add_argument('--summary', default=None, help='Write the run summaries to this .json file.')
+    parser.add_argument('--stats', action='store_true',
+                        help='Time the phases of every run and count its events, and add them to the summaries.')
+    args = parser.parse_args()
+
+    ensemble_config = {
+        'hex_count': args.hex_count,
+        'pixel_width_of_hex': args.width,
+        'amoeba_radius': args.radius,
+        'ciliate_count': args.ciliates,
+        'amoeba_count': args.amoebae,
+        'simultaneous': not args.sequential,
+        'max_time_steps': args.steps,
+        'frames_per_second': args.fps,
+        'collect_stats': args.stats,
+    }
+    summaries = run_ensemble(ensemble_config, parse_seeds(args.seeds), args.out, args.workers)
+    for summary in summaries:
+        print('Seed', summary['seed'], 'finished in', summary['seconds'], 's')
+    if args.summary is not None:
+        with open(args.summary, 'w') as f:
+            json.dump(summaries, f, indent=2)
@@ -0,0 +1,715 @@
+"""
+Behaviour checks of Hex_Board.py. Run with: python -m pytest -q
+"""
+
+import math
+import os
+import pickle
+import random
+import time
+import types
+import numpy as np
+from PIL import Image
+import pytest
+import Hex_Benchmark
+import Hex_Board
+import Hex_Ensemble
+
+
+def get_board_hexes(hex_cnt):
+    """
+    Lists every hexagon on a board, column by column.
+    """
+    return [(hx, hy) for hx in range(hex_cnt + 1)
+            for hy in range(math.ceil(-0.5 * hx), math.floor(0.5 * (hex_cnt - hx)) + 1)]
+
+
+def paint_reference(hex_cnt, width, organisms):
+    """
+    Paints organisms the way the original putpixel renderer did, four mirrored pixels at a time, later hexagons
+    painting over earlier ones.
+    """
+    height = width / 2 * 3 ** 0.5
+    px_max = math.floor(width / 2 + width / 2 * (hex_cnt * 3 / 2)) + math.ceil(width / 2)
+    py_max = math.floor(height / 2 + width / 2 * (hex_cnt / 2 * 3 ** 0.5)) + math.ceil(height / 2)
+    quad_max_xs = [(round(width / 2 - j * 1 / 3 ** 0.5)) for j in range(round(height / 2))]
+    img = Image.new(mode="RGB", size=(px_max, py_max), color=(255, 255, 255))
+    for org in organisms:
+        for hx, hy in org.hxhy_list:
+            shift_x = math.floor(width / 2 + width / 2 * (hx * 3 / 2))
+            shift_y = math.floor(height / 2 + width / 2 * (hx / 2 * 3 ** 0.5 + hy * 3 ** 0.5))
+            for j, item in enumerate(quad_max_xs):
+                for i in range(item):
+                    for x, y in ((i, j), (-i, j), (-i, -j), (i, -j)):
+                        img.putpixel((shift_x + x, shift_y + y), org.rgb)
+    return np.asarray(img)
+
+
+def make_stripes(hex_cnt):
+    """
+    Covers a whole board in three interleaved organisms, so every hexagon borders hexagons of other colors.
+    """
+    colors = [(255, 0, 0), (0, 128, 255), (20, 200, 60)]
+    return [types.SimpleNamespace(rgb=rgb, hxhy_list=[hxhy for hxhy in get_board_hexes(hex_cnt)
+                                                      if (hxhy[0] - hxhy[1]) % 3 == k])
+            for k, rgb in enumerate(colors)]
+
+
+def test_label_map_render_matches_putpixel_painting():
+    for hex_cnt, width in ((6, 3), (9, 8), (12, 19), (5, 36)):
+        organisms = make_stripes(hex_cnt)
+        board = Hex_Board.Board(hex_cnt, width, '', organisms)
+        reference = paint_reference(hex_cnt, width, organisms)
+        assert np.array_equal(np.asarray(board.img.convert('RGB')), reference), (hex_cnt, width)
+
+
+def make_random_moves(hex_cnt, seed, moves):
+    """
+    Scatters three organisms over a board, then moves one of them at a time by vacating two of its hexagons and
+    occupying two free ones. Yields (organisms, index, vacated, occupied) after each move.
+    """
+    rng = random.Random(seed)
+    free = get_board_hexes(hex_cnt)
+    rng.shuffle(free)
+    organisms = [types.SimpleNamespace(rgb=rgb, hxhy_list=[free.pop() for _ in range(12)])
+                 for rgb in ((255, 0, 0), (0, 128, 255), (20, 200, 60))]
+    yield organisms, None, [], []
+    for _ in range(moves):
+        index = rng.randrange(len(organisms))
+        org = organisms[index]
+        vacated = rng.sample(org.hxhy_list, 2)
+        occupied = [free.pop() for _ in range(2)]
+        free[:0] = vacated
+        organisms[index] = types.SimpleNamespace(
+            rgb=org.rgb, hxhy_list=[hxhy for hxhy in org.hxhy_list if hxhy not in vacated] + occupied)
+        yield organisms, index, vacated, occupied
+
+
+def test_repainted_board_matches_fresh_board():
+    moves = make_random_moves(10, 0, 40)
+    organisms = next(moves)[0]
+    board = Hex_Board.Board(10, 8, '', [*organisms])
+    for organisms, index, vacated, occupied in moves:
+        board.update_organism(index, organisms[index], vacated, occupied)
+        assert np.array_equal(board.pixels, Hex_Board.Board(10, 8, '', organisms).pixels)
+
+
+def test_occupancy_grid_matches_organism_lists():
+    moves = make_random_moves(10, 1, 40)
+    organisms = next(moves)[0]
+    board = Hex_Board.Board(10, 8, '', [*organisms])
+    fence = list(board.out_of_bounds)
+    for organisms, index, vacated, occupied in moves:
+        board.update_organism(index, organisms[index], vacated, occupied)
+        owners = {hxhy: i for i, org in enumerate(organisms) for hxhy in org.hxhy_list}
+        for hxhy in get_board_hexes(10):
+            assert board.owner_of(hxhy) == owners.get(hxhy, Hex_Board.Board.FREE)
+            assert board.is_free(hxhy) == (hxhy not in owners)
+        assert all(board.owner_of(hxhy) == Hex_Board.Board.FENCE for hxhy in fence)
+
+
+def test_amoeba_topology_matches_full_rebuild():
+    amoeba = Hex_Board.initialize_amoeba(3, Hex_Board.Board(30, 3, '', organisms=None),
+                                         Hex_Board.spawn_random_streams(3, 1)[0])
+    board = Hex_Board.Board(30, 3, '', [amoeba])
+    for move in range(1, 301):
+        vacated, occupied = amoeba.get_move_delta()
+        amoeba.advance(board)
+        board.update_organism(0, amoeba, vacated, occupied)
+        if move % 50 == 0:
+            rebuilt = Hex_Board.Amoeba(amoeba.rgb, list(amoeba.hxhy_list), board)
+            for name in ('perimeter_hxhy_list', 'fingertips_hxhy_list', 'necks_hxhy_list', 'base_hxhy_list',
+                         'reduced_p_hxhy_list'):
+                assert set(getattr(amoeba, name)) == set(getattr(rebuilt, name)), (move, name)
+
+
+def test_neighbor_table_matches_coordinate_steps():
+    board = Hex_Board.Board(12, 3, '', organisms=None)
+    table, oob_id = board.neighbor_table, board.oob_id
+    assert table.shape == (oob_id + 1, 7) and (table[oob_id] == oob_id).all()
+    for cell_id, (hx, hy) in enumerate(get_board_hexes(12)):
+        expected = [board.get_cell_id((hx + dx, hy + dy)) for dx, dy in Hex_Board.HEX_DIRECTIONS]
+        assert table[cell_id].tolist() == [oob_id if i is None else i for i in expected] + [cell_id]
+
+
+def test_ciliate_moves_follow_the_old_offsets():
+    # Head, middle and tail offsets from the middle after each move type, for a head pointing along direction 0
+    old_offsets = [[(-2, 0), (-1, 0), (0, 0)], [(0, 0), (1, 0), (2, 0)],
+                   [(-1, 1), (0, 0), (1, -1)], [(0, -1), (0, 0), (0, 1)]]
+    board = Hex_Board.Board(12, 3, '', organisms=None)
+    for orientation in range(6):
+        for move_type, offsets in enumerate(old_offsets):
+            # Turn the offsets to this orientation, one sixth of a turn clockwise per step
+            for _ in range(orientation):
+                offsets = [(-dy, dx + dy) for dx, dy in offsets]
+            for hx, hy in get_board_hexes(12):
+                ciliate = types.SimpleNamespace(brd=board, hxhy_list=[None, (hx, hy), None])
+                expected = [(hx + dx, hy + dy) for dx, dy in offsets]
+                expected = [hxhy if board.get_cell_id(hxhy) is not None else None for hxhy in expected]
+                assert Hex_Board.Ciliate.hypothetical_new_hxhy(ciliate, move_type, orientation) == expected
+
+
+def get_farthest_perimeter_hex_by_rings(amoeba, center_hex, rng):
+    """
+    The old ring-by-ring search of Amoeba.get_farthest_perimeter_hex(), drawing from rng the same way.
+    """
+    radius, rings = 2, []
+    while not any(hxhy in amoeba.reduced_p_hxhy_list for hxhy in Hex_Board.get_ring(center_hex, radius)):
+        radius += 1
+    while True:
+        ring = [hxhy for hxhy in Hex_Board.get_ring(center_hex, radius) if hxhy in amoeba.reduced_p_hxhy_list]
+        if len(ring) == 0:
+            break
+        rings.append(ring)
+        radius += 1
+    ring = rings[rng.choice(range(math.ceil(1 / 2 * (len(rings) - 1)), len(rings)))]
+    not_fingertips = [hxhy for hxhy in ring if hxhy not in amoeba.fingertips_hxhy_list]
+    return rng.choice(not_fingertips if len(ring) > 1 and len(not_fingertips) > 0 else ring)
+
+
+def test_farthest_perimeter_hex_matches_ring_search():
+    amoeba = Hex_Board.initialize_amoeba(3, Hex_Board.Board(30, 3, '', organisms=None),
+                                         Hex_Board.spawn_random_streams(5, 1)[0])
+    board = Hex_Board.Board(30, 3, '', [amoeba])
+    move_rng, compared = amoeba.rng, 0
+    for move in range(100):
+        amoeba.rng = move_rng
+        vacated, occupied = amoeba.get_move_delta()
+        amoeba.advance(board)
+        board.update_organism(0, amoeba, vacated, occupied)
+        for center_hex in list(amoeba.perimeter_hxhy_list):
+            # The old search never ends without a reduced perimeter hexagon two or more rings out
+            if all(Hex_Board.get_hex_distances(np.array([hxhy]) - np.array(center_hex))[0] < 2
+                   for hxhy in amoeba.reduced_p_hxhy_list):
+                continue
+            amoeba.rng = Hex_Board.spawn_random_streams(move, 1)[0]
+            chosen = amoeba.get_farthest_perimeter_hex(center_hex)
+            rng = Hex_Board.spawn_random_streams(move, 1)[0]
+            assert chosen == get_farthest_perimeter_hex_by_rings(amoeba, center_hex, rng)
+            compared += 1
+    assert compared > 500
+
+
+def make_organisms(seed, hex_cnt=40, radius=3):
+    """
+    Lays the default 4 ciliates and 1 amoeba onto a board, with random streams spawned from a seed.
+    """
+    rngs = Hex_Board.spawn_random_streams(seed, 5)
+    blank_board = Hex_Board.Board(hex_cnt, 5, '', organisms=None)
+    return [*Hex_Board.initialize_4_ciliates(blank_board, rngs[:4]),
+            Hex_Board.initialize_amoeba(radius, blank_board, rngs[4])]
+
+
+class FrameList:
+    """
+    Stands in for a VideoStream and keeps an RGB copy of every frame.
+    """
+    def __init__(self):
+        self.frames, self.frame_key = [], None
+
+    def write(self, pixels, palette):
+        self.frames.append(palette[pixels])
+
+    def repeat(self):
+        self.frames.append(self.frames[-1])
+
+
+def test_streamed_frames_match_saved_images(tmp_path):
+    video = FrameList()
+    Hex_Board.run_simulation(12, 40, 5, make_organisms(2), video=video)
+    Hex_Board.run_simulation(12, 40, 5, make_organisms(2), str(tmp_path) + os.sep)
+    names = sorted(os.listdir(tmp_path))
+    assert names == [Hex_Board.get_image_name(t) + '.png' for t in range(13)]
+    for name, frame in zip(names, video.frames):
+        assert np.array_equal(np.asarray(Image.open(tmp_path / name).convert('RGB')), frame)
+
+
+def test_image_names_sort_past_999_steps():
+    names = [Hex_Board.get_image_name(t, 4) for t in range(1200)]
+    assert names == sorted(names) and names[1100] == '1100'
+
+
+def test_headless_steps_match_rendered_steps():
+    headless = Hex_Board.Simulation(40, 5, make_organisms(4))
+    headless.step(15)
+    assert headless.board.pixel_buffer is None
+    rendered = Hex_Board.Simulation(40, 5, make_organisms(4))
+    frames = FrameList()
+    rendered.step(15, frames, every=5)
+    assert len(frames.frames) == 3
+    assert headless.state() == rendered.state()
+    assert np.array_equal(headless.board.get_palette_array()[headless.board.get_pixels()], frames.frames[-1])
+
+
+def test_ensemble_runs_are_reproducible_per_seed():
+    config = dict(Hex_Ensemble.DEFAULT_CONFIG, hex_count=30, amoeba_radius=3, max_time_steps=10)
+    summaries = Hex_Ensemble.run_ensemble(config, [7, 8, 7], max_workers=2)
+    assert [summary['seed'] for summary in summaries] == [7, 8, 7]
+    in_process = Hex_Ensemble.run_seeded_simulation(config, 7)
+    for summary in (summaries[0], summaries[2], in_process):
+        assert {**summary, 'seconds': 0} == {**summaries[0], 'seconds': 0}
+    assert summaries[1]['amoeba_centers'] != summaries[0]['amoeba_centers']
+    assert Hex_Ensemble.parse_seeds('3-5,9') == [3, 4, 5, 9]
+
+
+def test_same_seed_gives_identical_trajectories():
+    random.seed(0)
+    global_state = random.getstate()
+    first, second, other = (Hex_Board.initialize_simulation(30, 5, 3, seed) for seed in (11, 11, 12))
+    for _ in range(20):
+        for simulation in (first, second, other):
+            simulation.step()
+        assert first.state() == second.state()
+    assert first.state() != other.state()
+    assert random.getstate() == global_state
+
+
+def test_random_stream_serves_the_generator_in_order():
+    stream = Hex_Board.RandomStream(np.random.default_rng(9), block_size=7)
+    draws = [stream.random() for _ in range(30)]
+    assert draws == np.random.default_rng(9).random(35)[:30].tolist()
+    assert {stream.randint(2, 4) for _ in range(100)} == {2, 3, 4}
+
+
+def test_random_stream_checkpoints_resume_at_the_cursor():
+    stream = Hex_Board.RandomStream(np.random.default_rng(9), block_size=7)
+    expected = np.random.default_rng(9).random(70).tolist()
+    served = 0
+    # Before any block, mid-block, and at the very end of a block
+    for n, position in ((0, 0), (3, 3), (4, 7), (2, 2), (6, 7)):
+        if n:
+            drawn = len(stream.peek(n))
+            stream.skip(drawn)
+            served += drawn
+        assert stream.get_position() == position
+        state = stream.__getstate__()
+        assert state['position'] == stream.get_position()
+        copy = pickle.loads(pickle.dumps(stream))
+        # The copy draws its block again only once it is used, and pickles the same until then
+        assert len(copy.block) == 0 and copy.__getstate__() == state
+        assert [copy.random() for _ in range(20)] == expected[served:served + 20]
+    assert [stream.random() for _ in range(20)] == expected[served:served + 20]
+
+
+def test_trajectory_reads_back_every_step(tmp_path):
+    simulation = Hex_Board.initialize_simulation(40, 3, 3, seed=1)
+    writer = Hex_Board.TrajectoryWriter(str(tmp_path / 'trajectory'), simulation, keyframe_interval=25)
+    states = [simulation.state()]
+    for _ in range(60):
+        simulation.step(1, recorder=writer)
+        states.append(simulation.state())
+    writer.close()
+    reader = Hex_Board.TrajectoryReader(str(tmp_path / 'trajectory'))
+    assert reader.steps == 60
+    for t, state in enumerate(states):
+        expected, organism_cells = [*state['ciliates'], *state['amoebae']], reader.organism_cells_at(t)
+        assert len(organism_cells) == len(expected)
+        for cells, hxhy_list in zip(organism_cells, expected):
+            assert sorted(cells.tolist()) == sorted(simulation.board.get_cell_id(hxhy) for hxhy in hxhy_list), t
+
+
+def test_trajectory_meta_keeps_up_with_keyframes(tmp_path):
+    simulation = Hex_Board.initialize_simulation(40, 3, 3, seed=1)
+    path = str(tmp_path / 'trajectory')
+    writer = Hex_Board.TrajectoryWriter(path, simulation, keyframe_interval=10)
+    cells = [simulation.board.get_cell_id(hxhy) for org in simulation.board.organisms for hxhy in org.hxhy_list]
+    # A log still being written reads back up to its latest keyframe
+    simulation.step(7, recorder=writer)
+    for steps, keyframes in ((0, 1), (10, 2), (20, 3)):
+        reader = Hex_Board.TrajectoryReader(path)
+        assert (reader.steps, reader.meta['keyframes']) == (steps, keyframes)
+        simulation.step(10, recorder=writer)
+    assert reader.cells_at(0).tolist() == cells
+    writer.close()
+    reader = Hex_Board.TrajectoryReader(path)
+    assert (reader.steps, reader.meta['keyframes']) == (37, 4)
+    assert sorted(os.listdir(path)) == ['deltas.i32', 'keyframes.i32', 'meta.json', 'offsets.i64']
+
+
+def test_parallel_render_matches_live_frames(tmp_path):
+    simulation = Hex_Board.initialize_simulation(30, 5, 3, seed=6)
+    writer = Hex_Board.TrajectoryWriter(str(tmp_path / 'trajectory'), simulation, keyframe_interval=8)
+    live = FrameList()
+    live.write(simulation.board.pixels, simulation.board.get_palette_array())
+    for _ in range(20):
+        simulation.step(1, live, recorder=writer)
+    writer.close()
+    Hex_Board.render_trajectory(str(tmp_path / 'trajectory'), str(tmp_path / 'frames') + os.sep, workers=3)
+    names = sorted(os.listdir(tmp_path / 'frames'))
+    assert names == [Hex_Board.get_image_name(t) + '.png' for t in range(21)]
+    for name, frame in zip(names, live.frames):
+        assert np.array_equal(np.asarray(Image.open(tmp_path / 'frames' / name).convert('RGB')), frame), name
+
+
+def test_palette_frames_save_back_to_identical_rgb(tmp_path):
+    organisms = make_stripes(9)
+    board = Hex_Board.Board(9, 8, '', organisms)
+    assert board.pixels.dtype == np.uint8 and board.pixels.shape == (board.py_max, board.px_max)
+    Hex_Board.ImageFolder(str(tmp_path) + os.sep).write(board.pixels, board.get_palette_array())
+    saved = Image.open(tmp_path / (Hex_Board.get_image_name(0) + '.png'))
+    assert saved.mode == 'P'
+    assert np.array_equal(np.asarray(saved.convert('RGB')), paint_reference(9, 8, organisms))
+
+
+def test_palette_refuses_a_257th_color():
+    board = Hex_Board.Board(9, 3, '', organisms=None)
+    for i in range(255):
+        assert board.get_palette_index((i, 0, 0)) == i + 1
+    assert board.get_palette_index((0, 0, 0)) == 1
+    with pytest.raises(ValueError, match='palette is full'):
+        board.get_palette_index((0, 1, 0))
+    assert len(board.palette) == 256
+
+
+def test_viewport_and_tiles_match_the_whole_board(tmp_path, monkeypatch):
+    organisms = make_stripes(12)
+    whole = np.asarray(Hex_Board.Board(12, 7, '', organisms).img.convert('RGB'))
+    window = (13, 9, 40, 25)
+    viewport = Hex_Board.Board(12, 7, '', organisms, viewport=window)
+    assert np.array_equal(np.asarray(viewport.img.convert('RGB')), whole[9:34, 13:53])
+    board = Hex_Board.Board(12, 7, str(tmp_path / 'board.png'), organisms)
+    board.save_tiles(tile_size=(30, 25))
+    rows = []
+    for row in range(-(-board.py_max // 25)):
+        rows.append(np.hstack([np.asarray(Image.open(tmp_path / ('board_' + str(row) + '_' + str(col) + '.png'))
+                                          .convert('RGB')) for col in range(-(-board.px_max // 30))]))
+    assert np.array_equal(np.vstack(rows), whole)
+    monkeypatch.setattr(Hex_Board.Board, 'frame_pixel_budget', 1000)
+    with pytest.raises(ValueError):
+        Hex_Board.Board(12, 6, '', organisms).get_pixels()
+
+
+def test_viewport_works_out_centers_of_its_own_cells_only(monkeypatch):
+    centered = []
+    get_cell_centers = Hex_Board.BoardGeometry.get_cell_centers
+
+    def count_cell_centers(geometry, cell_ids):
+        centered.extend(cell_ids.tolist())
+        return get_cell_centers(geometry, cell_ids)
+
+    monkeypatch.setattr(Hex_Board.BoardGeometry, 'get_cell_centers', count_cell_centers)
+    board = Hex_Board.Board(600, 4, '', organisms=None, viewport=(1000, 900, 40, 30))
+    board.get_pixels()
+    assert sorted(centered) == board.get_window_cells(board.viewport).tolist()
+    assert 0 < len(centered) < 1000 < board.oob_id
+
+
+def test_neighbor_table_steps_match_ciliate_offsets():
+    board = Hex_Board.Board(12, 3, '', organisms=None)
+    table = board.neighbor_table
+    middles = np.arange(board.oob_id)
+    hx, hy = board.get_cell_coords(middles)
+    for orientation in range(6):
+        for move_type in range(4):
+            offsets = Hex_Board.CILIATE_MOVE_OFFSETS[orientation, move_type]
+            steps = Hex_Board.CILIATE_MOVE_STEPS[orientation, move_type]
+            expected = board.get_cell_ids(hx[:, None] + offsets[:, 0], hy[:, None] + offsets[:, 1])
+            assert np.array_equal(table[table[middles[:, None], steps[:, 0]], steps[:, 1]], expected)
+
+
+def test_ciliate_population_proposes_whole_moves_onto_free_cells():
+    simulation = Hex_Board.initialize_simulation(40, 3, 3, seed=8, ciliate_count=60, simultaneous=False)
+    population, board = simulation.ciliates, simulation.board
+    assert len(population) == 60
+    start = simulation.state()['ciliates']
+    for _ in range(30):
+        simulation.step()
+        # Every pending move is checked against the board as it is at the end of the step
+        for cells, pending in zip(population.cells.tolist(), population.pending.tolist()):
+            assert board.oob_id not in pending
+            assert all(cell in cells or board.get_owner_counts(np.array([cell]))[0] == 0 for cell in pending)
+        for head, middle, tail in simulation.state()['ciliates']:
+            assert head in board.get_neighbors(middle)
+            assert (tail[0] - middle[0], tail[1] - middle[1]) == (middle[0] - head[0], middle[1] - head[1])
+    assert simulation.state()['ciliates'] != start
+
+
+@pytest.mark.parametrize('simultaneous', [True, False])
+def test_many_amoebae_keep_their_own_topology(simultaneous):
+    simulation = Hex_Board.initialize_simulation(40, 3, 3, seed=4, ciliate_count=30, amoeba_count=3,
+                                                 simultaneous=simultaneous)
+    assert [amoeba.index for amoeba in simulation.amoebae] == [30, 31, 32]
+    start = [list(amoeba.hxhy_list) for amoeba in simulation.amoebae]
+    simulation.step(100)
+    for amoeba, hxhy_list in zip(simulation.amoebae, start):
+        assert sorted(amoeba.hxhy_list) != sorted(hxhy_list)
+        assert all(amoeba.index in simulation.board.owners_of(hxhy) for hxhy in amoeba.hxhy_list)
+        rebuilt = Hex_Board.Amoeba(amoeba.rgb, list(amoeba.hxhy_list), simulation.board)
+        for name in ('perimeter_hxhy_list', 'fingertips_hxhy_list', 'necks_hxhy_list', 'base_hxhy_list',
+                     'reduced_p_hxhy_list', 'growth_hxhy_list'):
+            assert set(getattr(amoeba, name)) == set(getattr(rebuilt, name)), name
+        assert amoeba.frontier.keys() == rebuilt.frontier.keys()
+        assert all(sorted(amoeba.frontier[hxhy]) == sorted(rebuilt.frontier[hxhy]) for hxhy in amoeba.frontier)
+
+
+def test_lattices_pack_organisms_apart_around_the_middle():
+    board = Hex_Board.Board(60, 3, '', organisms=None)
+    assert Hex_Board.initialize_ciliates(board, 1)[0].hxhy_list[1] == board.midpoint
+    assert Hex_Board.initialize_amoebae(2, board, 1)[0].hxhy_list[0] == board.midpoint
+    for initialize, capacity in ((Hex_Board.initialize_ciliates, 275),
+                                 (lambda brd, count: Hex_Board.initialize_amoebae(2, brd, count), 57)):
+        with pytest.raises(ValueError, match='Only ' + str(capacity) + ' '):
+            initialize(board, capacity + 1)
+        organisms = initialize(board, capacity)
+        # Every organism is on the board with a free hexagon between it and the others
+        owners = {hxhy: i for i, organism in enumerate(organisms) for hxhy in organism.hxhy_list}
+        assert len(owners) == sum(len(organism.hxhy_list) for organism in organisms)
+        assert all(board.get_cell_id(hxhy) is not None for hxhy in owners)
+        assert all(owners.get(neighbor, i) == i for hxhy, i in owners.items()
+                   for neighbor in Hex_Board.get_neighbor_coords(hxhy))
+
+
+def test_resolve_conflicts_lowest_index_wins():
+    board = Hex_Board.Board(12, 3, '', organisms=None)
+    proposals = [(3, [], [(6, 0)]), (1, [], [(6, 0), (7, 0)]), (2, [], [(7, 0)]), (0, [], [(5, 0)])]
+    assert Hex_Board.resolve_conflicts(board, proposals).tolist() == [False, True, False, True]
+    # The outcome does not depend on the order of the proposals
+    assert Hex_Board.resolve_conflicts(board, proposals[::-1]).tolist() == [True, False, True, False]
+    # Hexagons off the board are never granted
+    assert Hex_Board.resolve_conflicts(board, [(0, [], [(-1, 0)])]).tolist() == [False]
+
+
+def test_simultaneous_batches_never_overlap():
+    simulation = Hex_Board.initialize_simulation(40, 3, 3, seed=8, ciliate_count=60, amoeba_count=3)
+    board = simulation.board
+    for _ in range(60):
+        simulation.step()
+        state = simulation.state()
+        owners = {}
+        for index, hxhy_list in enumerate([*state['ciliates'], *state['amoebae']]):
+            for hxhy in hxhy_list:
+                assert owners.setdefault(hxhy, index) == index, hxhy
+        assert all(board.owner_of(hxhy) == index for hxhy, index in owners.items())
+
+
+def test_strip_workers_match_simulation_move_for_move():
+    kwargs = dict(seed=3, ciliate_count=120, amoeba_count=4)
+    simulation = Hex_Board.initialize_simulation(80, 3, 2, **kwargs)
+    strips = Hex_Board.initialize_simulation(80, 3, 2, workers=3, **kwargs)
+    try:
+        start = strips.state()
+        assert start == simulation.state()
+        border_moves = 0
+        for _ in range(25):
+            simulation.step()
+            strips.step()
+            assert strips.moves == simulation.moves
+            # Moves reaching from one strip into the next are resolved against the other workers' moves
+            for index, vacated, occupied in strips.moves:
+                hx = np.array([hxhy[0] for hxhy in [*vacated, *occupied]])
+                border_moves += len(np.unique(Hex_Board.get_strips(strips.bounds, hx))) > 1
+        end = strips.state()
+        assert end == simulation.state()
+        assert np.array_equal(strips.board.occupancy, simulation.board.occupancy)
+        assert np.array_equal(strips.board.cell_state, simulation.board.cell_state)
+    finally:
+        strips.close()
+    assert border_moves > 0
+    # Ciliates are anchored on their middle column. Some of them must have been handed over to another worker.
+    anchors = [Hex_Board.get_strips(strips.bounds, np.array([state[1][0] for state in states['ciliates']]))
+               for states in (start, end)]
+    assert (anchors[0] != anchors[1]).any()
+
+
+def get_old_move_odds(amoeba):
+    """
+    Works out the odds of each growth hexagon the way the old redraw loop did: a perimeter hexagon at random, then
+    one of its growth hexagons at random, redrawn until no other organism owns the hexagon. The amoeba's own
+    hexagons do not count as taken.
+    """
+    hexes_to_add, weights = amoeba.get_frontier_arrays()
+    is_valid = np.array([all(owner == amoeba.index for owner in amoeba.brd.owners_of(tuple(hxhy)))
+                         and amoeba.brd.get_cell_id(tuple(hxhy)) is not None for hxhy in hexes_to_add.tolist()],
+                        dtype=bool)
+    return np.where(is_valid, weights, 0)
+
+
+def test_sequential_amoeba_moves_match_old_odds(monkeypatch):
+    checks = {'moves': 0, 'vacated_allowed': 0}
+    random_move = Hex_Board.Amoeba.random_move
+
+    def checked_random_move(amoeba):
+        if amoeba.index is not None:
+            hexes_to_add, weights = amoeba.get_frontier_arrays()
+            new_odds = np.where(amoeba.brd.get_free_mask(hexes_to_add[:, 0], hexes_to_add[:, 1]), weights, 0)
+            assert np.array_equal(new_odds, get_old_move_odds(amoeba))
+            vacated = amoeba.moved_delta[0]
+            if vacated and any(tuple(hxhy) == vacated[0] for hxhy in hexes_to_add.tolist()):
+                checks['vacated_allowed'] += bool(amoeba.brd.is_free(vacated[0]))
+            checks['moves'] += 1
+        return random_move(amoeba)
+    monkeypatch.setattr(Hex_Board.Amoeba, 'random_move', checked_random_move)
+    simulation = Hex_Board.initialize_simulation(40, 3, 4, seed=2, ciliate_count=30, amoeba_count=2,
+                                                 simultaneous=False)
+    simulation.step(50)
+    assert checks['moves'] == 300
+    # The hexagon an amoeba just left is usually a growth candidate, and must be open to it
+    assert checks['vacated_allowed'] > 100
+
+
+@pytest.mark.parametrize('simultaneous', [True, False])
+def test_run_stats_time_phases_and_count_events(tmp_path, simultaneous):
+    stats = Hex_Board.RunStats()
+    simulation = Hex_Board.initialize_simulation(30, 3, 3, seed=2, ciliate_count=40, amoeba_count=2,
+                                                 simultaneous=simultaneous, stats=stats)
+    frames = FrameList()
+    simulation.step(10, frames)
+    summary = stats.as_dict()
+    assert {'amoeba_moves', 'ciliate_moves', 'render'} <= summary['seconds'].keys()
+    assert summary['calls']['render'] == 10 and summary['counters']['frames'] == 10
+    stats.save(str(tmp_path / 'stats.json'))
+    assert os.path.getsize(tmp_path / 'stats.json') > 0
+    # Disabled stats hand out one shared timer and count nothing
+    idle = Hex_Board.RunStats(enabled=False)
+    assert idle.phase('render') is idle.phase('amoeba_moves')
+    idle.count('frames')
+    assert idle.as_dict() == {'seconds': {}, 'calls': {}, 'counters': {}}
+
+
+def test_benchmarks_run_and_flag_regressions(monkeypatch, tmp_path):
+    monkeypatch.setitem(Hex_Benchmark.BOARD_CONFIGS, 'tiny', (16, 5, 2))
+    monkeypatch.chdir(tmp_path)
+    results = Hex_Benchmark.run_benchmarks(['tiny'], list(Hex_Benchmark.BENCHMARKS), 2, radii=(2,))
+    assert [result['name'] for result in results] == list(Hex_Benchmark.BENCHMARKS)
+    assert all(0 < result['seconds_min'] <= result['seconds_median'] for result in results)
+    slower = [dict(result, seconds_min=result['seconds_min'] * 1.5) for result in results]
+    comparisons = Hex_Benchmark.compare_results(slower, results, tolerance=0.2)
+    assert len(comparisons) == len(results) and all(comparison['regressed'] for comparison in comparisons)
+    assert not any(comparison['regressed'] for comparison in Hex_Benchmark.compare_results(results, slower, 0.2))
+
+
+@pytest.mark.parametrize('simultaneous', [True, False])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, simultaneous):
+    folders = [str(tmp_path / name) + os.sep for name in ('whole', 'resumed')]
+    for folder in folders:
+        os.mkdir(folder)
+    Hex_Board.run_simulation(40, 30, 3, make_organisms(3, 30, 2), folders[0], simultaneous=simultaneous,
+                             checkpoint_path=str(tmp_path / 'whole.ckpt'), checkpoint_every=10)
+    # Stops after time step 25, so the run resumes from the checkpoint at time step 20
+    Hex_Board.run_simulation(25, 30, 3, make_organisms(3, 30, 2), folders[1], simultaneous=simultaneous,
+                             checkpoint_path=str(tmp_path / 'resumed.ckpt'), checkpoint_every=10)
+    Hex_Board.resume_simulation(str(tmp_path / 'resumed.ckpt'), 40, checkpoint_every=10).close()
+    names = sorted(os.listdir(folders[0]))
+    assert len(names) == 41 and sorted(os.listdir(folders[1])) == names
+    for name in names:
+        with open(folders[0] + name, 'rb') as whole, open(folders[1] + name, 'rb') as resumed:
+            assert whole.read() == resumed.read(), name
+    whole, _ = Hex_Board.load_checkpoint(str(tmp_path / 'whole.ckpt'))
+    resumed, _ = Hex_Board.load_checkpoint(str(tmp_path / 'resumed.ckpt'))
+    assert whole.t == resumed.t == 40 and whole.state() == resumed.state()
+
+
+class SlowSink:
+    """
+    Stands in for a frame sink whose earlier frames take longer to encode than later ones.
+    """
+    def __init__(self, frame_count):
+        self.frame_count, self.committed = frame_count, []
+
+    def encode(self, pixels, palette):
+        frame = int(pixels[0, 0])
+        if frame < 0:
+            raise ValueError('bad frame')
+        time.sleep(0.002 * (self.frame_count - frame))
+        return frame
+
+    def commit(self, frame):
+        self.committed.append(frame)
+
+    def close(self):
+        pass
+
+
+def test_frame_pipeline_commits_frames_in_order():
+    sink = SlowSink(30)
+    pipeline = Hex_Board.FramePipeline(sink, workers=4, queue_size=6)
+    pixels = np.zeros((2, 2), dtype=np.int16)
+    for frame in range(30):
+        pixels[:] = frame
+        pipeline.write(pixels, None)
+    pipeline.close()
+    assert sink.committed == list(range(30))
+    # An encoder error reaches the caller instead of being dropped
+    pipeline = Hex_Board.FramePipeline(SlowSink(1), workers=2)
+    pipeline.write(np.full((2, 2), -1, dtype=np.int16), None)
+    with pytest.raises(ValueError):
+        pipeline.close()
+
+
+def test_held_frames_match_fresh_renders():
+    stats = Hex_Board.RunStats()
+    ciliates = Hex_Board.initialize_ciliates(Hex_Board.Board(30, 5, '', organisms=None), 6,
+                                             Hex_Board.spawn_random_streams(3, 6))
+    # A small viewport off the middle often sees no change from one time step to the next
+    simulation = Hex_Board.Simulation(30, 5, ciliates, viewport=(40, 40, 100, 80), stats=stats)
+    frames = FrameList()
+    for _ in range(40):
+        simulation.step(1, frames)
+        board = simulation.board
+        assert np.array_equal(frames.frames[-1], board.get_palette_array()[board.render()])
+    assert len(frames.frames) == 40 and 0 < stats.counters['frames_repeated'] < 40
+
+
+def test_image_folder_logs_held_frames_instead_of_copies(tmp_path):
+    frames = FrameList()
+    for img_path, video in ((None, frames), (str(tmp_path) + os.sep, None)):
+        ciliates = Hex_Board.initialize_ciliates(Hex_Board.Board(30, 5, '', organisms=None), 6,
+                                                 Hex_Board.spawn_random_streams(3, 6))
+        Hex_Board.run_simulation(40, 30, 5, ciliates, img_path, video, viewport=(40, 40, 100, 80))
+    names = sorted(name for name in os.listdir(tmp_path) if name.endswith('.png'))
+    with open(tmp_path / 'holds.txt') as f:
+        held = [int(line) for line in f]
+    assert len(names) + len(held) == len(frames.frames) == 41 and len(held) > 0
+    assert not set(held) & {int(name[:-4]) for name in names}
+    # Each image is shown for the frames up to the next image
+    durations = Hex_Board.get_image_durations(str(tmp_path) + os.sep, names, 8)
+    shown = [name for name, duration in zip(names, durations) for _ in range(round(duration * 8))]
+    assert len(shown) == 41
+    for name, frame in zip(shown, frames.frames):
+        assert np.array_equal(np.asarray(Image.open(tmp_path / name).convert('RGB')), frame)
+
+
+def test_frame_key_moves_on_only_for_changes_in_view():
+    organisms = [types.SimpleNamespace(rgb=(255, 0, 0), hxhy_list=[(1, 0)]),
+                 types.SimpleNamespace(rgb=(0, 0, 255), hxhy_list=[(18, 0)])]
+    board = Hex_Board.Board(20, 5, '', organisms, viewport=(0, 0, 30, 30))
+    key = board.get_frame_key()
+    board.get_pixels()
+    # A move outside the viewport, and a move in view undone before the next frame, leave the frame as it was
+    board.apply_moves([(1, [(18, 0)], [(17, 0)])])
+    board.apply_moves([(0, [(1, 0)], [(1, 1)])])
+    board.apply_moves([(0, [(1, 1)], [(1, 0)])])
+    assert board.get_frame_key() == key
+    board.apply_moves([(0, [(1, 0)], [(1, 1)])])
+    new_key = board.get_frame_key()
+    assert new_key != key and board.get_frame_key() == new_key
+    # Boards never share keys
+    assert Hex_Board.Board(20, 5, '', organisms, viewport=(0, 0, 30, 30)).get_frame_key() != key
+
+
+def test_boards_of_a_size_share_one_geometry():
+    organisms = make_stripes(14)
+    first, second = Hex_Board.Board(14, 6, '', organisms), Hex_Board.Board(14, 6, '', None)
+    assert first.geometry is second.geometry is Hex_Board.get_board_geometry(14, 6)
+    assert first.neighbor_table is second.neighbor_table and not first.neighbor_table.flags.writeable
+    assert Hex_Board.Board(14, 7, '', None).geometry is not first.geometry
+    # Each board keeps its own occupancy, so a move on one leaves the other alone
+    assert first.occupancy is not second.occupancy
+    hxhy = organisms[0].hxhy_list[0]
+    assert first.owner_of(hxhy) == 0 and second.is_free(hxhy)
+    with pytest.raises(ValueError):
+        first.geometry.col_start_array[0] = 1
+
+
+def test_population_draws_match_each_ciliate_stream():
+    simulation = Hex_Board.initialize_simulation(40, 3, 2, seed=4, ciliate_count=6, amoeba_count=0)
+    population = simulation.ciliates
+    expected = [Hex_Board.spawn_random_streams(4, 6)[i] for i in range(6)]
+    # Each ciliate drew its first pending move from its stream before joining the population
+    for rng in expected:
+        rng.random()
+    drawn = np.array([population.draw_uniforms() for _ in range(200)])
+    assert np.array_equal(drawn, [[rng.random() for rng in expected] for _ in range(200)])
+    # Streams handed on mid-stretch carry on exactly where the population left them
+    packet = population.remove([1, 4])
+    assert [rng.random() for rng in packet['rngs']] == [expected[1].random(), expected[4].random()]